@@ -0,0 +1,75 @@
+"""Сравнение поштучных POST /objects/ и одного POST /objects/bulk.
+
+Запуск: python -m benchmarks.bulk_objects --rows 10000
+"""
+
+import argparse
+import asyncio
+import json
+
+from benchmarks.common import SUBJECTS, Timer, app_client, sqlite_engine
+
+
+def make_rows(user_ids: list[int], rows: int) -> list[dict]:
+    """Сгенерировать уникальные по (user_id, name) строки баллов."""
+    result = []
+    for i in range(rows):
+        user_id = user_ids[i // len(SUBJECTS)]
+        result.append(
+            {"name": SUBJECTS[i % len(SUBJECTS)], "point": i % 101, "user_id": user_id}
+        )
+    return result
+
+
+async def create_users(client, count: int) -> list[int]:
+    ids = []
+    for i in range(count):
+        response = await client.post(
+            "/users/",
+            json={
+                "first_name": "Bench",
+                "last_name": str(i),
+                "full_name": f"Bench {i}",
+                "telegram_id": str(i),
+            },
+        )
+        ids.append(response.json()["id"])
+    return ids
+
+
+async def run(rows: int) -> dict:
+    users_needed = -(-rows // len(SUBJECTS))
+
+    async with sqlite_engine() as engine, app_client(engine) as client:
+        user_ids = await create_users(client, users_needed)
+        data = make_rows(user_ids, rows)
+        with Timer() as single:
+            for row in data:
+                await client.post("/objects/", json=row)
+
+    async with sqlite_engine() as engine, app_client(engine) as client:
+        user_ids = await create_users(client, users_needed)
+        data = make_rows(user_ids, rows)
+        with Timer() as bulk:
+            response = await client.post("/objects/bulk", json=data)
+        assert response.json()["created"] == rows
+
+    return {
+        "rows": rows,
+        "single_seconds": round(single.elapsed, 4),
+        "single_rows_per_second": round(rows / single.elapsed, 1),
+        "bulk_seconds": round(bulk.elapsed, 4),
+        "bulk_rows_per_second": round(rows / bulk.elapsed, 1),
+        "speedup": round(single.elapsed / bulk.elapsed, 1),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=10_000)
+    args = parser.parse_args()
+    print(json.dumps(asyncio.run(run(args.rows)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""Общие утилиты бенчмарков: приложение поверх SQLite в памяти."""
+
+import logging
+import math
+import time
+from contextlib import asynccontextmanager, contextmanager
+from typing import AsyncIterator, Iterator
+
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import StaticPool
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
+
+from core.base.model import Base
+from core.db.session import get_db
+from main import app
+
+# Логи запросов искажают замеры
+logging.disable(logging.INFO)
+
+SUBJECTS = [
+    "Математика",
+    "Русский язык",
+    "Физика",
+    "Химия",
+    "Биология",
+    "История",
+    "Обществознание",
+    "Информатика",
+    "Литература",
+    "Английский язык",
+]
+
+
+@asynccontextmanager
+async def sqlite_engine(
+    url: str = "sqlite+aiosqlite:///:memory:",
+) -> AsyncIterator[AsyncEngine]:
+    """Движок SQLite с созданной схемой."""
+    engine = create_async_engine(
+        url,
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    try:
+        yield engine
+    finally:
+        await engine.dispose()
+
+
+@asynccontextmanager
+async def database(url: str) -> AsyncIterator[AsyncEngine]:
+    """Движок с обычным пулом (SQLite файл или Postgres) и созданной схемой."""
+    connect_args = {"timeout": 30} if url.startswith("sqlite") else {}
+    engine = create_async_engine(url, connect_args=connect_args)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    try:
+        yield engine
+    finally:
+        await engine.dispose()
+
+
+@contextmanager
+def use_engine(engine: AsyncEngine) -> Iterator[None]:
+    """Подменить get_db в main.app сессиями на переданном движке."""
+    session_maker = async_sessionmaker(
+        bind=engine,
+        class_=AsyncSession,
+        expire_on_commit=False,
+        autoflush=False,
+    )
+
+    async def override_get_db() -> AsyncIterator[AsyncSession]:
+        async with session_maker() as session:
+            yield session
+
+    app.dependency_overrides[get_db] = override_get_db
+    try:
+        yield
+    finally:
+        app.dependency_overrides.pop(get_db, None)
+
+
+@asynccontextmanager
+async def app_client(engine: AsyncEngine) -> AsyncIterator[AsyncClient]:
+    """HTTP клиент к main.app с сессиями на переданном движке."""
+    with use_engine(engine):
+        async with AsyncClient(
+            transport=ASGITransport(app=app), base_url="http://bench"
+        ) as client:
+            yield client
+
+
+class Timer:
+    """Контекстный менеджер для замера времени."""
+
+    def __enter__(self) -> "Timer":
+        self.started = time.perf_counter()
+        self.elapsed = 0.0
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.elapsed = time.perf_counter() - self.started
+
+
+def percentile(sorted_values: list[float], p: float) -> float:
+    """Перцентиль методом ближайшего ранга."""
+    if not sorted_values:
+        return 0.0
+    rank = max(math.ceil(p / 100 * len(sorted_values)), 1)
+    return sorted_values[rank - 1]
+
+
+def summarize(latencies: list[float]) -> dict[str, float]:
+    """p50/p95/p99 и максимум задержек в миллисекундах."""
+    values = sorted(latencies)
+    return {
+        f"p{p}_ms": round(percentile(values, p) * 1000, 3) for p in (50, 95, 99)
+    } | {"max_ms": round(values[-1] * 1000, 3) if values else 0.0}
@@ -0,0 +1,109 @@
+"""Число запросов и время записей CRUDBase: ORM + refresh против RETURNING.
+
+Запуск: python -m benchmarks.crud_writes --rows 1000
+"""
+
+import argparse
+import asyncio
+import json
+from typing import Any
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from benchmarks.common import Timer, sqlite_engine
+from core.base.crud import CRUDBase
+from src.app.users.crud import UserCRUD
+from src.app.users.model import User
+from src.app.users.schema import UserCreate
+
+
+class LegacyUserCRUD(UserCRUD):
+    """Прежние записи: add + commit + refresh, get перед update/delete."""
+
+    async def create(self, db: AsyncSession, *, obj_in: UserCreate) -> User:
+        db_obj = User(**obj_in.model_dump())
+        db.add(db_obj)
+        await db.commit()
+        await db.refresh(db_obj)
+        return db_obj
+
+    async def update(
+        self, db: AsyncSession, *, id: Any, obj_in: dict[str, Any]
+    ) -> User | None:
+        db_obj = await db.get(User, id)
+        if db_obj is None:
+            return None
+        for field, value in obj_in.items():
+            setattr(db_obj, field, value)
+        await db.commit()
+        await db.refresh(db_obj)
+        return db_obj
+
+    async def delete(self, db: AsyncSession, *, id: Any) -> User | None:
+        db_obj = await db.get(User, id)
+        if db_obj is None:
+            return None
+        await db.delete(db_obj)
+        await db.commit()
+        return db_obj
+
+
+async def measure(crud: CRUDBase, rows: int) -> dict[str, Any]:
+    result: dict[str, Any] = {}
+    async with sqlite_engine() as engine:
+        statements = {"count": 0}
+
+        def count(*args) -> None:
+            statements["count"] += 1
+
+        event.listen(engine.sync_engine, "before_cursor_execute", count)
+        session_maker = async_sessionmaker(engine, expire_on_commit=False)
+        ids = []
+        for phase in ("create", "update", "delete"):
+            statements["count"] = 0
+            with Timer() as timer:
+                for i in range(rows):
+                    # Новая сессия на операцию, как в запросе к API
+                    async with session_maker() as db:
+                        if phase == "create":
+                            user = await crud.create(
+                                db,
+                                obj_in=UserCreate(
+                                    first_name="Bench",
+                                    last_name=str(i),
+                                    full_name=f"Bench {i}",
+                                    telegram_id=str(i),
+                                ),
+                            )
+                            ids.append(user.id)
+                        elif phase == "update":
+                            await crud.update(
+                                db, id=ids[i], obj_in={"first_name": "Updated"}
+                            )
+                        else:
+                            await crud.delete(db, id=ids[i])
+            result[phase] = {
+                "statements_per_op": round(statements["count"] / rows, 2),
+                "ms_per_op": round(timer.elapsed / rows * 1000, 3),
+            }
+    return result
+
+
+async def run(rows: int) -> dict:
+    return {
+        "rows": rows,
+        "before": await measure(LegacyUserCRUD(User), rows),
+        "after": await measure(UserCRUD(User), rows),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=1000)
+    args = parser.parse_args()
+    print(json.dumps(asyncio.run(run(args.rows)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
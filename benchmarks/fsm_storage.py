@@ -0,0 +1,84 @@
+"""Задержка FSM хранилищ на апдейт: MemoryStorage против SQLiteStorage.
+
+Апдейт моделирует шаг диалога: get_state, update_data, set_state.
+При одновременных апдейтах записи SQLiteStorage объединяются в общие
+транзакции (transactions — их число).
+
+Запуск: python -m benchmarks.fsm_storage --updates 20000 --chats 1000 --concurrency 50
+"""
+
+import argparse
+import asyncio
+import json
+import tempfile
+import time
+from pathlib import Path
+
+from aiogram.fsm.storage.base import BaseStorage, StorageKey
+from aiogram.fsm.storage.memory import MemoryStorage
+
+from benchmarks.common import summarize
+from bot.storage import SQLiteStorage
+
+STATES = ["ScoreState:waiting_subject", "ScoreState:waiting_score", None]
+
+
+async def measure(
+    storage: BaseStorage, updates: int, chats: int, concurrency: int = 1
+) -> dict:
+    """concurrency чатов обрабатываются одновременно, как воркерами бота."""
+    latencies = []
+
+    async def worker(offset: int) -> None:
+        for i in range(offset, updates, concurrency):
+            key = StorageKey(bot_id=1, chat_id=i % chats, user_id=i % chats)
+            update_started = time.perf_counter()
+            await storage.get_state(key)
+            await storage.update_data(key, {"subject": "Физика", "step": i})
+            await storage.set_state(key, STATES[i % len(STATES)])
+            latencies.append(time.perf_counter() - update_started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker(offset) for offset in range(concurrency)))
+    await storage.close()
+    elapsed = time.perf_counter() - started
+    result = {
+        "updates_per_second": round(updates / elapsed, 1),
+        **summarize(latencies),
+    }
+    if isinstance(storage, SQLiteStorage):
+        result["transactions"] = storage.batches
+    return result
+
+
+async def run(updates: int, chats: int, concurrency: int) -> dict:
+    with tempfile.TemporaryDirectory() as tmp:
+        return {
+            "updates": updates,
+            "chats": chats,
+            "concurrency": concurrency,
+            "memory": await measure(MemoryStorage(), updates, chats, concurrency),
+            "sqlite_sequential": await measure(
+                SQLiteStorage(Path(tmp) / "sequential.sqlite3"), updates, chats
+            ),
+            "sqlite_concurrent": await measure(
+                SQLiteStorage(Path(tmp) / "concurrent.sqlite3"),
+                updates,
+                chats,
+                concurrency,
+            ),
+        }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--updates", type=int, default=20_000)
+    parser.add_argument("--chats", type=int, default=1_000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    args = parser.parse_args()
+    result = asyncio.run(run(args.updates, args.chats, args.concurrency))
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""CPU на один ответ бота с клавиатурой: сборка на каждый ответ против готовой.
+
+Ответ — создание SendMessage с reply_markup и сборка form data сессией,
+как перед отправкой в Telegram (без сети).
+
+Запуск: python -m benchmarks.keyboards --repeat 20000
+"""
+
+import argparse
+import json
+from typing import Callable
+
+from aiogram import Bot
+from aiogram.client.session.aiohttp import AiohttpSession
+from aiogram.methods import SendMessage
+from aiogram.types import KeyboardButton, ReplyKeyboardMarkup
+
+from benchmarks.common import Timer
+from bot.keyboards import (
+    MAIN_KEYBOARD,
+    SUBJECTS,
+    SUBJECTS_KEYBOARD,
+    CachedMarkupSession,
+)
+
+
+def legacy_main_keyboard() -> ReplyKeyboardMarkup:
+    """Прежняя get_main_keyboard: новая клавиатура на каждый вызов."""
+    return ReplyKeyboardMarkup(
+        keyboard=[
+            [
+                KeyboardButton(text="📚 Выбрать предмет"),
+                KeyboardButton(text="📊 Мои баллы"),
+            ],
+        ],
+        resize_keyboard=True,
+    )
+
+
+def legacy_subjects_keyboard() -> ReplyKeyboardMarkup:
+    """Прежняя get_subjects_keyboard."""
+    buttons = []
+    for i in range(0, len(SUBJECTS), 2):
+        row = [KeyboardButton(text=SUBJECTS[i])]
+        if i + 1 < len(SUBJECTS):
+            row.append(KeyboardButton(text=SUBJECTS[i + 1]))
+        buttons.append(row)
+    buttons.append([KeyboardButton(text="❌ Отмена")])
+    return ReplyKeyboardMarkup(keyboard=buttons, resize_keyboard=True)
+
+
+def measure(
+    session: AiohttpSession,
+    keyboard: Callable[[], ReplyKeyboardMarkup],
+    repeat: int,
+) -> float:
+    """Микросекунды на ответ."""
+    bot = Bot("123:abc", session=session)
+    with Timer() as timer:
+        for _ in range(repeat):
+            method = SendMessage(chat_id=1, text="Выберите:", reply_markup=keyboard())
+            session.build_form_data(bot, method)
+    return round(timer.elapsed / repeat * 1e6, 2)
+
+
+def run(repeat: int) -> dict:
+    result = {"repeat": repeat}
+    cases = {
+        "main": (legacy_main_keyboard, lambda: MAIN_KEYBOARD),
+        "subjects": (legacy_subjects_keyboard, lambda: SUBJECTS_KEYBOARD),
+    }
+    for name, (legacy, prebuilt) in cases.items():
+        before = measure(AiohttpSession(), legacy, repeat)
+        after = measure(CachedMarkupSession(), prebuilt, repeat)
+        result[name] = {
+            "before_us_per_reply": before,
+            "after_us_per_reply": after,
+            "speedup": round(before / after, 1),
+        }
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeat", type=int, default=20_000)
+    args = parser.parse_args()
+    print(json.dumps(run(args.repeat), indent=2))
+
+
+if __name__ == "__main__":
+    main()
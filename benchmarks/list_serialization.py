@@ -0,0 +1,82 @@
+"""Сериализация списка баллов: model_validate + response_model против TypeAdapter.
+
+Старый путь получает ORM объекты, новый — строки колонок (как get_page_rows).
+
+Запуск: python -m benchmarks.list_serialization --rows 1000 --repeat 200
+"""
+
+import argparse
+import asyncio
+import json
+
+from fastapi import FastAPI
+from httpx import ASGITransport, AsyncClient
+
+from benchmarks.common import SUBJECTS, Timer
+from src.api.objects import object_rows_adapter
+from src.api.responses import AdapterJSONResponse
+from src.app.objects.model import Object
+from src.app.objects.schema import ObjectRead
+
+
+def make_app(objects: list[Object], rows: list[dict]) -> FastAPI:
+    bench_app = FastAPI()
+
+    @bench_app.get("/old", response_model=list[ObjectRead])
+    async def old_path():
+        return [ObjectRead.model_validate(obj) for obj in objects]
+
+    @bench_app.get("/new", response_model=list[ObjectRead])
+    async def new_path():
+        return AdapterJSONResponse(rows, adapter=object_rows_adapter)
+
+    return bench_app
+
+
+async def measure(client: AsyncClient, path: str, repeat: int) -> float:
+    await client.get(path)
+    with Timer() as timer:
+        for _ in range(repeat):
+            response = await client.get(path)
+    assert response.status_code == 200
+    return timer.elapsed / repeat
+
+
+async def run(rows: int, repeat: int) -> dict:
+    objects = [
+        Object(id=i, name=SUBJECTS[i % len(SUBJECTS)], point=i % 101, user_id=1)
+        for i in range(rows)
+    ]
+    row_dicts = [
+        {"id": o.id, "name": o.name, "point": o.point, "user_id": o.user_id}
+        for o in objects
+    ]
+    async with AsyncClient(
+        transport=ASGITransport(app=make_app(objects, row_dicts)),
+        base_url="http://bench",
+    ) as client:
+        old = await client.get("/old")
+        new = await client.get("/new")
+        assert old.json() == new.json()
+        old_seconds = await measure(client, "/old", repeat)
+        new_seconds = await measure(client, "/new", repeat)
+
+    return {
+        "rows": rows,
+        "repeat": repeat,
+        "old_ms_per_request": round(old_seconds * 1000, 3),
+        "new_ms_per_request": round(new_seconds * 1000, 3),
+        "speedup": round(old_seconds / new_seconds, 2),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+    print(json.dumps(asyncio.run(run(args.rows, args.repeat)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
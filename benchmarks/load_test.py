@@ -0,0 +1,246 @@
+"""Нагрузочный тест API: смесь запросов бота, пропускная способность и p50/p95/p99.
+
+Приложение main.app вызывается в процессе через ASGITransport или через
+настоящий сокет uvicorn (--uvicorn). БД — временный файл SQLite или
+локальный Postgres (--db-url).
+
+Запуск: python -m benchmarks.load_test --requests 5000 --concurrency 20
+        python -m benchmarks.load_test --mix register=1,lookup=5,insert=3,list=3
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import socket
+import subprocess
+import tempfile
+import time
+import uuid
+from collections import defaultdict
+from contextlib import asynccontextmanager
+from pathlib import Path
+from typing import AsyncIterator
+
+import uvicorn
+from httpx import ASGITransport, AsyncClient, Limits
+
+from benchmarks.common import SUBJECTS, database, summarize, use_engine
+from main import app
+
+DEFAULT_MIX = "register=1,lookup=5,insert=3,list=3"
+
+
+def parse_mix(value: str) -> dict[str, int]:
+    mix = {}
+    for part in value.split(","):
+        name, _, weight = part.partition("=")
+        if name not in OPERATIONS:
+            raise argparse.ArgumentTypeError(f"Unknown operation: {name}")
+        mix[name] = int(weight or 1)
+    return mix
+
+
+class LoadState:
+    """Зарегистрированные пользователи и их заполненные предметы."""
+
+    def __init__(self, seed: int):
+        self.random = random.Random(seed)
+        self.run_id = uuid.uuid4().hex[:8]
+        self.users: list[dict] = []
+        self.subjects_used: dict[int, int] = defaultdict(int)
+        self._registered = 0
+
+    def next_telegram_id(self) -> str:
+        self._registered += 1
+        return f"load-{self.run_id}-{self._registered}"
+
+    def pick_user(self) -> dict:
+        return self.random.choice(self.users)
+
+
+async def op_register(client: AsyncClient, state: LoadState) -> int:
+    telegram_id = state.next_telegram_id()
+    response = await client.post(
+        "/users/",
+        json={
+            "first_name": "Load",
+            "last_name": telegram_id,
+            "full_name": f"Load {telegram_id}",
+            "telegram_id": telegram_id,
+        },
+    )
+    if response.status_code == 200:
+        state.users.append(response.json())
+    return response.status_code
+
+
+async def op_lookup(client: AsyncClient, state: LoadState) -> int:
+    user = state.pick_user()
+    response = await client.get(f"/users/telegram/{user['telegram_id']}")
+    return response.status_code
+
+
+async def op_insert(client: AsyncClient, state: LoadState) -> int:
+    """Новый предмет через POST /objects/, когда все заняты — PUT (замена)."""
+    user = state.pick_user()
+    point = state.random.randint(0, 100)
+    used = state.subjects_used[user["id"]]
+    if used < len(SUBJECTS):
+        state.subjects_used[user["id"]] += 1
+        response = await client.post(
+            "/objects/",
+            json={"name": SUBJECTS[used], "point": point, "user_id": user["id"]},
+        )
+    else:
+        response = await client.put(
+            f"/objects/{user['id']}",
+            json={"name": state.random.choice(SUBJECTS), "point": point},
+        )
+    return response.status_code
+
+
+async def op_list(client: AsyncClient, state: LoadState) -> int:
+    user = state.pick_user()
+    response = await client.get(f"/objects/{user['id']}")
+    return response.status_code
+
+
+OPERATIONS = {
+    "register": op_register,
+    "lookup": op_lookup,
+    "insert": op_insert,
+    "list": op_list,
+}
+
+
+@asynccontextmanager
+async def open_client(
+    use_uvicorn: bool, concurrency: int
+) -> AsyncIterator[AsyncClient]:
+    """Клиент к main.app: в процессе или через сокет uvicorn."""
+    if not use_uvicorn:
+        async with AsyncClient(
+            transport=ASGITransport(app=app), base_url="http://load"
+        ) as client:
+            yield client
+        return
+
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    server = uvicorn.Server(
+        uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning")
+    )
+    task = asyncio.create_task(server.serve())
+    while not server.started:
+        await asyncio.sleep(0.01)
+    try:
+        async with AsyncClient(
+            base_url=f"http://127.0.0.1:{port}",
+            limits=Limits(max_connections=concurrency),
+        ) as client:
+            yield client
+    finally:
+        server.should_exit = True
+        await task
+
+
+def git_revision() -> str | None:
+    try:
+        result = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return result.stdout.strip()
+
+
+async def run(args: argparse.Namespace) -> dict:
+    with tempfile.TemporaryDirectory() as tmp:
+        db_url = args.db_url or f"sqlite+aiosqlite:///{Path(tmp) / 'load.db'}"
+        async with (
+            database(db_url) as engine,
+            open_client(args.uvicorn, args.concurrency) as client,
+        ):
+            with use_engine(engine):
+                return await drive(client, args, db_url)
+
+
+async def drive(client: AsyncClient, args: argparse.Namespace, db_url: str) -> dict:
+    state = LoadState(args.seed)
+    # Пользователи для lookup/insert/list не входят в замер
+    for _ in range(args.seed_users):
+        await op_register(client, state)
+
+    names = list(args.mix)
+    weights = [args.mix[name] for name in names]
+    plan = state.random.choices(names, weights, k=args.requests)
+    latencies: dict[str, list[float]] = defaultdict(list)
+    errors: dict[str, int] = defaultdict(int)
+    queue = iter(plan)
+
+    async def worker() -> None:
+        for name in queue:
+            started = time.perf_counter()
+            status = await OPERATIONS[name](client, state)
+            latencies[name].append(time.perf_counter() - started)
+            if status >= 400:
+                errors[name] += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(args.concurrency)))
+    elapsed = time.perf_counter() - started
+
+    all_latencies = [value for values in latencies.values() for value in values]
+    return {
+        "revision": git_revision(),
+        "transport": "uvicorn" if args.uvicorn else "asgi",
+        "database": db_url.split("://", 1)[0],
+        "concurrency": args.concurrency,
+        "requests": args.requests,
+        "seconds": round(elapsed, 3),
+        "throughput_rps": round(args.requests / elapsed, 1),
+        "errors": sum(errors.values()),
+        "latency": summarize(all_latencies),
+        "operations": {
+            name: {
+                "count": len(latencies[name]),
+                "errors": errors[name],
+                "throughput_rps": round(len(latencies[name]) / elapsed, 1),
+                **summarize(latencies[name]),
+            }
+            for name in names
+        },
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--seed-users", type=int, default=50)
+    parser.add_argument("--mix", type=parse_mix, default=parse_mix(DEFAULT_MIX))
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--db-url",
+        help="DSN SQLAlchemy, например postgresql+asyncpg://... "
+        "(по умолчанию временный файл SQLite)",
+    )
+    parser.add_argument("--uvicorn", action="store_true", help="через сокет uvicorn")
+    parser.add_argument("--output", type=Path, help="записать JSON в файл")
+    args = parser.parse_args()
+
+    result = json.dumps(asyncio.run(run(args)), indent=2, ensure_ascii=False)
+    if args.output:
+        args.output.write_text(result + "\n")
+    print(result)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,15 +1,190 @@
-from typing import Any
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Iterator
 
 import aiohttp
 
+from bot.batching import DataLoader, SingleFlight
+from core.base.cache import TTLCache
 from core.base.config import settings
+from core.db.replicas import CLIENT_HEADER
+from src.api.pagination import NEXT_CURSOR_HEADER
 
+_client_id: ContextVar[str | None] = ContextVar("api_client_id", default=None)
 
-class APIClient:
+
+@contextmanager
+def acting_for(telegram_id: str | int) -> Iterator[None]:
+    """Запросы к API в блоке идут от имени пользователя Telegram.
+
+    API получает его в X-Client-ID и после записей пользователя читает
+    для него с основной БД (read-your-writes), не затрагивая остальных.
+    """
+    token = _client_id.set(str(telegram_id))
+    try:
+        yield
+    finally:
+        _client_id.reset(token)
+
+
+class APIError(Exception):
+    """Ответ API с кодом ошибки (4xx/5xx, кроме 404)."""
+
+    def __init__(self, status: int, detail: str):
+        super().__init__(f"API Error {status}: {detail}")
+        self.status = status
+        self.detail = detail
+
+
+class BaseAPIClient(ABC):
+    """Доступ бота к данным: через HTTP API или напрямую к БД.
+
+    Пользователи и баллы — словари в формате ответов API, None на 404,
+    APIError на остальные ошибки.
+    """
+
+    # Размер страницы, которыми читаются баллы пользователя (максимум API)
+    objects_page_size = 1000
+
+    @abstractmethod
+    async def start(self) -> None:
+        """Подготовить ресурсы клиента при запуске бота."""
+
+    @abstractmethod
+    async def close(self) -> None:
+        """Освободить ресурсы клиента."""
+
+    @abstractmethod
+    def pool_stats(self) -> dict[str, Any]:
+        """Счётчики запросов и состояние пула соединений."""
+
+    @abstractmethod
+    async def get_user(self, user_id: int) -> dict[str, Any] | None:
+        """Получить пользователя по ID."""
+
+    @abstractmethod
+    async def get_users_by_ids(self, ids: list[int]) -> list[dict[str, Any]]:
+        """Получить пользователей по списку ID одним запросом."""
+
+    @abstractmethod
+    async def get_user_by_telegram_id(self, telegram_id: str) -> dict[str, Any] | None:
+        """Получить пользователя по telegram_id."""
+
+    @abstractmethod
+    async def get_user_scores(self, telegram_id: str) -> dict[str, Any] | None:
+        """Получить пользователя по telegram_id вместе с баллами (objects)."""
+
+    @abstractmethod
+    async def create_user(
+        self,
+        first_name: str,
+        last_name: str,
+        full_name: str,
+        telegram_id: str,
+    ) -> dict[str, Any]:
+        """Создать пользователя."""
+
+    @abstractmethod
+    async def get_objects_by_user_id(self, user_id: int) -> list[dict[str, Any]]:
+        """Получить все объекты пользователя."""
+
+    @abstractmethod
+    async def create_object(
+        self,
+        name: str,
+        point: int,
+        user_id: int,
+    ) -> dict[str, Any]:
+        """Создать объект (балл)."""
+
+
+class APIClient(BaseAPIClient):
     """HTTP клиент для взаимодействия с API."""
 
-    def __init__(self, base_url: str | None = None):
+    def __init__(self, base_url: str | None = None, batch_users: bool | None = None):
         self.base_url = base_url or settings.API_BASE_URL
+        self.limit = settings.API_POOL_LIMIT
+        self.limit_per_host = settings.API_POOL_LIMIT_PER_HOST
+        self.keepalive_timeout = settings.API_KEEPALIVE_TIMEOUT
+        self.dns_cache_ttl = settings.API_DNS_CACHE_TTL
+        self.timeout = aiohttp.ClientTimeout(
+            total=settings.API_REQUEST_TIMEOUT,
+            connect=settings.API_CONNECT_TIMEOUT,
+        )
+        self._session: aiohttp.ClientSession | None = None
+        # Валидаторы GET ответов: ключ запроса -> (ETag, тело)
+        self._validators = TTLCache(
+            maxsize=settings.API_ETAG_CACHE_SIZE, ttl=settings.API_ETAG_CACHE_TTL
+        )
+        # Одинаковые одновременные GET и пакетная загрузка get_user
+        self._flight = SingleFlight()
+        self._user_loader: DataLoader[int, dict[str, Any]] | None = None
+        if settings.API_BATCH_USERS if batch_users is None else batch_users:
+            self._user_loader = DataLoader(
+                self._load_users,
+                window=settings.API_BATCH_WINDOW_MS / 1000,
+                max_batch=settings.API_BATCH_MAX_SIZE,
+            )
+        self._not_modified_total = 0
+        self._sessions_opened = 0
+        self._requests_total = 0
+        self._errors_total = 0
+        # Запросы в работе: каждый держит соединение пула
+        self._in_flight = 0
+
+    # ================== Session ==================
+
+    async def start(self) -> None:
+        """Открыть долгоживущую сессию с пулом соединений."""
+        if self._session is not None and not self._session.closed:
+            return
+        connector = aiohttp.TCPConnector(
+            limit=self.limit,
+            limit_per_host=self.limit_per_host,
+            keepalive_timeout=self.keepalive_timeout,
+            ttl_dns_cache=self.dns_cache_ttl,
+            use_dns_cache=True,
+        )
+        self._session = aiohttp.ClientSession(
+            connector=connector,
+            timeout=self.timeout,
+            # Одна сессия на всех пользователей: cookie client_id от API не
+            # хранить, клиент определяется заголовком X-Client-ID
+            cookie_jar=aiohttp.DummyCookieJar(),
+        )
+        self._sessions_opened += 1
+
+    async def close(self) -> None:
+        """Закрыть сессию и освободить соединения пула."""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+    async def _get_session(self) -> aiohttp.ClientSession:
+        """Вернуть открытую сессию, открыв её при необходимости."""
+        if self._session is None or self._session.closed:
+            await self.start()
+        assert self._session is not None
+        return self._session
+
+    def pool_stats(self) -> dict[str, Any]:
+        """Счётчики использования пула соединений для мониторинга.
+
+        in_flight считается самим клиентом: внутренние структуры
+        TCPConnector (_acquired, _conns) не являются API aiohttp.
+        """
+        return {
+            "limit": self.limit,
+            "limit_per_host": self.limit_per_host,
+            "sessions_opened": self._sessions_opened,
+            "requests_total": self._requests_total,
+            "errors_total": self._errors_total,
+            "not_modified_total": self._not_modified_total,
+            "coalesced_total": self._flight.shared,
+            "user_batches_total": self._user_loader.batches if self._user_loader else 0,
+            "in_flight": self._in_flight,
+        }
 
     async def _request(
         self,
@@ -17,33 +192,109 @@ class APIClient:
         endpoint: str,
         data: dict[str, Any] | None = None,
         params: dict[str, Any] | None = None,
+        paged: bool = False,
+    ) -> Any:
+        """Выполнить HTTP запрос.
+
+        Одинаковые одновременные GET запросы одного пользователя объединяются
+        в один (singleflight).
+        """
+        if method != "GET":
+            return await self._send(method, endpoint, data, params)
+        key = (_client_id.get(), endpoint, tuple(sorted((params or {}).items())))
+        return await self._flight.do(
+            key, lambda: self._send(method, endpoint, data, params, paged)
+        )
+
+    async def _send(
+        self,
+        method: str,
+        endpoint: str,
+        data: dict[str, Any] | None = None,
+        params: dict[str, Any] | None = None,
+        paged: bool = False,
     ) -> Any:
-        """Выполнить HTTP запрос."""
+        """Отправить HTTP запрос.
+
+        GET запросы условные: если для них сохранён ETag, отправляется
+        If-None-Match, и на 304 возвращается сохранённое тело. Для paged
+        запросов возвращается пара (тело, курсор следующей страницы).
+        """
         url = f"{self.base_url}{endpoint}"
+        session = await self._get_session()
+        self._requests_total += 1
+
+        headers = {}
+        client_id = _client_id.get()
+        if client_id is not None:
+            headers[CLIENT_HEADER] = client_id
+        cache_key = None
+        cached = None
+        if method == "GET":
+            cache_key = (endpoint, tuple(sorted((params or {}).items())))
+            found, cached = self._validators.get(cache_key)
+            if found:
+                headers["If-None-Match"] = cached[0]
 
-        async with aiohttp.ClientSession() as session:
+        self._in_flight += 1
+        try:
             async with session.request(
                 method=method,
                 url=url,
                 json=data,
                 params=params,
+                headers=headers,
             ) as response:
+                if response.status == 304 and cached is not None:
+                    self._not_modified_total += 1
+                    return cached[1]
                 if response.status == 404:
+                    if cache_key is not None:
+                        self._validators.invalidate(cache_key)
                     return None
                 if response.status >= 400:
+                    self._errors_total += 1
                     error = await response.text()
-                    raise Exception(f"API Error {response.status}: {error}")
-                return await response.json()
+                    raise APIError(response.status, error)
+                result = await response.json()
+                if paged:
+                    result = (result, response.headers.get(NEXT_CURSOR_HEADER))
+                etag = response.headers.get("ETag")
+                if cache_key is not None and etag:
+                    self._validators.set(cache_key, (etag, result))
+                return result
+        finally:
+            self._in_flight -= 1
 
     # ================== Users ==================
 
     async def get_user(self, user_id: int) -> dict[str, Any] | None:
-        """Получить пользователя по ID."""
+        """Получить пользователя по ID (пакетно, если включён API_BATCH_USERS)."""
+        if self._user_loader is not None:
+            return await self._user_loader.load(user_id)
         return await self._request("GET", f"/users/{user_id}")
 
+    async def get_users_by_ids(self, ids: list[int]) -> list[dict[str, Any]]:
+        """Получить пользователей по списку ID одним запросом."""
+        if not ids:
+            return []
+        result = await self._request(
+            "GET", "/users/", params={"ids": ",".join(map(str, ids))}
+        )
+        return result if isinstance(result, list) else []
+
+    async def _load_users(self, ids: list[int]) -> dict[int, dict[str, Any]]:
+        return {user["id"]: user for user in await self.get_users_by_ids(ids)}
+
     async def get_user_by_telegram_id(self, telegram_id: str) -> dict[str, Any] | None:
         """Получить пользователя по telegram_id."""
-        return await self._request("GET", f"/users/telegram/{telegram_id}")
+        with acting_for(telegram_id):
+            return await self._request("GET", f"/users/telegram/{telegram_id}")
+
+    async def get_user_scores(self, telegram_id: str) -> dict[str, Any] | None:
+        """Получить пользователя по telegram_id вместе с баллами (objects)."""
+        with acting_for(telegram_id):
+            return await self._request("GET", f"/users/telegram/{telegram_id}/scores")
 
     async def create_user(
         self,
@@ -59,15 +310,27 @@ class APIClient:
             "full_name": full_name,
             "telegram_id": telegram_id,
         }
-        result = await self._request("POST", "/users/", data=data)
+        with acting_for(telegram_id):
+            result = await self._request("POST", "/users/", data=data)
         return result or {}
 
     # ================== Objects (Scores) ==================
 
     async def get_objects_by_user_id(self, user_id: int) -> list[dict[str, Any]]:
-        """Получить все объекты пользователя."""
-        result = await self._request("GET", f"/objects/{user_id}")
-        return result if isinstance(result, list) else []
+        """Получить все объекты пользователя, проходя страницы по X-Next-Cursor."""
+        objects: list[dict[str, Any]] = []
+        params: dict[str, Any] = {"limit": self.objects_page_size}
+        while True:
+            result = await self._request(
+                "GET", f"/objects/{user_id}", params=params, paged=True
+            )
+            if result is None:
+                return objects
+            page, next_cursor = result
+            objects.extend(page)
+            if next_cursor is None:
+                return objects
+            params = {"limit": self.objects_page_size, "cursor": next_cursor}
 
     async def create_object(
         self,
@@ -85,5 +348,14 @@ class APIClient:
         return result or {}
 
 
+def create_api_client() -> BaseAPIClient:
+    """Клиент API из настроек: HTTP или встроенный (BOT_API_BACKEND)."""
+    if settings.BOT_API_BACKEND == "embedded":
+        from bot.embedded_client import EmbeddedAPIClient
+
+        return EmbeddedAPIClient()
+    return APIClient()
+
+
 # Глобальный экземпляр клиента
-api_client = APIClient()
+api_client = create_api_client()
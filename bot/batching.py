@@ -0,0 +1,107 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Generic, Hashable, Mapping, TypeVar
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+def _retrieve_exception(task: asyncio.Future) -> None:
+    # Ошибку получат ожидающие; если их не осталось — не логировать как забытую
+    if not task.cancelled():
+        task.exception()
+
+
+class SingleFlight:
+    """Одинаковые одновременные вызовы разделяют один выполняющийся запрос.
+
+    Запрос выполняется отдельной задачей: отмена одного из ожидающих не
+    отменяет его для остальных. Результат общий — не изменяйте его.
+    """
+
+    def __init__(self):
+        self._calls: dict[Hashable, asyncio.Task] = {}
+        self.shared = 0
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[V]]) -> V:
+        task = self._calls.get(key)
+        if task is None:
+            task = asyncio.ensure_future(fn())
+            self._calls[key] = task
+            task.add_done_callback(lambda t: self._forget(key, t))
+        else:
+            self.shared += 1
+        return await asyncio.shield(task)
+
+    def _forget(self, key: Hashable, task: asyncio.Task) -> None:
+        if self._calls.get(key) is task:
+            del self._calls[key]
+        _retrieve_exception(task)
+
+
+class DataLoader(Generic[K, V]):
+    """Объединяет load(key), вызванные в пределах window секунд, в один батч.
+
+    batch_fn получает список уникальных ключей и возвращает словарь
+    ключ -> значение; отсутствующим ключам достаётся None. Батч уходит
+    сразу при max_batch ключах.
+    """
+
+    def __init__(
+        self,
+        batch_fn: Callable[[list[K]], Awaitable[Mapping[K, V]]],
+        *,
+        window: float = 0.002,
+        max_batch: int = 100,
+    ):
+        self.batch_fn = batch_fn
+        self.window = window
+        self.max_batch = max_batch
+        self._pending: dict[K, asyncio.Future] = {}
+        self._handle: asyncio.TimerHandle | None = None
+        self._tasks: set[asyncio.Task] = set()
+        self.batches = 0
+        self.keys = 0
+
+    async def load(self, key: K) -> V | None:
+        future = self._pending.get(key)
+        if future is None:
+            loop = asyncio.get_running_loop()
+            future = self._pending[key] = loop.create_future()
+            if len(self._pending) >= self.max_batch:
+                self._dispatch()
+            elif self._handle is None:
+                self._handle = loop.call_later(self.window, self._dispatch)
+        return await asyncio.shield(future)
+
+    def _dispatch(self) -> None:
+        if self._handle is not None:
+            self._handle.cancel()
+            self._handle = None
+        batch, self._pending = self._pending, {}
+        task = asyncio.create_task(self._run(batch))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, batch: dict[K, asyncio.Future]) -> None:
+        self.batches += 1
+        self.keys += len(batch)
+        try:
+            results = await self.batch_fn(list(batch))
+        except Exception as e:
+            for future in batch.values():
+                if not future.done():
+                    future.set_exception(e)
+                    _retrieve_exception(future)
+            return
+        except BaseException:
+            # Батч отменён (например, при остановке цикла): load() получат
+            # CancelledError, а не будут ждать вечно
+            for future in batch.values():
+                future.cancel()
+            raise
+        for key, future in batch.items():
+            if not future.done():
+                future.set_result(results.get(key))
+
+    def stats(self) -> dict[str, Any]:
+        return {"batches": self.batches, "keys": self.keys}
@@ -0,0 +1,246 @@
+"""Рассылка сообщения всем пользователям с возобновлением после сбоя.
+
+Запуск: python -m bot.broadcast --name results-2026 --text "Результаты опубликованы"
+Повторный запуск с тем же --name продолжает с места остановки.
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import time
+from collections import deque
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, AsyncIterator
+
+from aiogram import Bot
+from aiogram.exceptions import TelegramBadRequest, TelegramForbiddenError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from core.base.config import settings
+from core.base.metrics import metrics
+from core.db.session import AsyncSessionLocal
+from src.app.users.crud import user_crud
+from src.app.users.model import User
+
+logger = logging.getLogger(__name__)
+
+bot_broadcast_messages_total = metrics.counter(
+    "bot_broadcast_messages_total",
+    "Сообщения рассылок по результату.",
+    ("status",),
+)
+
+
+@dataclass
+class Checkpoint:
+    """Прогресс рассылки: все пользователи с id <= last_user_id обработаны."""
+
+    name: str
+    text: str
+    last_user_id: int = 0
+    sent: int = 0
+    blocked: int = 0
+    failed: int = 0
+    finished: bool = False
+
+    @classmethod
+    def load(cls, path: Path) -> "Checkpoint | None":
+        if not path.exists():
+            return None
+        return cls(**json.loads(path.read_text()))
+
+    def save(self, path: Path) -> None:
+        """Записать атомарно: при сбое остаётся прежняя версия файла."""
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(asdict(self), ensure_ascii=False))
+        os.replace(tmp, path)
+
+
+class Broadcast:
+    """Рассылка text всем пользователям из таблицы users.
+
+    Пользователи читаются keyset страницами по id (короткий запрос на
+    страницу, без долгой транзакции), отправка идёт concurrency воркерами
+    через сессию бота, так что лимиты RateLimiter соблюдаются. В checkpoint
+    раз в checkpoint_interval секунд пишется наибольший id, до которого
+    обработаны все пользователи; после сбоя повтор возможен только для
+    сообщений, бывших в работе (не больше concurrency).
+    """
+
+    def __init__(
+        self,
+        bot: Bot,
+        text: str,
+        *,
+        name: str,
+        session_maker: async_sessionmaker[AsyncSession] = AsyncSessionLocal,
+        checkpoint_dir: str | Path = settings.BROADCAST_DIR,
+        page_size: int = 500,
+        concurrency: int = 50,
+        checkpoint_interval: float = 5.0,
+        report_interval: float = 10.0,
+    ):
+        self.bot = bot
+        self.session_maker = session_maker
+        self.path = Path(checkpoint_dir) / f"{name}.json"
+        self.page_size = page_size
+        self.concurrency = concurrency
+        self.checkpoint_interval = checkpoint_interval
+        self.report_interval = report_interval
+
+        checkpoint = Checkpoint.load(self.path)
+        if checkpoint is not None and checkpoint.text != text:
+            raise ValueError(f"Рассылка {name!r} уже начата с другим текстом")
+        self.checkpoint = checkpoint or Checkpoint(name=name, text=text)
+        # Выданные воркерам id по порядку и завершённые из них
+        self._issued: deque[int] = deque()
+        self._done: set[int] = set()
+        self._started = 0.0
+        self._processed_before = 0
+
+    async def _pages(self) -> AsyncIterator[list[dict[str, Any]]]:
+        """Пачки (id, chat_id) пользователей после last_user_id."""
+        last_id = self.checkpoint.last_user_id
+        while True:
+            async with self.session_maker() as db:
+                rows, _ = await user_crud.get_page_rows(
+                    db,
+                    fields=["id", "telegram_id"],
+                    limit=self.page_size,
+                    where=[User.id > last_id],
+                )
+            if not rows:
+                return
+            yield rows
+            last_id = rows[-1]["id"]
+
+    async def _produce(self, queue: asyncio.Queue) -> None:
+        async for rows in self._pages():
+            for row in rows:
+                self._issued.append(row["id"])
+                await queue.put(row)
+        for _ in range(self.concurrency):
+            await queue.put(None)
+
+    async def _send(self, row: dict[str, Any]) -> str:
+        try:
+            await self.bot.send_message(int(row["telegram_id"]), self.checkpoint.text)
+        except TelegramForbiddenError:
+            return "blocked"
+        except (TelegramBadRequest, ValueError) as e:
+            logger.warning("Не удалось отправить пользователю %s: %s", row["id"], e)
+            return "failed"
+        except Exception:
+            logger.exception("Ошибка отправки пользователю %s", row["id"])
+            return "failed"
+        return "sent"
+
+    def _complete(self, user_id: int, status: str) -> None:
+        checkpoint = self.checkpoint
+        setattr(checkpoint, status, getattr(checkpoint, status) + 1)
+        bot_broadcast_messages_total.inc(status)
+        self._done.add(user_id)
+        while self._issued and self._issued[0] in self._done:
+            checkpoint.last_user_id = self._issued.popleft()
+            self._done.discard(checkpoint.last_user_id)
+
+    async def _worker(self, queue: asyncio.Queue) -> None:
+        while (row := await queue.get()) is not None:
+            self._complete(row["id"], await self._send(row))
+
+    async def _periodic(self) -> None:
+        last_report = time.perf_counter()
+        while True:
+            await asyncio.sleep(self.checkpoint_interval)
+            self.checkpoint.save(self.path)
+            if time.perf_counter() - last_report >= self.report_interval:
+                last_report = time.perf_counter()
+                logger.info("Рассылка %s: %s", self.checkpoint.name, self.report())
+
+    def report(self) -> dict[str, Any]:
+        """Счётчики и скорость отправки текущего запуска."""
+        checkpoint = self.checkpoint
+        elapsed = time.perf_counter() - self._started if self._started else 0.0
+        processed = checkpoint.sent + checkpoint.blocked + checkpoint.failed
+        run_processed = processed - self._processed_before
+        return {
+            "name": checkpoint.name,
+            "last_user_id": checkpoint.last_user_id,
+            "sent": checkpoint.sent,
+            "blocked": checkpoint.blocked,
+            "failed": checkpoint.failed,
+            "finished": checkpoint.finished,
+            "seconds": round(elapsed, 3),
+            "messages_per_second": (
+                round(run_processed / elapsed, 1) if elapsed else 0.0
+            ),
+        }
+
+    async def run(self) -> dict[str, Any]:
+        """Разослать сообщение оставшимся пользователям и вернуть отчёт."""
+        checkpoint = self.checkpoint
+        if checkpoint.finished:
+            return self.report()
+        if checkpoint.last_user_id:
+            logger.info(
+                "Продолжение рассылки %s после id %d",
+                checkpoint.name,
+                checkpoint.last_user_id,
+            )
+        self._started = time.perf_counter()
+        self._processed_before = (
+            checkpoint.sent + checkpoint.blocked + checkpoint.failed
+        )
+
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.concurrency * 2)
+        periodic = asyncio.create_task(self._periodic())
+        try:
+            # При ошибке одной задачи остальные отменяются
+            async with asyncio.TaskGroup() as group:
+                group.create_task(self._produce(queue))
+                for _ in range(self.concurrency):
+                    group.create_task(self._worker(queue))
+            checkpoint.finished = True
+        finally:
+            periodic.cancel()
+            checkpoint.save(self.path)
+        report = self.report()
+        logger.info("Рассылка %s завершена: %s", checkpoint.name, report)
+        return report
+
+
+async def run_cli(args: argparse.Namespace) -> dict[str, Any]:
+    from bot.main import create_bot
+
+    bot = create_bot()
+    try:
+        broadcast = Broadcast(
+            bot,
+            args.text,
+            name=args.name,
+            page_size=args.page_size,
+            concurrency=args.concurrency,
+        )
+        return await broadcast.run()
+    finally:
+        await bot.session.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--name", required=True, help="имя рассылки (checkpoint)")
+    parser.add_argument("--text", required=True)
+    parser.add_argument("--page-size", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=50)
+    args = parser.parse_args()
+    print(json.dumps(asyncio.run(run_cli(args)), ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,14 @@
+from core.base.cache import TTLCache
+from core.base.config import settings
+
+__all__ = (
+    "TTLCache",
+    "user_cache",
+)
+
+# Кэш пользователей по telegram_id
+user_cache = TTLCache(
+    maxsize=settings.USER_CACHE_SIZE,
+    ttl=settings.USER_CACHE_TTL,
+    negative_ttl=settings.USER_CACHE_NEGATIVE_TTL,
+)
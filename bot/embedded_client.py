@@ -0,0 +1,143 @@
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator
+
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from bot.api_client import APIError, BaseAPIClient
+from core.db.pool import pool_status
+from core.db.session import AsyncSessionLocal
+from src.app.objects.crud import object_crud
+from src.app.objects.schema import ObjectCreate, ObjectRead
+from src.app.objects.service import ObjectService
+from src.app.users.crud import user_crud
+from src.app.users.model import User
+from src.app.users.schema import UserCreate, UserRead, UserRow, UserScoresRead
+
+
+class EmbeddedAPIClient(BaseAPIClient):
+    """Клиент API без HTTP: вызывает CRUD и сервисы в процессе бота.
+
+    Для развёртываний, где бот и API работают рядом над одной БД.
+    Ответы совпадают с HTTP клиентом (см. BaseAPIClient).
+    """
+
+    def __init__(
+        self, session_maker: async_sessionmaker[AsyncSession] = AsyncSessionLocal
+    ):
+        self.session_maker = session_maker
+        self._requests_total = 0
+        self._errors_total = 0
+
+    async def start(self) -> None:
+        pass
+
+    async def close(self) -> None:
+        pass
+
+    def pool_stats(self) -> dict[str, Any]:
+        """Счётчики вызовов и состояние пула соединений с БД."""
+        return {
+            "backend": "embedded",
+            "requests_total": self._requests_total,
+            "errors_total": self._errors_total,
+            **pool_status(self.session_maker.kw["bind"]),
+        }
+
+    @asynccontextmanager
+    async def _session(self) -> AsyncIterator[AsyncSession]:
+        """Сессия на один вызов, как сессия на один запрос в API."""
+        self._requests_total += 1
+        try:
+            async with self.session_maker() as db:
+                yield db
+        except APIError:
+            self._errors_total += 1
+            raise
+        except SQLAlchemyError as e:
+            self._errors_total += 1
+            raise APIError(500, "Internal Server Error") from e
+
+    # ================== Users ==================
+
+    async def get_user(self, user_id: int) -> dict[str, Any] | None:
+        """Получить пользователя по ID."""
+        async with self._session() as db:
+            user = await user_crud.get_by_id(db, user_id)
+        return None if user is None else UserRead.model_validate(user).model_dump()
+
+    async def get_users_by_ids(self, ids: list[int]) -> list[dict[str, Any]]:
+        """Получить пользователей по списку ID одним запросом."""
+        if not ids:
+            return []
+        unique_ids = sorted(set(ids))
+        async with self._session() as db:
+            users, _ = await user_crud.get_page_rows(
+                db,
+                fields=list(UserRow.__annotations__),
+                limit=len(unique_ids),
+                where=[User.id.in_(unique_ids)],
+            )
+        return users
+
+    async def get_user_by_telegram_id(self, telegram_id: str) -> dict[str, Any] | None:
+        """Получить пользователя по telegram_id."""
+        async with self._session() as db:
+            user = await user_crud.get_user_by_telegram_id(db, telegram_id)
+        return None if user is None else UserRead.model_validate(user).model_dump()
+
+    async def get_user_scores(self, telegram_id: str) -> dict[str, Any] | None:
+        """Получить пользователя по telegram_id вместе с баллами (objects)."""
+        async with self._session() as db:
+            user = await user_crud.get_user_with_objects(db, telegram_id)
+            if user is None:
+                return None
+            return UserScoresRead.model_validate(user).model_dump()
+
+    async def create_user(
+        self,
+        first_name: str,
+        last_name: str,
+        full_name: str,
+        telegram_id: str,
+    ) -> dict[str, Any]:
+        """Создать пользователя."""
+        obj_in = UserCreate(
+            first_name=first_name,
+            last_name=last_name,
+            full_name=full_name,
+            telegram_id=telegram_id,
+        )
+        async with self._session() as db:
+            user = await user_crud.create(db, obj_in=obj_in)
+        return UserRead.model_validate(user).model_dump()
+
+    # ================== Objects (Scores) ==================
+
+    async def get_objects_by_user_id(self, user_id: int) -> list[dict[str, Any]]:
+        """Получить все объекты пользователя, проходя страницы по курсору."""
+        objects: list[dict[str, Any]] = []
+        cursor = None
+        async with self._session() as db:
+            while True:
+                page, cursor = await object_crud.get_objects_page_by_user_id(
+                    db, user_id, limit=self.objects_page_size, cursor=cursor
+                )
+                objects.extend(dict(obj) for obj in page)
+                if cursor is None:
+                    return objects
+
+    async def create_object(
+        self,
+        name: str,
+        point: int,
+        user_id: int,
+    ) -> dict[str, Any]:
+        """Создать объект (балл)."""
+        obj_in = ObjectCreate(name=name, point=point, user_id=user_id)
+        async with self._session() as db:
+            service = ObjectService(db=db, object_crud=object_crud)
+            obj = await service.create_new_object(user_id=user_id, object_in=obj_in)
+            if obj is None:
+                raise APIError(400, "Object already exists")
+        return ObjectRead.model_validate(obj).model_dump()
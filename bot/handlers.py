@@ -1,15 +1,18 @@
+from typing import Any
+
 from aiogram import F, Router
 from aiogram.filters import Command
 from aiogram.fsm.context import FSMContext
 from aiogram.types import Message
 
 from bot.api_client import api_client
+from bot.cache import user_cache
 from bot.keyboards import (
+    CANCEL_KEYBOARD,
+    MAIN_KEYBOARD,
+    START_KEYBOARD,
     SUBJECTS,
-    get_cancel_keyboard,
-    get_main_keyboard,
-    get_start_keyboard,
-    get_subjects_keyboard,
+    SUBJECTS_KEYBOARD,
 )
 from bot.states import RegistrationState, ScoreState
 
@@ -20,23 +23,23 @@ router = Router()
 
 
 @router.message(Command("start"))
-async def cmd_start(message: Message, state: FSMContext):
+async def cmd_start(
+    message: Message, state: FSMContext, user: dict[str, Any] | None = None
+):
     """Обработчик команды /start."""
     await state.clear()
 
-    user = await api_client.get_user_by_telegram_id(str(message.from_user.id))
-
     if user:
         await state.update_data(user_id=user["id"])
         await message.answer(
             f"👋 Привет, {user['first_name']}!\n\nВыбери действие:",
-            reply_markup=get_main_keyboard(),
+            reply_markup=MAIN_KEYBOARD,
         )
     else:
         await message.answer(
             "👋 Привет! Я бот для учёта баллов ЕГЭ.\n\n"
             "Для начала работы нужно зарегистрироваться.",
-            reply_markup=get_start_keyboard(),
+            reply_markup=START_KEYBOARD,
         )
 
 
@@ -45,18 +48,17 @@ async def cmd_start(message: Message, state: FSMContext):
 
 @router.message(Command("register"))
 @router.message(F.text == "📋 Зарегистрироваться")
-async def cmd_register(message: Message, state: FSMContext):
+async def cmd_register(
+    message: Message, state: FSMContext, user: dict[str, Any] | None = None
+):
     """Начало регистрации."""
-    user = await api_client.get_user_by_telegram_id(str(message.from_user.id))
     if user:
         await state.update_data(user_id=user["id"])
-        await message.answer(
-            "✅ Вы уже зарегистрированы!", reply_markup=get_main_keyboard()
-        )
+        await message.answer("✅ Вы уже зарегистрированы!", reply_markup=MAIN_KEYBOARD)
         return
 
     await state.set_state(RegistrationState.waiting_first_name)
-    await message.answer("📝 Введите ваше имя:", reply_markup=get_cancel_keyboard())
+    await message.answer("📝 Введите ваше имя:", reply_markup=CANCEL_KEYBOARD)
 
 
 @router.message(RegistrationState.waiting_first_name, F.text == "❌ Отмена")
@@ -64,7 +66,7 @@ async def cmd_register(message: Message, state: FSMContext):
 async def cancel_registration(message: Message, state: FSMContext):
     """Отмена регистрации."""
     await state.clear()
-    await message.answer("❌ Регистрация отменена.", reply_markup=get_start_keyboard())
+    await message.answer("❌ Регистрация отменена.", reply_markup=START_KEYBOARD)
 
 
 @router.message(RegistrationState.waiting_first_name)
@@ -72,7 +74,7 @@ async def process_first_name(message: Message, state: FSMContext):
     """Обработка имени."""
     await state.update_data(first_name=message.text.strip())
     await state.set_state(RegistrationState.waiting_last_name)
-    await message.answer("📝 Введите вашу фамилию:", reply_markup=get_cancel_keyboard())
+    await message.answer("📝 Введите вашу фамилию:", reply_markup=CANCEL_KEYBOARD)
 
 
 @router.message(RegistrationState.waiting_last_name)
@@ -83,19 +85,21 @@ async def process_last_name(message: Message, state: FSMContext):
     last_name = message.text.strip()
     full_name = f"{first_name} {last_name}"
 
+    telegram_id = str(message.from_user.id)
     user = await api_client.create_user(
         first_name=first_name,
         last_name=last_name,
         full_name=full_name,
-        telegram_id=str(message.from_user.id),
+        telegram_id=telegram_id,
     )
+    user_cache.set(telegram_id, user)
 
     await state.clear()
     await state.update_data(user_id=user["id"])
 
     await message.answer(
         f"✅ Регистрация завершена!\n\nДобро пожаловать, {full_name}!",
-        reply_markup=get_main_keyboard(),
+        reply_markup=MAIN_KEYBOARD,
     )
 
 
@@ -104,25 +108,26 @@ async def process_last_name(message: Message, state: FSMContext):
 
 @router.message(Command("select_subject"))
 @router.message(F.text == "📚 Выбрать предмет")
-async def cmd_select_subject(message: Message, state: FSMContext):
+async def cmd_select_subject(
+    message: Message, state: FSMContext, user: dict[str, Any] | None = None
+):
     """Выбор предмета."""
-    user = await api_client.get_user_by_telegram_id(str(message.from_user.id))
     if not user:
         await message.answer(
-            "⚠️ Сначала зарегистрируйтесь.", reply_markup=get_start_keyboard()
+            "⚠️ Сначала зарегистрируйтесь.", reply_markup=START_KEYBOARD
         )
         return
 
     await state.update_data(user_id=user["id"])
     await state.set_state(ScoreState.waiting_subject)
-    await message.answer("📚 Выберите предмет:", reply_markup=get_subjects_keyboard())
+    await message.answer("📚 Выберите предмет:", reply_markup=SUBJECTS_KEYBOARD)
 
 
 @router.message(ScoreState.waiting_subject, F.text == "❌ Отмена")
 async def cancel_subject_selection(message: Message, state: FSMContext):
     """Отмена выбора предмета."""
     await state.set_state(None)
-    await message.answer("❌ Выбор предмета отменён.", reply_markup=get_main_keyboard())
+    await message.answer("❌ Выбор предмета отменён.", reply_markup=MAIN_KEYBOARD)
 
 
 @router.message(ScoreState.waiting_subject, F.text.in_(SUBJECTS))
@@ -135,7 +140,7 @@ async def process_subject(message: Message, state: FSMContext):
     await message.answer(
         f"📝 Предмет: <b>{subject}</b>\n\nВведите балл (0-100):",
         parse_mode="HTML",
-        reply_markup=get_cancel_keyboard(),
+        reply_markup=CANCEL_KEYBOARD,
     )
 
 
@@ -143,7 +148,7 @@ async def process_subject(message: Message, state: FSMContext):
 async def cancel_score_input(message: Message, state: FSMContext):
     """Отмена ввода балла."""
     await state.set_state(None)
-    await message.answer("❌ Ввод балла отменён.", reply_markup=get_main_keyboard())
+    await message.answer("❌ Ввод балла отменён.", reply_markup=MAIN_KEYBOARD)
 
 
 @router.message(ScoreState.waiting_score)
@@ -170,7 +175,7 @@ async def process_score(message: Message, state: FSMContext):
     await state.set_state(None)
     await message.answer(
         f"✅ Сохранено!\n\n📚 {subject}: {score} баллов",
-        reply_markup=get_main_keyboard(),
+        reply_markup=MAIN_KEYBOARD,
     )
 
 
@@ -179,16 +184,18 @@ async def process_score(message: Message, state: FSMContext):
 
 @router.message(Command("view_scores"))
 @router.message(F.text == "📊 Мои баллы")
-async def cmd_view_scores(message: Message, state: FSMContext):
+async def cmd_view_scores(
+    message: Message, state: FSMContext, user: dict[str, Any] | None = None
+):
     """Просмотр всех баллов."""
-    user = await api_client.get_user_by_telegram_id(str(message.from_user.id))
     if not user:
         await message.answer(
-            "⚠️ Сначала зарегистрируйтесь.", reply_markup=get_start_keyboard()
+            "⚠️ Сначала зарегистрируйтесь.", reply_markup=START_KEYBOARD
         )
         return
 
-    objects = await api_client.get_objects_by_user_id(user["id"])
+    scores = await api_client.get_user_scores(user["telegram_id"])
+    objects = scores["objects"] if scores else []
 
     if not objects:
         text = "📭 У вас пока нет сохранённых баллов.\n\nИспользуйте «📚 Выбрать предмет» для добавления."
@@ -198,4 +205,4 @@ async def cmd_view_scores(message: Message, state: FSMContext):
             lines.append(f"• {obj['name']}: <b>{obj['point']}</b>")
         text = "\n".join(lines)
 
-    await message.answer(text, parse_mode="HTML", reply_markup=get_main_keyboard())
+    await message.answer(text, parse_mode="HTML", reply_markup=MAIN_KEYBOARD)
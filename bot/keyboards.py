@@ -1,8 +1,15 @@
+from typing import Any
+
+from aiogram import Bot
+from aiogram.client.session.aiohttp import AiohttpSession
+from aiogram.methods import TelegramMethod
 from aiogram.types import (
     KeyboardButton,
     ReplyKeyboardMarkup,
     ReplyKeyboardRemove,
 )
+from aiohttp import FormData
+from pydantic import ConfigDict
 
 SUBJECTS = [
     "Математика",
@@ -18,51 +25,90 @@ SUBJECTS = [
 ]
 
 
-def get_main_keyboard() -> ReplyKeyboardMarkup:
-    """Главная клавиатура."""
-    return ReplyKeyboardMarkup(
-        keyboard=[
-            [
-                KeyboardButton(text="📚 Выбрать предмет"),
-                KeyboardButton(text="📊 Мои баллы"),
-            ],
-        ],
+class FrozenReplyKeyboardMarkup(ReplyKeyboardMarkup):
+    """Неизменяемая клавиатура: создаётся один раз и переиспользуется."""
+
+    model_config = ConfigDict(frozen=True)
+
+
+class FrozenReplyKeyboardRemove(ReplyKeyboardRemove):
+    model_config = ConfigDict(frozen=True)
+
+
+def _reply_keyboard(rows: list[list[str]]) -> FrozenReplyKeyboardMarkup:
+    return FrozenReplyKeyboardMarkup(
+        keyboard=[[KeyboardButton(text=text) for text in row] for row in rows],
         resize_keyboard=True,
     )
 
 
+MAIN_KEYBOARD = _reply_keyboard([["📚 Выбрать предмет", "📊 Мои баллы"]])
+START_KEYBOARD = _reply_keyboard([["📋 Зарегистрироваться"]])
+CANCEL_KEYBOARD = _reply_keyboard([["❌ Отмена"]])
+SUBJECTS_KEYBOARD = _reply_keyboard(
+    [SUBJECTS[i : i + 2] for i in range(0, len(SUBJECTS), 2)] + [["❌ Отмена"]]
+)
+REMOVE_KEYBOARD = FrozenReplyKeyboardRemove()
+
+# id готовых клавиатур: их JSON кэширует CachedMarkupSession
+PREBUILT_MARKUPS = frozenset(
+    id(markup)
+    for markup in (
+        MAIN_KEYBOARD,
+        START_KEYBOARD,
+        CANCEL_KEYBOARD,
+        SUBJECTS_KEYBOARD,
+        REMOVE_KEYBOARD,
+    )
+)
+
+
+def get_main_keyboard() -> ReplyKeyboardMarkup:
+    """Главная клавиатура."""
+    return MAIN_KEYBOARD
+
+
 def get_start_keyboard() -> ReplyKeyboardMarkup:
     """Клавиатура для незарегистрированных."""
-    return ReplyKeyboardMarkup(
-        keyboard=[
-            [KeyboardButton(text="📋 Зарегистрироваться")],
-        ],
-        resize_keyboard=True,
-    )
+    return START_KEYBOARD
 
 
 def get_cancel_keyboard() -> ReplyKeyboardMarkup:
     """Клавиатура отмены."""
-    return ReplyKeyboardMarkup(
-        keyboard=[
-            [KeyboardButton(text="❌ Отмена")],
-        ],
-        resize_keyboard=True,
-    )
+    return CANCEL_KEYBOARD
 
 
 def get_subjects_keyboard() -> ReplyKeyboardMarkup:
     """Клавиатура выбора предмета."""
-    buttons = []
-    for i in range(0, len(SUBJECTS), 2):
-        row = [KeyboardButton(text=SUBJECTS[i])]
-        if i + 1 < len(SUBJECTS):
-            row.append(KeyboardButton(text=SUBJECTS[i + 1]))
-        buttons.append(row)
-    buttons.append([KeyboardButton(text="❌ Отмена")])
-    return ReplyKeyboardMarkup(keyboard=buttons, resize_keyboard=True)
+    return SUBJECTS_KEYBOARD
 
 
 def remove_keyboard() -> ReplyKeyboardRemove:
     """Убрать клавиатуру."""
-    return ReplyKeyboardRemove()
+    return REMOVE_KEYBOARD
+
+
+class CachedMarkupSession(AiohttpSession):
+    """Сессия бота, сериализующая готовые клавиатуры один раз.
+
+    Для остальных reply_markup поведение как у AiohttpSession.
+    """
+
+    def __init__(self, **kwargs: Any):
+        super().__init__(**kwargs)
+        self._markup_json: dict[int, str] = {}
+
+    def build_form_data(self, bot: Bot, method: TelegramMethod[Any]) -> FormData:
+        markup = getattr(method, "reply_markup", None)
+        if markup is None or id(markup) not in PREBUILT_MARKUPS:
+            return super().build_form_data(bot, method)
+        encoded = self._markup_json.get(id(markup))
+        if encoded is None:
+            encoded = self._markup_json[id(markup)] = self.prepare_value(
+                markup.model_dump(warnings=False), bot=bot, files={}
+            )
+        form = super().build_form_data(
+            bot, method.model_copy(update={"reply_markup": None})
+        )
+        form.add_field("reply_markup", encoded)
+        return form
@@ -3,10 +3,20 @@ import logging
 
 from aiogram import Bot, Dispatcher
 from aiogram.client.default import DefaultBotProperties
+from aiogram.dispatcher.event.handler import HandlerObject
 from aiogram.enums import ParseMode
+from aiogram.fsm.storage.base import BaseStorage
 from aiogram.fsm.storage.memory import MemoryStorage
+from aiohttp import web
 
+from bot.api_client import api_client
 from bot.handlers import router
+from bot.keyboards import CachedMarkupSession
+from bot.middlewares import UserMiddleware
+from bot.ratelimit import RateLimiter
+from bot.scheduler import ChatScheduler
+from bot.storage import SQLiteStorage
+from bot.webhook import create_app
 from core.base.config import settings
 
 logging.basicConfig(
@@ -16,20 +26,130 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
-async def main():
-    """Запуск бота."""
+async def on_startup() -> None:
+    """Открыть пул соединений с API."""
+    await api_client.start()
+    logger.info("HTTP сессия API открыта: %s", api_client.pool_stats())
+
+
+async def on_shutdown() -> None:
+    """Закрыть пул соединений с API."""
+    logger.info("Статистика пула API: %s", api_client.pool_stats())
+    await api_client.close()
+
+
+def create_storage() -> BaseStorage:
+    """FSM хранилище из настроек."""
+    if not settings.FSM_STORAGE_PATH:
+        return MemoryStorage()
+    return SQLiteStorage(
+        settings.FSM_STORAGE_PATH,
+        shards=settings.FSM_STORAGE_SHARDS,
+        batch_size=settings.FSM_BATCH_SIZE,
+    )
+
+
+def create_dispatcher() -> Dispatcher:
+    """Диспетчер с роутерами, middleware и хуками запуска."""
+    dp = Dispatcher(storage=create_storage())
+
+    dp.message.outer_middleware(UserMiddleware())
+    dp.include_router(router)
+    dp.startup.register(on_startup)
+    dp.shutdown.register(on_shutdown)
+
+    if settings.BOT_SCHEDULER_WORKERS > 0:
+        scheduler = ChatScheduler(
+            workers=settings.BOT_SCHEDULER_WORKERS,
+            max_pending=settings.BOT_SCHEDULER_MAX_PENDING,
+        )
+        dp.update.outer_middleware(scheduler)
+
+        async def stop_scheduler() -> None:
+            await scheduler.stop()
+            logger.info("Очереди апдейтов: %s", scheduler.stats())
+
+        # Дообработать очереди до закрытия FSM хранилища и клиента API
+        dp.shutdown.handlers.insert(0, HandlerObject(callback=stop_scheduler))
+    return dp
+
+
+async def run_polling(bot: Bot, dp: Dispatcher) -> None:
+    """Long polling: апдейты обрабатываются задачами по мере получения.
+
+    С очередями по чатам апдейты только ставятся в очередь, поэтому
+    отдельные задачи aiogram не нужны, а заполненные очереди задерживают
+    следующий getUpdates.
+    """
+    await bot.delete_webhook(drop_pending_updates=True)
+    await dp.start_polling(bot, handle_as_tasks=settings.BOT_SCHEDULER_WORKERS <= 0)
+
+
+async def run_webhook(bot: Bot, dp: Dispatcher) -> None:
+    """Вебхук: aiohttp сервер на WEBHOOK_HOST:WEBHOOK_PORT."""
+    if not settings.WEBHOOK_SECRET:
+        logger.warning("WEBHOOK_SECRET не задан: вебхук примет любой запрос")
+    webhook_url = (
+        settings.WEBHOOK_BASE_URL.rstrip("/") + settings.WEBHOOK_PATH
+        if settings.WEBHOOK_BASE_URL
+        else None
+    )
+    app = create_app(
+        dp,
+        bot,
+        path=settings.WEBHOOK_PATH,
+        secret_token=settings.WEBHOOK_SECRET or None,
+        max_in_flight=settings.WEBHOOK_MAX_IN_FLIGHT,
+        webhook_url=webhook_url,
+        max_connections=settings.WEBHOOK_MAX_CONNECTIONS,
+    )
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, settings.WEBHOOK_HOST, settings.WEBHOOK_PORT)
+    await site.start()
+    logger.info(
+        "Вебхук слушает %s:%s%s",
+        settings.WEBHOOK_HOST,
+        settings.WEBHOOK_PORT,
+        settings.WEBHOOK_PATH,
+    )
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await runner.cleanup()
+
+
+def create_bot() -> Bot:
+    """Бот с ограничителем исходящих запросов из настроек."""
     bot = Bot(
         token=settings.BOT_TOKEN,
+        session=CachedMarkupSession(),
         default=DefaultBotProperties(parse_mode=ParseMode.HTML),
     )
-    dp = Dispatcher(storage=MemoryStorage())
+    if settings.BOT_RATE_LIMIT_GLOBAL > 0:
+        bot.session.middleware(
+            RateLimiter(
+                global_rate=settings.BOT_RATE_LIMIT_GLOBAL,
+                chat_rate=settings.BOT_RATE_LIMIT_CHAT,
+                chat_burst=settings.BOT_RATE_LIMIT_CHAT_BURST,
+                group_rate=settings.BOT_RATE_LIMIT_GROUP,
+                retries=settings.BOT_RATE_LIMIT_RETRIES,
+            )
+        )
+    return bot
 
-    dp.include_router(router)
 
-    logger.info("Бот запущен")
+async def main():
+    """Запуск бота в режиме BOT_MODE."""
+    bot = create_bot()
+    dp = create_dispatcher()
 
-    await bot.delete_webhook(drop_pending_updates=True)
-    await dp.start_polling(bot)
+    logger.info("Бот запущен (%s)", settings.BOT_MODE)
+
+    if settings.BOT_MODE == "webhook":
+        await run_webhook(bot, dp)
+    else:
+        await run_polling(bot, dp)
 
 
 if __name__ == "__main__":
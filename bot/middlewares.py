@@ -0,0 +1,44 @@
+from typing import Any, Awaitable, Callable
+
+from aiogram import BaseMiddleware
+from aiogram.types import TelegramObject
+
+from bot.api_client import BaseAPIClient, acting_for, api_client
+from bot.cache import TTLCache, user_cache
+
+
+class UserMiddleware(BaseMiddleware):
+    """Определяет пользователя по telegram_id один раз на апдейт.
+
+    Запросы к API за время апдейта идут от имени пользователя (acting_for).
+    """
+
+    def __init__(
+        self, client: BaseAPIClient = api_client, cache: TTLCache = user_cache
+    ):
+        self.client = client
+        self.cache = cache
+
+    async def resolve(self, telegram_id: str) -> dict[str, Any] | None:
+        """Получить пользователя из кэша или из API."""
+        found, user = self.cache.get(telegram_id)
+        if found:
+            return user
+        user = await self.client.get_user_by_telegram_id(telegram_id)
+        self.cache.set(telegram_id, user)
+        return user
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: dict[str, Any],
+    ) -> Any:
+        from_user = data.get("event_from_user")
+        if from_user is None:
+            data["user"] = None
+            return await handler(event, data)
+        # Все запросы к API за время апдейта — от имени этого пользователя
+        with acting_for(from_user.id):
+            data["user"] = await self.resolve(str(from_user.id))
+            return await handler(event, data)
@@ -0,0 +1,162 @@
+import asyncio
+import logging
+from typing import Any, Callable
+
+from aiogram import Bot
+from aiogram.client.session.middlewares.base import (
+    BaseRequestMiddleware,
+    NextRequestMiddlewareType,
+)
+from aiogram.exceptions import TelegramRetryAfter
+from aiogram.methods import Response, TelegramMethod
+from aiogram.methods.base import TelegramType
+
+from bot.scheduler import worker_released
+from core.base.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+SEND_WAIT_BUCKETS = (0, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+bot_send_wait_seconds = metrics.histogram(
+    "bot_send_wait_seconds",
+    "Ожидание исходящего запроса к Telegram в очереди ограничителя.",
+    ("method",),
+    SEND_WAIT_BUCKETS,
+)
+bot_send_retry_after_total = metrics.counter(
+    "bot_send_retry_after_total",
+    "Ответы 429 (retry_after) от Telegram.",
+    ("method",),
+)
+
+
+class TokenBucket:
+    """Токен-бакет в форме GCRA: rate запросов в секунду, всплеск до burst.
+
+    reserve возвращает момент, когда можно отправить запрос, и сразу
+    занимает его, поэтому ожидающие обслуживаются в порядке обращения.
+    """
+
+    __slots__ = ("interval", "tolerance", "tat")
+
+    def __init__(self, rate: float, burst: int = 1):
+        self.interval = 1.0 / rate
+        self.tolerance = (burst - 1) * self.interval
+        # Теоретическое время следующей отправки
+        self.tat = 0.0
+
+    def reserve(self, not_before: float) -> float:
+        at = max(not_before, self.tat - self.tolerance)
+        self.tat = max(self.tat, at) + self.interval
+        return at
+
+    def occupy(self, at: float) -> None:
+        """Учесть отправку в момент at, назначенный другим бакетом."""
+        self.tat = max(self.tat, at + self.interval)
+
+    def block(self, until: float) -> None:
+        """Не выдавать токены до until (retry_after от Telegram)."""
+        self.tat = max(self.tat, until + self.tolerance)
+
+
+class RateLimiter(BaseRequestMiddleware):
+    """Middleware сессии бота: общий и по-чатовый лимит исходящих запросов.
+
+    Ограничиваются методы с chat_id (sendMessage, editMessageText и т.п.).
+    Запрос ждёт своего момента отправки, освободив место воркера
+    ChatScheduler: обработчик этого чата стоит в очереди на отправку,
+    а апдейты других чатов продолжают обрабатываться. Telegram не сообщает,
+    чей лимит превышен, поэтому на 429 до retry_after останавливаются и чат,
+    и общая очередь; запрос повторяется до retries раз.
+    """
+
+    def __init__(
+        self,
+        *,
+        global_rate: float = 30.0,
+        chat_rate: float = 1.0,
+        chat_burst: int = 3,
+        group_rate: float = 20 / 60,
+        retries: int = 3,
+        max_idle_chats: int = 10_000,
+        clock: Callable[[], float] | None = None,
+    ):
+        self.global_bucket = TokenBucket(global_rate, burst=max(int(global_rate), 1))
+        self.chat_rate = chat_rate
+        self.chat_burst = chat_burst
+        self.group_rate = group_rate
+        self.retries = retries
+        self.max_idle_chats = max_idle_chats
+        self._clock = clock
+        self._chats: dict[Any, TokenBucket] = {}
+        self.sent = 0
+        self.retried = 0
+
+    def _now(self) -> float:
+        return self._clock() if self._clock else asyncio.get_running_loop().time()
+
+    def _chat_bucket(self, chat_id: Any, now: float) -> TokenBucket:
+        bucket = self._chats.get(chat_id)
+        if bucket is None:
+            if len(self._chats) >= self.max_idle_chats:
+                # Бакеты без запланированных отправок ничего не ограничивают
+                self._chats = {k: b for k, b in self._chats.items() if b.tat > now}
+            # Группы и каналы (отрицательный id) — 20 сообщений в минуту
+            if isinstance(chat_id, int) and chat_id < 0:
+                bucket = TokenBucket(self.group_rate)
+            else:
+                bucket = TokenBucket(self.chat_rate, burst=self.chat_burst)
+            self._chats[chat_id] = bucket
+        return bucket
+
+    def reserve(self, chat_id: Any) -> float:
+        """Занять ближайший момент отправки в чат; вернуть задержку в секундах."""
+        now = self._now()
+        chat = self._chat_bucket(chat_id, now)
+        at = self.global_bucket.reserve(chat.reserve(now))
+        chat.occupy(at)
+        return at - now
+
+    async def __call__(
+        self,
+        make_request: NextRequestMiddlewareType[TelegramType],
+        bot: Bot,
+        method: TelegramMethod[TelegramType],
+    ) -> Response[TelegramType]:
+        chat_id = getattr(method, "chat_id", None)
+        if chat_id is None:
+            return await make_request(bot, method)
+
+        name = type(method).__name__
+        attempt = 0
+        while True:
+            delay = self.reserve(chat_id)
+            bot_send_wait_seconds.observe(delay, name)
+            try:
+                if delay > 0:
+                    async with worker_released():
+                        await asyncio.sleep(delay)
+                        response = await make_request(bot, method)
+                else:
+                    response = await make_request(bot, method)
+            except TelegramRetryAfter as e:
+                bot_send_retry_after_total.inc(name)
+                if attempt >= self.retries:
+                    raise
+                attempt += 1
+                self.retried += 1
+                logger.warning(
+                    "429 от Telegram в чате %s, повтор через %s с",
+                    chat_id,
+                    e.retry_after,
+                )
+                now = self._now()
+                self._chat_bucket(chat_id, now).block(now + e.retry_after)
+                self.global_bucket.block(now + e.retry_after)
+                continue
+            self.sent += 1
+            return response
+
+    def stats(self) -> dict[str, int]:
+        return {"sent": self.sent, "retried": self.retried, "chats": len(self._chats)}
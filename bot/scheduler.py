@@ -0,0 +1,195 @@
+import asyncio
+import logging
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from typing import Any, AsyncIterator, Awaitable, Callable, Hashable
+
+from aiogram import BaseMiddleware
+from aiogram.types import TelegramObject
+
+from core.base.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+bot_updates_pending = metrics.gauge(
+    "bot_updates_pending",
+    "Апдейты бота в очередях чатов и в обработке.",
+)
+bot_chats_active = metrics.gauge(
+    "bot_chats_active",
+    "Чаты с апдейтами в очереди или в обработке.",
+)
+bot_update_queue_seconds = metrics.histogram(
+    "bot_update_queue_seconds",
+    "Время ожидания апдейта в очереди чата до начала обработки.",
+)
+
+Handler = Callable[[TelegramObject, dict[str, Any]], Awaitable[Any]]
+
+
+class _Slot:
+    """Место воркера, занятое обработкой одного апдейта."""
+
+    __slots__ = ("capacity", "held")
+
+    def __init__(self, capacity: asyncio.Semaphore):
+        self.capacity = capacity
+        self.held = True
+
+    def release(self) -> None:
+        if self.held:
+            self.held = False
+            self.capacity.release()
+
+    async def acquire(self) -> None:
+        await self.capacity.acquire()
+        self.held = True
+
+
+_current_slot: ContextVar[_Slot | None] = ContextVar("_current_slot", default=None)
+
+
+@asynccontextmanager
+async def worker_released() -> AsyncIterator[None]:
+    """Освободить место воркера на время ожидания внутри обработчика.
+
+    Пока обработчик ждёт (например, очереди на отправку в Telegram), другие
+    чаты обрабатываются; порядок апдейтов этого чата не меняется. Вне
+    ChatScheduler ничего не делает.
+    """
+    slot = _current_slot.get()
+    if slot is None or not slot.held:
+        yield
+        return
+    slot.release()
+    try:
+        yield
+    finally:
+        await slot.acquire()
+
+
+class ChatScheduler(BaseMiddleware):
+    """Outer middleware апдейтов: по очереди на чат, общий пул воркеров.
+
+    Апдейты одного чата обрабатываются строго по порядку (на этом держится
+    FSM), разные чаты — параллельно, не больше workers одновременно.
+    Воркер берёт из чата один апдейт и возвращает чат в конец очереди,
+    так что медленный чат не задерживает остальных. Обработчик в
+    worker_released не занимает место воркера. Больше max_pending
+    апдейтов в очередях и обработке не принимается: приём (polling или
+    вебхук) ждёт свободного места.
+
+    Регистрируется последним outer middleware на dp.update, чтобы FSM
+    контекст и event_chat уже были в data. Состояние FSM перечитывается
+    перед обработкой: за время ожидания его мог сменить предыдущий апдейт
+    чата.
+    """
+
+    def __init__(self, workers: int = 100, max_pending: int = 10_000):
+        self.workers = workers
+        self.max_pending = max_pending
+        self._slots = asyncio.Semaphore(max_pending)
+        self._capacity = asyncio.Semaphore(workers)
+        # Очереди чатов и порядок их обхода воркерами
+        self._chats: dict[Hashable, deque[tuple[float, Handler, Any, dict]]] = {}
+        self._ready: asyncio.Queue[Hashable] = asyncio.Queue()
+        self._loop: asyncio.Task | None = None
+        self._tasks: set[asyncio.Task] = set()
+        self.pending = 0
+        self.processed = 0
+        self.failed = 0
+
+    @staticmethod
+    def chat_key(event: TelegramObject, data: dict[str, Any]) -> Hashable:
+        """Ключ очереди: чат, иначе пользователь, иначе сам апдейт."""
+        chat = data.get("event_chat")
+        if chat is not None:
+            return chat.id
+        user = data.get("event_from_user")
+        if user is not None:
+            return ("user", user.id)
+        return ("update", getattr(event, "update_id", id(event)))
+
+    async def __call__(
+        self, handler: Handler, event: TelegramObject, data: dict[str, Any]
+    ) -> Any:
+        await self.submit(self.chat_key(event, data), handler, event, data)
+        # Апдейт принят; результат обработчика не нужен ни polling, ни вебхуку
+        return None
+
+    async def submit(
+        self, key: Hashable, handler: Handler, event: Any, data: dict[str, Any]
+    ) -> None:
+        """Поставить апдейт в очередь чата, дождавшись места при перегрузке."""
+        self.start()
+        await self._slots.acquire()
+        self.pending += 1
+        bot_updates_pending.set(self.pending)
+        queue = self._chats.get(key)
+        if queue is None:
+            # Чат не в обходе: добавить его в очередь воркеров
+            queue = self._chats[key] = deque()
+            self._ready.put_nowait(key)
+            bot_chats_active.set(len(self._chats))
+        queue.append((time.perf_counter(), handler, event, data))
+
+    def start(self) -> None:
+        """Запустить раздачу апдейтов воркерам (повторный вызов ничего не делает)."""
+        if self._loop is None:
+            self._loop = asyncio.create_task(self._run())
+
+    async def _run(self) -> None:
+        while True:
+            key = await self._ready.get()
+            await self._capacity.acquire()
+            task = asyncio.create_task(self._handle(key, _Slot(self._capacity)))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _handle(self, key: Hashable, slot: _Slot) -> None:
+        _current_slot.set(slot)
+        queue = self._chats[key]
+        enqueued, handler, event, data = queue.popleft()
+        bot_update_queue_seconds.observe(time.perf_counter() - enqueued)
+        try:
+            state = data.get("state")
+            if state is not None:
+                data["raw_state"] = await state.get_state()
+            await handler(event, data)
+            self.processed += 1
+        except Exception:
+            self.failed += 1
+            logger.exception(
+                "Ошибка обработки апдейта %s", getattr(event, "update_id", None)
+            )
+        finally:
+            slot.release()
+            self.pending -= 1
+            bot_updates_pending.set(self.pending)
+            self._slots.release()
+            if queue:
+                self._ready.put_nowait(key)
+            else:
+                del self._chats[key]
+                bot_chats_active.set(len(self._chats))
+            self._ready.task_done()
+
+    async def stop(self) -> None:
+        """Дождаться обработки принятых апдейтов и остановить воркеры."""
+        if self._loop is None:
+            return
+        await self._ready.join()
+        self._loop.cancel()
+        await asyncio.gather(self._loop, *self._tasks, return_exceptions=True)
+        self._loop = None
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "workers": self.workers,
+            "pending": self.pending,
+            "chats": len(self._chats),
+            "processed": self.processed,
+            "failed": self.failed,
+        }
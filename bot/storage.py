@@ -0,0 +1,194 @@
+import asyncio
+import itertools
+import json
+import logging
+import sqlite3
+import zlib
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Mapping
+
+from aiogram.fsm.state import State
+from aiogram.fsm.storage.base import (
+    BaseStorage,
+    DefaultKeyBuilder,
+    KeyBuilder,
+    StateType,
+    StorageKey,
+)
+
+logger = logging.getLogger(__name__)
+
+# Поле записи не менялось с последнего сброса
+_UNSET = object()
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS fsm (
+    key TEXT PRIMARY KEY,
+    state TEXT,
+    data TEXT
+) WITHOUT ROWID
+"""
+_UPSERT_STATE = (
+    "INSERT INTO fsm (key, state) VALUES (?, ?) "
+    "ON CONFLICT (key) DO UPDATE SET state = excluded.state"
+)
+_UPSERT_DATA = (
+    "INSERT INTO fsm (key, data) VALUES (?, ?) "
+    "ON CONFLICT (key) DO UPDATE SET data = excluded.data"
+)
+_DELETE_EMPTY = "DELETE FROM fsm WHERE key = ? AND state IS NULL AND data IS NULL"
+
+
+def _connect(path: Path) -> sqlite3.Connection:
+    conn = sqlite3.connect(path, isolation_level=None, check_same_thread=False)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("PRAGMA busy_timeout=5000")
+    return conn
+
+
+class SQLiteStorage(BaseStorage):
+    """FSM хранилище aiogram в SQLite (WAL), общее для нескольких процессов.
+
+    Запись возвращается только после COMMIT, поэтому другой процесс сразу
+    видит изменение, а состояние и данные пишутся отдельными колонками и не
+    затирают друг друга. Записи, пришедшие, пока идёт предыдущая
+    транзакция, объединяются в следующую (до batch_size ключей). Запросы к
+    SQLite выполняются в отдельных потоках для чтения и записи, не блокируя
+    цикл событий. Ключи распределяются по shards файлам по crc32. Пустые
+    состояние и данные хранятся как NULL, пустые строки удаляются.
+    """
+
+    def __init__(
+        self,
+        path: str | Path,
+        *,
+        shards: int = 1,
+        batch_size: int = 100,
+        key_builder: KeyBuilder | None = None,
+    ):
+        self.path = Path(path)
+        self.batch_size = batch_size
+        self.key_builder = key_builder or DefaultKeyBuilder(with_bot_id=True)
+        if shards == 1:
+            shard_paths = [self.path]
+        else:
+            shard_paths = [
+                self.path.with_name(f"{self.path.stem}-{i}{self.path.suffix}")
+                for i in range(shards)
+            ]
+        self._readers: list[sqlite3.Connection] = []
+        self._writers: list[sqlite3.Connection] = []
+        for shard_path in shard_paths:
+            shard_path.parent.mkdir(parents=True, exist_ok=True)
+            writer = _connect(shard_path)
+            writer.execute(_SCHEMA)
+            self._writers.append(writer)
+            self._readers.append(_connect(shard_path))
+        self._read_executor = ThreadPoolExecutor(1, thread_name_prefix="fsm-read")
+        self._write_executor = ThreadPoolExecutor(1, thread_name_prefix="fsm-write")
+        # key -> ([state, data], future коммита); _UNSET — поле не менялось
+        self._pending: dict[str, tuple[list[Any], asyncio.Future]] = {}
+        self._flusher: asyncio.Task | None = None
+        self.batches = 0
+
+    def _key(self, key: StorageKey) -> str:
+        return self.key_builder.build(key)
+
+    def _shard(self, key: str) -> int:
+        return zlib.crc32(key.encode()) % len(self._writers)
+
+    def _read_row(self, key: str, column: str) -> str | None:
+        reader = self._readers[self._shard(key)]
+        row = reader.execute(
+            f"SELECT {column} FROM fsm WHERE key = ?", (key,)
+        ).fetchone()
+        return None if row is None else row[0]
+
+    async def _read(self, key: str, column: str) -> str | None:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._read_executor, self._read_row, key, column
+        )
+
+    async def _write(self, key: str, field: int, value: Any) -> None:
+        entry = self._pending.get(key)
+        if entry is None:
+            future = asyncio.get_running_loop().create_future()
+            entry = self._pending[key] = ([_UNSET, _UNSET], future)
+        entry[0][field] = value
+        if self._flusher is None or self._flusher.done():
+            self._flusher = asyncio.create_task(self._flush_pending())
+        # Отмена ожидающего не отменяет запись для остальных ключей пачки
+        await asyncio.shield(entry[1])
+
+    async def _flush_pending(self) -> None:
+        loop = asyncio.get_running_loop()
+        while self._pending:
+            keys = list(itertools.islice(self._pending, self.batch_size))
+            batch = {key: self._pending.pop(key) for key in keys}
+            by_shard: dict[int, list[tuple[str, list[Any]]]] = defaultdict(list)
+            for key, (record, _) in batch.items():
+                by_shard[self._shard(key)].append((key, record))
+            try:
+                await loop.run_in_executor(
+                    self._write_executor, self._write_batches, by_shard
+                )
+            except Exception as e:
+                logger.exception("Не удалось записать FSM состояния")
+                for _, future in batch.values():
+                    future.set_exception(e)
+                    # Ошибку получат ожидающие; без них — не логировать повторно
+                    future.exception()
+            else:
+                self.batches += 1
+                for _, future in batch.values():
+                    future.set_result(None)
+
+    async def flush(self) -> None:
+        """Дождаться записи всех начатых изменений."""
+        if self._flusher is not None:
+            await asyncio.shield(self._flusher)
+
+    def _write_batches(self, by_shard: dict[int, list[tuple[str, list[Any]]]]) -> None:
+        for shard, records in by_shard.items():
+            writer = self._writers[shard]
+            states = [(k, r[0]) for k, r in records if r[0] is not _UNSET]
+            data = [(k, r[1]) for k, r in records if r[1] is not _UNSET]
+            writer.execute("BEGIN IMMEDIATE")
+            try:
+                writer.executemany(_UPSERT_STATE, states)
+                writer.executemany(_UPSERT_DATA, data)
+                writer.executemany(_DELETE_EMPTY, [(k,) for k, _ in records])
+                writer.execute("COMMIT")
+            except BaseException:
+                writer.execute("ROLLBACK")
+                raise
+
+    async def set_state(self, key: StorageKey, state: StateType = None) -> None:
+        value = state.state if isinstance(state, State) else state
+        await self._write(self._key(key), 0, value)
+
+    async def get_state(self, key: StorageKey) -> str | None:
+        return await self._read(self._key(key), "state")
+
+    async def set_data(self, key: StorageKey, data: Mapping[str, Any]) -> None:
+        encoded = (
+            json.dumps(data, ensure_ascii=False, separators=(",", ":"))
+            if data
+            else None
+        )
+        await self._write(self._key(key), 1, encoded)
+
+    async def get_data(self, key: StorageKey) -> dict[str, Any]:
+        encoded = await self._read(self._key(key), "data")
+        return json.loads(encoded) if encoded else {}
+
+    async def close(self) -> None:
+        await self.flush()
+        self._read_executor.shutdown()
+        self._write_executor.shutdown()
+        for conn in (*self._readers, *self._writers):
+            conn.close()
@@ -0,0 +1,118 @@
+import asyncio
+import logging
+from typing import Any
+
+from aiogram import Bot, Dispatcher
+from aiogram.webhook.aiohttp_server import SimpleRequestHandler, setup_application
+from aiohttp import web
+
+logger = logging.getLogger(__name__)
+
+
+class BoundedRequestHandler(SimpleRequestHandler):
+    """Обработчик вебхука: ответ Telegram сразу, апдейты в фоне.
+
+    Одновременно обрабатывается не больше max_in_flight апдейтов. Когда
+    лимит занят, POST ждёт свободного места, и Telegram сам замедляет
+    доставку (не больше max_connections запросов на бота).
+    """
+
+    def __init__(
+        self,
+        dispatcher: Dispatcher,
+        bot: Bot,
+        *,
+        max_in_flight: int = 100,
+        secret_token: str | None = None,
+        **data: Any,
+    ):
+        super().__init__(
+            dispatcher,
+            bot,
+            handle_in_background=True,
+            secret_token=secret_token,
+            **data,
+        )
+        self.max_in_flight = max_in_flight
+        self._slots = asyncio.Semaphore(max_in_flight)
+
+    @property
+    def in_flight(self) -> int:
+        return len(self._background_feed_update_tasks)
+
+    async def _background_feed_update(self, bot: Bot, update: dict[str, Any]) -> None:
+        try:
+            await super()._background_feed_update(bot, update)
+        except Exception:
+            logger.exception("Ошибка обработки апдейта %s", update.get("update_id"))
+        finally:
+            self._slots.release()
+
+    async def _handle_request_background(
+        self, bot: Bot, request: web.Request
+    ) -> web.Response:
+        await self._slots.acquire()
+        try:
+            return await super()._handle_request_background(bot, request)
+        except BaseException:
+            # Задача не создана (например, невалидный JSON)
+            self._slots.release()
+            raise
+
+    async def wait_in_flight(self, app: web.Application | None = None) -> None:
+        """Дождаться апдейтов, уже переданных диспетчеру."""
+        if self._background_feed_update_tasks:
+            await asyncio.gather(
+                *self._background_feed_update_tasks, return_exceptions=True
+            )
+
+    async def close(self) -> None:
+        """Дождаться апдейтов в обработке и закрыть сессию бота."""
+        await self.wait_in_flight()
+        await super().close()
+
+
+WEBHOOK_HANDLER = web.AppKey("webhook_handler", BoundedRequestHandler)
+
+
+def create_app(
+    dispatcher: Dispatcher,
+    bot: Bot,
+    *,
+    path: str = "/webhook",
+    secret_token: str | None = None,
+    max_in_flight: int = 100,
+    webhook_url: str | None = None,
+    max_connections: int = 40,
+) -> web.Application:
+    """aiohttp приложение вебхука.
+
+    Если задан webhook_url, при старте вызывается setWebhook с тем же
+    secret_token; без него приложение принимает апдейты локально
+    (например, тестовые POST запросы на path).
+    """
+    app = web.Application()
+    handler = BoundedRequestHandler(
+        dispatcher, bot, max_in_flight=max_in_flight, secret_token=secret_token
+    )
+    # Порядок остановки: принятые апдейты, затем shutdown диспетчера
+    # (очереди по чатам, хранилище, клиент API) и только потом сессия бота
+    app.on_shutdown.append(handler.wait_in_flight)
+    setup_application(app, dispatcher, bot=bot)
+    handler.register(app, path=path)
+    app[WEBHOOK_HANDLER] = handler
+
+    if webhook_url:
+
+        async def set_webhook(app: web.Application) -> None:
+            await bot.set_webhook(
+                webhook_url,
+                secret_token=secret_token,
+                max_connections=max_connections,
+                allowed_updates=dispatcher.resolve_used_update_types(),
+                drop_pending_updates=True,
+            )
+            logger.info("Вебхук установлен: %s", webhook_url)
+
+        app.on_startup.append(set_webhook)
+    return app
@@ -0,0 +1,124 @@
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Callable, Hashable
+
+__all__ = (
+    "CacheBackend",
+    "LRUCacheBackend",
+    "TTLCache",
+)
+
+
+class TTLCache:
+    """Ограниченный LRU кэш с TTL и кэшированием отрицательных ответов."""
+
+    def __init__(
+        self,
+        maxsize: int,
+        ttl: float,
+        negative_ttl: float | None = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.negative_ttl = ttl if negative_ttl is None else negative_ttl
+        self._clock = clock
+        self._data: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get(self, key: Hashable) -> tuple[bool, Any]:
+        """Вернуть (найдено, значение); просроченные записи удаляются."""
+        item = self._data.get(key)
+        if item is None:
+            self.misses += 1
+            return False, None
+        expires_at, value = item
+        if expires_at <= self._clock():
+            del self._data[key]
+            self.misses += 1
+            return False, None
+        self._data.move_to_end(key)
+        self.hits += 1
+        return True, value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        """Сохранить значение; None хранится с отрицательным TTL."""
+        ttl = self.negative_ttl if value is None else self.ttl
+        if ttl <= 0:
+            self._data.pop(key, None)
+            return
+        self._data[key] = (self._clock() + ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    def invalidate(self, key: Hashable) -> None:
+        """Удалить запись из кэша."""
+        self._data.pop(key, None)
+
+    def clear(self) -> None:
+        """Очистить кэш."""
+        self._data.clear()
+
+    def stats(self) -> dict[str, int]:
+        """Счётчики попаданий, промахов и вытеснений."""
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+
+class CacheBackend(ABC):
+    """Интерфейс кэша строк CRUD; может быть реализован общим хранилищем."""
+
+    @abstractmethod
+    async def get(self, key: Hashable) -> tuple[bool, Any]:
+        """Вернуть (найдено, значение)."""
+
+    @abstractmethod
+    async def set(self, key: Hashable, value: Any) -> None:
+        """Сохранить значение."""
+
+    @abstractmethod
+    async def delete(self, key: Hashable) -> None:
+        """Удалить значение."""
+
+    @abstractmethod
+    async def clear(self) -> None:
+        """Очистить кэш."""
+
+    @abstractmethod
+    def stats(self) -> dict[str, int]:
+        """Счётчики попаданий, промахов и вытеснений."""
+
+
+class LRUCacheBackend(CacheBackend):
+    """In-process реализация CacheBackend поверх TTLCache."""
+
+    def __init__(self, maxsize: int, ttl: float):
+        self._cache = TTLCache(maxsize=maxsize, ttl=ttl)
+
+    async def get(self, key: Hashable) -> tuple[bool, Any]:
+        return self._cache.get(key)
+
+    async def set(self, key: Hashable, value: Any) -> None:
+        self._cache.set(key, value)
+
+    async def delete(self, key: Hashable) -> None:
+        self._cache.invalidate(key)
+
+    async def clear(self) -> None:
+        self._cache.clear()
+
+    def stats(self) -> dict[str, int]:
+        return self._cache.stats()
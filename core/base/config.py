@@ -1,3 +1,5 @@
+from typing import Literal
+
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
@@ -12,5 +14,91 @@ class Settings(BaseSettings):
     BOT_TOKEN: str
     API_BASE_URL: str = "http://localhost:8000"
 
+    # Пул соединений с БД
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_RECYCLE: int = 1800
+    DB_POOL_TIMEOUT: float = 30.0
+    DB_POOL_PRE_PING: bool = False
+    DB_PREPARED_STATEMENT_CACHE_SIZE: int = 100
+    # statement_timeout сервера в миллисекундах (0 — без ограничения)
+    DB_STATEMENT_TIMEOUT_MS: int = 0
+
+    # Реплики для чтения (DSN SQLAlchemy) и окно read-your-writes
+    DB_REPLICA_URLS: list[str] = []
+    DB_READ_YOUR_WRITES_SECONDS: float = 5.0
+
+    # Разработка: запрет lazy загрузок и поиск N+1 по запросам
+    DB_RAISE_ON_LAZY_LOAD: bool = False
+    DB_QUERY_DETECTOR: bool = False
+    DB_QUERY_BUDGET: int = 0
+
+    # Массовая загрузка баллов
+    BULK_MAX_ROWS: int = 50_000
+    BULK_CHUNK_SIZE: int = 1_000
+
+    # Кэш строк CRUD по первичному ключу в памяти процесса: только для одного
+    # воркера API, иначе записи не сбрасывают кэш других воркеров
+    USERS_CACHE_ENABLED: bool = False
+    OBJECTS_CACHE_ENABLED: bool = False
+    CRUD_CACHE_SIZE: int = 10_000
+    CRUD_CACHE_TTL: float = 60.0
+
+    # Потоковая выгрузка
+    EXPORT_FETCH_SIZE: int = 1_000
+
+    # Доступ бота к данным: HTTP к API или напрямую к CRUD в том же процессе
+    BOT_API_BACKEND: Literal["http", "embedded"] = "http"
+
+    # HTTP пул клиента бота
+    API_POOL_LIMIT: int = 100
+    API_POOL_LIMIT_PER_HOST: int = 50
+    API_KEEPALIVE_TIMEOUT: float = 30.0
+    API_DNS_CACHE_TTL: int = 300
+    API_CONNECT_TIMEOUT: float = 5.0
+    API_REQUEST_TIMEOUT: float = 15.0
+    API_ETAG_CACHE_SIZE: int = 10_000
+    API_ETAG_CACHE_TTL: float = 3600.0
+    # Объединение get_user за окно в один GET /users/?ids=...
+    API_BATCH_USERS: bool = False
+    API_BATCH_WINDOW_MS: float = 2.0
+    API_BATCH_MAX_SIZE: int = 100
+
+    # Режим получения апдейтов ботом: long polling или вебхук (aiohttp)
+    BOT_MODE: Literal["polling", "webhook"] = "polling"
+    # Публичный адрес для setWebhook; пустой — вебхук не регистрируется
+    WEBHOOK_BASE_URL: str = ""
+    WEBHOOK_PATH: str = "/webhook"
+    WEBHOOK_SECRET: str = ""
+    WEBHOOK_HOST: str = "0.0.0.0"
+    WEBHOOK_PORT: int = 8080
+    WEBHOOK_MAX_CONNECTIONS: int = 40
+    WEBHOOK_MAX_IN_FLIGHT: int = 100
+
+    # Очереди апдейтов по чатам: воркеры (0 — задача aiogram на апдейт без
+    # упорядочивания) и предел принятых апдейтов
+    BOT_SCHEDULER_WORKERS: int = 100
+    BOT_SCHEDULER_MAX_PENDING: int = 10_000
+
+    # Лимиты исходящих запросов бота в секунду (BOT_RATE_LIMIT_GLOBAL=0 — выкл.)
+    BOT_RATE_LIMIT_GLOBAL: float = 30.0
+    BOT_RATE_LIMIT_CHAT: float = 1.0
+    BOT_RATE_LIMIT_CHAT_BURST: int = 3
+    BOT_RATE_LIMIT_GROUP: float = 20 / 60
+    BOT_RATE_LIMIT_RETRIES: int = 3
+
+    # Каталог checkpoint файлов рассылок
+    BROADCAST_DIR: str = "data/broadcasts"
+
+    # FSM хранилище бота: SQLite (WAL); пустой путь — MemoryStorage
+    FSM_STORAGE_PATH: str = "data/fsm.sqlite3"
+    FSM_STORAGE_SHARDS: int = 1
+    FSM_BATCH_SIZE: int = 100
+
+    # Кэш пользователей бота
+    USER_CACHE_SIZE: int = 10_000
+    USER_CACHE_TTL: float = 600.0
+    USER_CACHE_NEGATIVE_TTL: float = 30.0
+
 
 settings = Settings()  # type: ignore[call-arg]
@@ -1,10 +1,27 @@
+import base64
+import json
 import logging
-from typing import Any, Generic, Type, TypeVar
+from datetime import datetime
+from typing import Any, AsyncIterator, Generic, Literal, Sequence, Type, TypeVar
 
 from pydantic import BaseModel
-from sqlalchemy import select
+from sqlalchemy import (
+    ColumnElement,
+    Insert,
+    Select,
+    delete,
+    insert,
+    select,
+    tuple_,
+    update,
+)
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import DeclarativeBase
+from sqlalchemy.orm import DeclarativeBase, make_transient_to_detached
+from sqlalchemy.sql.base import ExecutableOption
+
+from core.base.cache import CacheBackend
+from core.db.replicas import is_replica
 
 logger = logging.getLogger("crud")
 
@@ -15,14 +32,19 @@ class Base(DeclarativeBase):
     pass
 
 
+class InvalidCursorError(ValueError):
+    """Курсор пагинации повреждён или не подходит к сортировке."""
+
+
 ModelType = TypeVar("ModelType", bound=Base)
 CreateSchemaType = TypeVar("CreateSchemaType", bound=BaseModel)
 UpdateSchemaType = TypeVar("UpdateSchemaType", bound=BaseModel)
 
 
 class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
-    def __init__(self, model: Type[ModelType]):
+    def __init__(self, model: Type[ModelType], cache: CacheBackend | None = None):
         self.model = model
+        self.cache = cache
 
     @staticmethod
     def _to_dict(obj: ModelType) -> dict[str, Any]:
@@ -31,13 +53,69 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
             column.name: getattr(obj, column.name) for column in obj.__table__.columns
         }
 
-    async def get_by_id(self, db: AsyncSession, id: Any) -> ModelType | None:
-        """Получить объект по ID."""
+    async def _on_change(
+        self,
+        db: AsyncSession,
+        old: dict[str, Any] | None,
+        new: dict[str, Any] | None,
+    ) -> None:
+        """Хук перед коммитом записи: состояние строки до и после изменения.
+
+        Вызывается в той же транзакции; old=None при создании, new=None
+        при удалении. Наследники поддерживают здесь производные данные.
+        """
+
+    def _insert(self, db: AsyncSession) -> Insert:
+        """INSERT с поддержкой ON CONFLICT для диалекта текущей сессии."""
+        if db.bind.dialect.name == "sqlite":
+            return sqlite.insert(self.model)
+        return postgresql.insert(self.model)
+
+    def _cache_key(self, id: Any) -> tuple[str, Any]:
+        return (self.model.__tablename__, id)
+
+    async def invalidate_cache(self, *ids: Any) -> None:
+        """Удалить строки из кэша после их изменения."""
+        if self.cache is None:
+            return
+        for id in ids:
+            await self.cache.delete(self._cache_key(id))
+
+    def cache_stats(self) -> dict[str, int] | None:
+        """Счётчики кэша или None, если кэш не подключён."""
+        return None if self.cache is None else self.cache.stats()
+
+    async def get_by_id(
+        self,
+        db: AsyncSession,
+        id: Any,
+        *,
+        options: Sequence[ExecutableOption] = (),
+    ) -> ModelType | None:
+        """Получить объект по ID (через кэш, если он подключён).
+
+        Кэш заполняется только из сессий primary.
+
+        options — опции загрузки связей (selectinload/joinedload); с ними
+        кэш не используется, так как в нём хранятся только колонки.
+        """
         logger.debug("Получение %s по id=%s", self.model.__name__, id)
-        result = await db.get(self.model, id)
+        use_cache = self.cache is not None and not options
+        if use_cache:
+            found, data = await self.cache.get(self._cache_key(id))
+            if found:
+                # Восстановить объект и привязать к сессии без запроса к БД
+                db_obj = self.model(**data)
+                make_transient_to_detached(db_obj)
+                return await db.merge(db_obj, load=False)
+
+        result = await db.get(self.model, id, options=options)
         if result is None:
             logger.warning("%s с id=%s не найден", self.model.__name__, id)
             return None
+        # Строка с отстающей реплики осталась бы в кэше и после записи
+        if use_cache and not is_replica(db):
+            await self.cache.set(self._cache_key(id), self._to_dict(result))
         return result
 
     async def get_all(
@@ -46,25 +124,188 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         *,
         skip: int = 0,
         limit: int = 100,
+        options: Sequence[ExecutableOption] = (),
     ) -> list[ModelType]:
         """Получить список объектов с пагинацией."""
         logger.debug(
             "Получение списка %s (skip=%d, limit=%d)", self.model.__name__, skip, limit
         )
-        stmt = select(self.model).offset(skip).limit(limit)
+        stmt = select(self.model).options(*options).offset(skip).limit(limit)
         result = await db.execute(stmt)
         items = list(result.scalars().all())
         logger.debug("Получено %d записей %s", len(items), self.model.__name__)
         return items
 
+    def _keyset_columns(self, order_by: str) -> list[Any]:
+        """Колонки сортировки для keyset пагинации."""
+        primary_key = list(self.model.__mapper__.primary_key)
+        if order_by == "id":
+            return primary_key
+        if order_by == "created_at":
+            return [self.model.created_at, *primary_key]
+        raise ValueError(f"Unsupported order_by: {order_by}")
+
+    @staticmethod
+    def _encode_cursor(values: list[Any]) -> str:
+        """Упаковать значения ключа последней записи в непрозрачный курсор."""
+        payload = [v.isoformat() if isinstance(v, datetime) else v for v in values]
+        raw = json.dumps(payload, separators=(",", ":")).encode()
+        return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+    @staticmethod
+    def _cursor_value(column: Any, value: Any) -> Any:
+        """Проверить тип значения курсора по типу колонки."""
+        python_type = column.type.python_type
+        if python_type is datetime:
+            if not isinstance(value, str):
+                raise TypeError(f"{column.key}: expected ISO datetime string")
+            return datetime.fromisoformat(value)
+        # type(), а не isinstance: true не должен пройти как int
+        if type(value) is not python_type:
+            raise TypeError(f"{column.key}: expected {python_type.__name__}")
+        return value
+
+    @classmethod
+    def _decode_cursor(cls, cursor: str, columns: list[Any]) -> list[Any]:
+        """Распаковать курсор в значения ключа."""
+        try:
+            raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+            values = json.loads(raw)
+            if not isinstance(values, list) or len(values) != len(columns):
+                raise ValueError("cursor length mismatch")
+            return [cls._cursor_value(column, v) for column, v in zip(columns, values)]
+        except (ValueError, TypeError) as e:
+            raise InvalidCursorError("Invalid cursor") from e
+
+    def _keyset_filter(
+        self, stmt: Select, columns: list[Any], cursor: str | None, limit: int
+    ) -> Select:
+        """Добавить к запросу сортировку, условие курсора и limit + 1."""
+        stmt = stmt.order_by(*columns).limit(limit + 1)
+        if cursor is not None:
+            values = self._decode_cursor(cursor, columns)
+            if len(columns) == 1:
+                stmt = stmt.where(columns[0] > values[0])
+            else:
+                stmt = stmt.where(tuple_(*columns) > tuple_(*values))
+        return stmt
+
+    async def get_page(
+        self,
+        db: AsyncSession,
+        *,
+        limit: int = 100,
+        cursor: str | None = None,
+        order_by: Literal["id", "created_at"] = "id",
+        where: Sequence[ColumnElement[bool]] = (),
+    ) -> tuple[list[ModelType], str | None]:
+        """Получить страницу объектов keyset пагинацией.
+
+        Возвращает записи и курсор следующей страницы (None на последней).
+        Стоимость запроса не зависит от номера страницы.
+        """
+        logger.debug(
+            "Получение страницы %s (limit=%d, order_by=%s)",
+            self.model.__name__,
+            limit,
+            order_by,
+        )
+        columns = self._keyset_columns(order_by)
+        stmt = self._keyset_filter(
+            select(self.model).where(*where), columns, cursor, limit
+        )
+        result = await db.execute(stmt)
+        items = list(result.scalars().all())
+
+        next_cursor = None
+        if len(items) > limit:
+            items = items[:limit]
+            last = items[-1]
+            next_cursor = self._encode_cursor(
+                [getattr(last, column.key) for column in columns]
+            )
+        return items, next_cursor
+
+    async def get_page_rows(
+        self,
+        db: AsyncSession,
+        *,
+        fields: Sequence[str],
+        limit: int = 100,
+        cursor: str | None = None,
+        order_by: Literal["id", "created_at"] = "id",
+        where: Sequence[ColumnElement[bool]] = (),
+    ) -> tuple[list[dict[str, Any]], str | None]:
+        """То же, что get_page, но возвращает словари выбранных колонок.
+
+        Без создания ORM объектов: для списков, которые сразу сериализуются.
+        """
+        columns = self._keyset_columns(order_by)
+        table = self.model.__table__
+        extra = [column.key for column in columns if column.key not in fields]
+        stmt = self._keyset_filter(
+            select(*[table.c[name] for name in [*fields, *extra]]).where(*where),
+            columns,
+            cursor,
+            limit,
+        )
+        result = await db.execute(stmt)
+        rows = [dict(row) for row in result.mappings().all()]
+
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = self._encode_cursor(
+                [rows[-1][column.key] for column in columns]
+            )
+        if extra:
+            for row in rows:
+                for name in extra:
+                    del row[name]
+        return rows, next_cursor
+
+    async def stream_partitions(
+        self,
+        db: AsyncSession,
+        *,
+        since: datetime | None = None,
+        fetch_size: int = 1000,
+    ) -> AsyncIterator[list[dict[str, Any]]]:
+        """Потоково читать все строки таблицы пачками по fetch_size.
+
+        Использует серверный курсор, поэтому память не растёт с размером
+        таблицы. since отбирает записи с created_at >= since.
+        """
+        table = self.model.__table__
+        stmt = select(table).order_by(*table.primary_key.columns)
+        if since is not None:
+            stmt = stmt.where(table.c.created_at >= since)
+        logger.info("Потоковое чтение %s (since=%s)", self.model.__name__, since)
+        result = await db.stream(stmt.execution_options(yield_per=fetch_size))
+        async for partition in result.mappings().partitions():
+            yield [dict(row) for row in partition]
+
+    def _pk_clause(self, id: Any) -> ColumnElement[bool]:
+        return self.model.__mapper__.primary_key[0] == id
+
+    @property
+    def _tracks_changes(self) -> bool:
+        """Переопределён ли _on_change: тогда update читает прежнюю строку."""
+        return type(self)._on_change is not CRUDBase._on_change
+
+    async def _locked_row(self, db: AsyncSession, id: Any) -> dict[str, Any] | None:
+        """Прочитать строку по ID с блокировкой для обновления."""
+        stmt = select(self.model.__table__).where(self._pk_clause(id)).with_for_update()
+        row = (await db.execute(stmt)).mappings().one_or_none()
+        return None if row is None else dict(row)
+
     async def create(self, db: AsyncSession, *, obj_in: CreateSchemaType) -> ModelType:
-        """Создать новый объект."""
+        """Создать новый объект одним INSERT ... RETURNING."""
         logger.info("Создание %s: %s", self.model.__name__, obj_in)
-        obj_data = obj_in.model_dump()
-        db_obj = self.model(**obj_data)
-        db.add(db_obj)
+        stmt = insert(self.model).values(**obj_in.model_dump()).returning(self.model)
+        db_obj = (await db.execute(stmt)).scalar_one()
+        await self._on_change(db, None, self._to_dict(db_obj))
         await db.commit()
-        await db.refresh(db_obj)
         logger.info(
             "Создан %s с id=%s", self.model.__name__, getattr(db_obj, "id", "?")
         )
@@ -77,41 +318,67 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         id: Any,
         obj_in: UpdateSchemaType | dict[str, Any],
     ) -> ModelType | None:
-        """Обновить объект по ID."""
-        logger.info("Обновление %s с id=%s", self.model.__name__, id)
-        db_obj = await self.get_by_id(db, id)
-        if db_obj is None:
-            logger.warning(
-                "Не удалось обновить: %s с id=%s не найден", self.model.__name__, id
-            )
-            return None
+        """Обновить объект по ID одним UPDATE ... RETURNING.
 
+        Если наследник следит за изменениями, прежняя строка сначала
+        читается с блокировкой.
+        """
+        logger.info("Обновление %s с id=%s", self.model.__name__, id)
         if isinstance(obj_in, dict):
             update_data = obj_in
         else:
             update_data = obj_in.model_dump(exclude_unset=True)
+        columns = self.model.__table__.columns
+        values = {
+            field: value for field, value in update_data.items() if field in columns
+        }
+        logger.debug("Обновляемые поля: %s", list(values))
 
-        logger.debug("Обновляемые поля: %s", list(update_data.keys()))
-        for field, value in update_data.items():
-            if hasattr(db_obj, field):
-                setattr(db_obj, field, value)
+        old = await self._locked_row(db, id) if self._tracks_changes else None
+        if self._tracks_changes and old is None:
+            db_obj = None
+        elif values:
+            stmt = (
+                update(self.model)
+                .where(self._pk_clause(id))
+                .values(**values)
+                .returning(self.model)
+                .execution_options(populate_existing=True)
+            )
+            db_obj = (await db.execute(stmt)).scalar_one_or_none()
+        else:
+            db_obj = await db.get(self.model, id)
+        if db_obj is None:
+            logger.warning(
+                "Не удалось обновить: %s с id=%s не найден", self.model.__name__, id
+            )
+            return None
 
+        await self._on_change(db, old, self._to_dict(db_obj))
         await db.commit()
-        await db.refresh(db_obj)
+        await self.invalidate_cache(id)
         logger.info("Обновлён %s с id=%s", self.model.__name__, id)
         return db_obj
 
     async def delete(self, db: AsyncSession, *, id: Any) -> ModelType | None:
-        """Удалить объект по ID."""
+        """Удалить объект по ID одним DELETE ... RETURNING."""
         logger.info("Удаление %s с id=%s", self.model.__name__, id)
-        db_obj = await self.get_by_id(db, id)
-        if db_obj is None:
+        stmt = (
+            delete(self.model)
+            .where(self._pk_clause(id))
+            .returning(*self.model.__table__.columns)
+        )
+        row = (await db.execute(stmt)).mappings().one_or_none()
+        if row is None:
             logger.warning(
                 "Не удалось удалить: %s с id=%s не найден", self.model.__name__, id
             )
             return None
 
-        await db.delete(db_obj)
+        # Копия удалённой строки вне сессии
+        db_obj = self.model(**row)
+        await self._on_change(db, dict(row), None)
         await db.commit()
+        await self.invalidate_cache(id)
         logger.info("Удалён %s с id=%s", self.model.__name__, id)
         return db_obj
@@ -0,0 +1,269 @@
+import time
+from abc import ABC, abstractmethod
+from bisect import bisect_left
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Any, Callable, Iterator
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+__all__ = (
+    "CONTENT_TYPE",
+    "Counter",
+    "Gauge",
+    "Histogram",
+    "MetricsMiddleware",
+    "MetricsRegistry",
+    "instrument_engine",
+    "metrics",
+)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+STATEMENT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.5, 1.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names: tuple[str, ...], values: tuple[Any, ...]) -> str:
+    if not names:
+        return ""
+    pairs = ",".join(
+        f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)
+    )
+    return "{" + pairs + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric(ABC):
+    type = ""
+
+    def __init__(self, name: str, help: str, labelnames: tuple[str, ...] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = labelnames
+        self._values: dict[tuple[Any, ...], Any] = {}
+
+    @abstractmethod
+    def _samples(self) -> Iterator[str]:
+        """Строки значений метрики в текстовом формате Prometheus."""
+
+    def render(self) -> Iterator[str]:
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} {self.type}"
+        yield from self._samples()
+
+
+class Counter(_Metric):
+    """Монотонно растущий счётчик; метки передаются позиционно."""
+
+    type = "counter"
+
+    def inc(self, *labels: Any, amount: float = 1) -> None:
+        self._values[labels] = self._values.get(labels, 0) + amount
+
+    def set_total(self, value: float, *labels: Any) -> None:
+        """Выставить накопленное значение счётчика, который ведёт не процесс.
+
+        Для коллекторов, копирующих монотонные счётчики (например, пула
+        соединений) перед выдачей.
+        """
+        self._values[labels] = value
+
+    def _samples(self) -> Iterator[str]:
+        for labels, value in self._values.items():
+            yield (
+                f"{self.name}{_format_labels(self.labelnames, labels)} "
+                f"{_format_value(value)}"
+            )
+
+
+class Gauge(Counter):
+    """Текущее значение, обычно выставляемое коллектором перед выдачей."""
+
+    type = "gauge"
+
+    def set(self, value: float, *labels: Any) -> None:
+        self._values[labels] = value
+
+
+class Histogram(_Metric):
+    """Гистограмма с фиксированными границами корзин."""
+
+    type = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        labelnames: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = LATENCY_BUCKETS,
+    ):
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, *labels: Any) -> None:
+        # [счётчики по корзинам (последняя — +Inf), сумма, количество]
+        state = self._values.get(labels)
+        if state is None:
+            state = self._values[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+        state[0][bisect_left(self.buckets, value)] += 1
+        state[1] += value
+        state[2] += 1
+
+    def _samples(self) -> Iterator[str]:
+        names = (*self.labelnames, "le")
+        for labels, (counts, total, count) in self._values.items():
+            cumulative = 0
+            for bound, bucket_count in zip((*self.buckets, float("inf")), counts):
+                cumulative += bucket_count
+                label_str = _format_labels(names, (*labels, _format_value(bound)))
+                yield f"{self.name}_bucket{label_str} {cumulative}"
+            label_str = _format_labels(self.labelnames, labels)
+            yield f"{self.name}_sum{label_str} {_format_value(total)}"
+            yield f"{self.name}_count{label_str} {count}"
+
+
+class MetricsRegistry:
+    """Набор метрик процесса с выдачей в текстовом формате Prometheus."""
+
+    def __init__(self):
+        self._metrics: list[_Metric] = []
+        self._collectors: list[Callable[[], None]] = []
+
+    def counter(self, name: str, help: str, labelnames=()) -> Counter:
+        return self._register(Counter(name, help, tuple(labelnames)))
+
+    def gauge(self, name: str, help: str, labelnames=()) -> Gauge:
+        return self._register(Gauge(name, help, tuple(labelnames)))
+
+    def histogram(
+        self, name: str, help: str, labelnames=(), buckets=LATENCY_BUCKETS
+    ) -> Histogram:
+        return self._register(Histogram(name, help, tuple(labelnames), buckets))
+
+    def _register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def add_collector(self, collector: Callable[[], None]) -> None:
+        """Функция, обновляющая gauge и внешние счётчики перед каждой выдачей."""
+        self._collectors.append(collector)
+
+    def render(self) -> str:
+        for collector in self._collectors:
+            collector()
+        lines = [line for metric in self._metrics for line in metric.render()]
+        return "\n".join(lines) + "\n"
+
+
+metrics = MetricsRegistry()
+
+http_requests_total = metrics.counter(
+    "http_requests_total",
+    "HTTP запросы по маршруту и статусу.",
+    ("method", "route", "status"),
+)
+http_request_duration_seconds = metrics.histogram(
+    "http_request_duration_seconds",
+    "Время обработки HTTP запроса.",
+    ("method", "route"),
+)
+http_request_db_queries = metrics.histogram(
+    "http_request_db_queries",
+    "Число запросов к БД на один HTTP запрос.",
+    ("method", "route"),
+    QUERY_COUNT_BUCKETS,
+)
+http_request_db_seconds = metrics.histogram(
+    "http_request_db_seconds",
+    "Суммарное время запросов к БД на один HTTP запрос.",
+    ("method", "route"),
+)
+db_statement_duration_seconds = metrics.histogram(
+    "db_statement_duration_seconds",
+    "Время выполнения SQL выражения по типу операции.",
+    ("operation",),
+    STATEMENT_BUCKETS,
+)
+
+
+@dataclass(slots=True)
+class RequestStats:
+    """Обращения к БД в рамках текущего HTTP запроса."""
+
+    queries: int = 0
+    db_seconds: float = 0.0
+
+
+_request_stats: ContextVar[RequestStats | None] = ContextVar(
+    "request_stats", default=None
+)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, many):
+    context._metrics_started = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, many):
+    elapsed = time.perf_counter() - context._metrics_started
+    operation = statement.split(None, 1)[0].upper() if statement else "UNKNOWN"
+    db_statement_duration_seconds.observe(elapsed, operation)
+    stats = _request_stats.get()
+    if stats is not None:
+        stats.queries += 1
+        stats.db_seconds += elapsed
+
+
+def instrument_engine(engine: AsyncEngine) -> None:
+    """Подписаться на события движка для замера SQL выражений."""
+    sync_engine = engine.sync_engine
+    if not event.contains(sync_engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(sync_engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(sync_engine, "after_cursor_execute", _after_cursor_execute)
+
+
+class MetricsMiddleware:
+    """ASGI middleware: задержка, статусы и запросы к БД по шаблону маршрута."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        stats = RequestStats()
+        token = _request_stats.set(stats)
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = time.perf_counter() - started
+            _request_stats.reset(token)
+            # Шаблон пути, а не сам путь: число серий не растёт с id
+            route = getattr(scope.get("route"), "path", "unmatched")
+            method = scope["method"]
+            http_requests_total.inc(method, route, status)
+            http_request_duration_seconds.observe(elapsed, method, route)
+            http_request_db_queries.observe(stats.queries, method, route)
+            http_request_db_seconds.observe(stats.db_seconds, method, route)
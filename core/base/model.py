@@ -14,7 +14,7 @@ class BaseIDModel:
 
     id = Column(Integer, primary_key=True, autoincrement=True)
     created_at = Column(DateTime, index=True, server_default=func.now())
-    updated_at = Column(DateTime)
+    updated_at = Column(DateTime, onupdate=func.now())
     deleted_at = Column(DateTime)
 
     model_config = ConfigDict(from_attributes=True, arbitrary_types_allowed=True)
@@ -0,0 +1,60 @@
+import time
+from typing import Any
+
+from sqlalchemy import exc
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+__all__ = (
+    "TimedAsyncQueuePool",
+    "pool_status",
+)
+
+
+class TimedAsyncQueuePool(AsyncAdaptedQueuePool):
+    """Очередь соединений, которая считает время их получения.
+
+    Время включает ожидание свободного соединения и открытие нового.
+    """
+
+    def __init__(self, *args: Any, **kwargs: Any):
+        super().__init__(*args, **kwargs)
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            self.timeouts += 1
+            raise
+        finally:
+            waited = time.perf_counter() - started
+            self.checkouts += 1
+            self.wait_total += waited
+            self.wait_max = max(self.wait_max, waited)
+
+
+def pool_status(engine: AsyncEngine) -> dict[str, Any]:
+    """Состояние пула движка: занятые соединения, overflow и ожидание."""
+    pool = engine.sync_engine.pool
+    status: dict[str, Any] = {"pool": type(pool).__name__}
+    if isinstance(pool, QueuePool):
+        status |= {
+            "size": pool.size(),
+            "checked_in": pool.checkedin(),
+            "checked_out": pool.checkedout(),
+            "overflow": max(pool.overflow(), 0),
+            "timeout": pool.timeout(),
+        }
+    if isinstance(pool, TimedAsyncQueuePool):
+        status |= {
+            "checkouts": pool.checkouts,
+            "timeouts": pool.timeouts,
+            "wait_seconds_total": round(pool.wait_total, 6),
+            "wait_seconds_max": round(pool.wait_max, 6),
+        }
+    return status
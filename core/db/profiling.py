@@ -0,0 +1,146 @@
+import logging
+import re
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.orm import ORMExecuteState, Session, raiseload
+
+__all__ = (
+    "QueryBudgetExceeded",
+    "QueryDetectorMiddleware",
+    "QueryLog",
+    "capture_queries",
+    "set_raise_loading",
+    "statement_shape",
+    "track_engine",
+)
+
+logger = logging.getLogger("db.profiling")
+
+_PLACEHOLDER_LIST = re.compile(
+    r"\(\s*(?:\?|\$\d+|%\(\w+\)s)(?:\s*,\s*(?:\?|\$\d+|%\(\w+\)s))*\s*\)"
+)
+_WHITESPACE = re.compile(r"\s+")
+
+
+def statement_shape(statement: str) -> str:
+    """Форма SQL выражения: списки параметров IN (...) и пробелы схлопнуты."""
+    return _WHITESPACE.sub(" ", _PLACEHOLDER_LIST.sub("(?)", statement)).strip()
+
+
+class QueryBudgetExceeded(AssertionError):
+    """Запросов к БД больше бюджета или есть повторяющиеся выражения."""
+
+
+class QueryLog:
+    """Список SQL выражений, выполненных за запрос или блок кода."""
+
+    def __init__(self):
+        self.statements: list[str] = []
+
+    def __len__(self) -> int:
+        return len(self.statements)
+
+    def repeated(self, min_count: int = 2) -> dict[str, int]:
+        """Формы выражений, выполненных не меньше min_count раз (признак N+1)."""
+        shapes = Counter(statement_shape(s) for s in self.statements)
+        return {shape: n for shape, n in shapes.items() if n >= min_count}
+
+    def check(self, max_queries: int, *, max_repeats: int = 1) -> None:
+        """Проверить бюджет запросов и отсутствие повторов одной формы."""
+        if len(self) > max_queries:
+            raise QueryBudgetExceeded(
+                f"{len(self)} запросов к БД при бюджете {max_queries}:\n"
+                + "\n".join(self.statements)
+            )
+        repeated = self.repeated(max_repeats + 1)
+        if repeated:
+            raise QueryBudgetExceeded(f"Повторяющиеся запросы (N+1?): {repeated}")
+
+
+_current_log: ContextVar[QueryLog | None] = ContextVar("query_log", default=None)
+
+
+def _record_statement(conn, cursor, statement, parameters, context, many):
+    log = _current_log.get()
+    if log is not None:
+        log.statements.append(statement)
+
+
+def track_engine(engine: AsyncEngine) -> None:
+    """Записывать выражения движка в QueryLog текущего контекста."""
+    sync_engine = engine.sync_engine
+    if not event.contains(sync_engine, "after_cursor_execute", _record_statement):
+        event.listen(sync_engine, "after_cursor_execute", _record_statement)
+
+
+@contextmanager
+def capture_queries(engine: AsyncEngine) -> Iterator[QueryLog]:
+    """Собрать выражения движка, выполненные внутри блока.
+
+    В тестах: with capture_queries(engine) as log: ...; log.check(2)
+    """
+    track_engine(engine)
+    log = QueryLog()
+    token = _current_log.set(log)
+    try:
+        yield log
+    finally:
+        _current_log.reset(token)
+
+
+def _raise_on_lazy_load(state: ORMExecuteState) -> None:
+    if state.is_select and not state.is_relationship_load:
+        state.statement = state.statement.options(raiseload("*"))
+
+
+def set_raise_loading(enabled: bool) -> None:
+    """Включить lazy="raise" для всех связей без явных опций загрузки.
+
+    Обращение к незагруженной связи бросает InvalidRequestError вместо
+    скрытого запроса (в async — MissingGreenlet) при первом доступе.
+    """
+    listening = event.contains(Session, "do_orm_execute", _raise_on_lazy_load)
+    if enabled and not listening:
+        event.listen(Session, "do_orm_execute", _raise_on_lazy_load)
+    elif not enabled and listening:
+        event.remove(Session, "do_orm_execute", _raise_on_lazy_load)
+
+
+class QueryDetectorMiddleware:
+    """ASGI middleware для разработки: предупреждает о N+1 и лишних запросах.
+
+    Движки должны быть подключены через track_engine.
+    """
+
+    def __init__(self, app, max_queries: int = 0, max_repeats: int = 1):
+        self.app = app
+        self.max_queries = max_queries
+        self.max_repeats = max_repeats
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        log = QueryLog()
+        token = _current_log.set(log)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            _current_log.reset(token)
+            endpoint = f"{scope['method']} {scope['path']}"
+            repeated = log.repeated(self.max_repeats + 1)
+            if repeated:
+                logger.warning("Возможный N+1 в %s: %s", endpoint, repeated)
+            if self.max_queries and len(log) > self.max_queries:
+                logger.warning(
+                    "%s выполнил %d запросов к БД (бюджет %d)",
+                    endpoint,
+                    len(log),
+                    self.max_queries,
+                )
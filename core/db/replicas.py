@@ -0,0 +1,110 @@
+import itertools
+import logging
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Sequence
+
+from fastapi import Request
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from core.base.cache import TTLCache
+
+__all__ = (
+    "CLIENT_COOKIE",
+    "CLIENT_HEADER",
+    "ReadRouter",
+    "client_key",
+    "is_replica",
+)
+
+logger = logging.getLogger("db.replicas")
+
+SAFE_METHODS = frozenset({"GET", "HEAD", "OPTIONS"})
+
+
+CLIENT_HEADER = "X-Client-ID"
+CLIENT_COOKIE = "client_id"
+
+# Ключ Session.info у сессий, открытых на реплике
+_REPLICA_INFO_KEY = "replica"
+
+
+def is_replica(session: AsyncSession) -> bool:
+    """Открыта ли сессия на реплике (данные могут отставать от primary)."""
+    return session.info.get(_REPLICA_INFO_KEY, False)
+
+
+def client_key(request: Request) -> str | None:
+    """Идентификатор клиента для read-your-writes.
+
+    Заголовок X-Client-ID (например, id пользователя у сервиса-клиента) или
+    cookie, выданная при первой записи. Адрес соединения не подходит: за
+    прокси или NAT разные клиенты делят один адрес.
+    """
+    return request.headers.get(CLIENT_HEADER) or request.cookies.get(CLIENT_COOKIE)
+
+
+class ReadRouter:
+    """Выбор сессии для чтения: реплики по кругу, при сбое — primary.
+
+    После записи клиент read_your_writes секунд читает с primary, чтобы
+    не увидеть отстающую реплику.
+    """
+
+    def __init__(
+        self,
+        replicas: Sequence[async_sessionmaker[AsyncSession]] = (),
+        *,
+        read_your_writes: float = 0.0,
+        max_clients: int = 10_000,
+    ):
+        self.replicas = list(replicas)
+        self._next = itertools.count()
+        self._recent_writes = (
+            TTLCache(max_clients, read_your_writes) if read_your_writes > 0 else None
+        )
+
+    @property
+    def tracks_writes(self) -> bool:
+        """Есть ли реплики и включён ли read-your-writes."""
+        return bool(self.replicas) and self._recent_writes is not None
+
+    def mark_write(self, client: str | None) -> None:
+        """Запомнить запись клиента: его чтения временно идут на primary."""
+        if client is not None and self._recent_writes is not None:
+            self._recent_writes.set(client, True)
+
+    def _wrote_recently(self, client: str | None) -> bool:
+        if client is None or self._recent_writes is None:
+            return False
+        found, _ = self._recent_writes.get(client)
+        return found
+
+    async def _open_replica(self) -> AsyncSession | None:
+        """Открыть сессию на первой доступной реплике, начиная с очередной."""
+        start = next(self._next) % len(self.replicas)
+        for maker in self.replicas[start:] + self.replicas[:start]:
+            session = maker()
+            try:
+                await session.connection()
+            except (DBAPIError, OSError) as e:
+                logger.warning("Реплика недоступна: %s", e)
+                await session.close()
+                continue
+            session.info[_REPLICA_INFO_KEY] = True
+            return session
+        return None
+
+    @asynccontextmanager
+    async def session(
+        self, client: str | None, primary: AsyncSession
+    ) -> AsyncIterator[AsyncSession]:
+        """Сессия для чтения; primary, если реплик нет или все недоступны."""
+        replica = None
+        if self.replicas and not self._wrote_recently(client):
+            replica = await self._open_replica()
+        if replica is None:
+            yield primary
+            return
+        async with replica:
+            yield replica
@@ -1,25 +1,113 @@
 from __future__ import annotations
 
 from typing import AsyncIterator
+from uuid import uuid4
 
-from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from fastapi import Depends, Request, Response
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
+from starlette.datastructures import MutableHeaders
 
 from core.base.config import settings
+from core.db.pool import TimedAsyncQueuePool
+from core.db.replicas import CLIENT_COOKIE, SAFE_METHODS, ReadRouter, client_key
+
+
+def _create_engine(url: str) -> AsyncEngine:
+    connect_args = {}
+    # Параметры соединения asyncpg; у других драйверов (например, aiosqlite) их нет
+    if make_url(url).get_dialect().driver == "asyncpg":
+        connect_args = {
+            "prepared_statement_cache_size": settings.DB_PREPARED_STATEMENT_CACHE_SIZE,
+            "server_settings": {
+                "statement_timeout": str(settings.DB_STATEMENT_TIMEOUT_MS),
+            },
+        }
+    return create_async_engine(
+        url,
+        poolclass=TimedAsyncQueuePool,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        # Проверка соединения — лишний запрос на каждое получение из пула
+        pool_pre_ping=settings.DB_POOL_PRE_PING,
+        connect_args=connect_args,
+    )
 
-engine = create_async_engine(
-    f"postgresql+asyncpg://{settings.DB_USER}:{settings.DB_PASSWORD}@{settings.DB_HOST}:{settings.DB_PORT}/{settings.DB_NAME}",
-    pool_pre_ping=True,
+
+engine = _create_engine(
+    f"postgresql+asyncpg://{settings.DB_USER}:{settings.DB_PASSWORD}@{settings.DB_HOST}:{settings.DB_PORT}/{settings.DB_NAME}"
 )
+replica_engines = [_create_engine(url) for url in settings.DB_REPLICA_URLS]
+
 
-AsyncSessionLocal = async_sessionmaker(
-    bind=engine,
-    autocommit=False,
-    autoflush=False,
-    expire_on_commit=False,
-    class_=AsyncSession,
+def _session_maker(bind: AsyncEngine) -> async_sessionmaker[AsyncSession]:
+    return async_sessionmaker(
+        bind=bind,
+        autocommit=False,
+        autoflush=False,
+        expire_on_commit=False,
+        class_=AsyncSession,
+    )
+
+
+AsyncSessionLocal = _session_maker(engine)
+read_router = ReadRouter(
+    [_session_maker(e) for e in replica_engines],
+    read_your_writes=settings.DB_READ_YOUR_WRITES_SECONDS,
 )
 
 
 async def get_db() -> AsyncIterator[AsyncSession]:
     async with AsyncSessionLocal() as session:
         yield session
+
+
+class ReadYourWritesMiddleware:
+    """ASGI middleware: запоминает запись клиента для read_router.
+
+    Клиенту без X-Client-ID и cookie при первой записи выдаётся cookie
+    CLIENT_COOKIE со случайным идентификатором.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if (
+            scope["type"] != "http"
+            or scope["method"] in SAFE_METHODS
+            or not read_router.tracks_writes
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        client = client_key(Request(scope))
+        cookie = None
+        if client is None:
+            client = uuid4().hex
+            response = Response()
+            response.set_cookie(CLIENT_COOKIE, client, httponly=True, samesite="lax")
+            cookie = response.headers["set-cookie"]
+        read_router.mark_write(client)
+
+        async def send_with_cookie(message):
+            if cookie is not None and message["type"] == "http.response.start":
+                MutableHeaders(scope=message).append("set-cookie", cookie)
+            await send(message)
+
+        await self.app(scope, receive, send_with_cookie)
+
+
+async def get_read_db(
+    request: Request, primary: AsyncSession = Depends(get_db)
+) -> AsyncIterator[AsyncSession]:
+    """Сессия для GET эндпоинтов: реплика или primary (см. ReadRouter)."""
+    async with read_router.session(client_key(request), primary) as session:
+        yield session
@@ -1,12 +1,32 @@
 import uvicorn
 from fastapi import FastAPI
 
+from core.base.config import settings
+from core.base.metrics import MetricsMiddleware, instrument_engine
+from core.db.profiling import QueryDetectorMiddleware, set_raise_loading, track_engine
+from core.db.session import ReadYourWritesMiddleware, engine, replica_engines
+from src.api.export import router as export_router
+from src.api.metrics import router as metrics_router
 from src.api.objects import router as objects_router
+from src.api.stats import router as stats_router
 from src.api.users import router as users_router
 
 app = FastAPI()
+app.add_middleware(MetricsMiddleware)
+app.add_middleware(ReadYourWritesMiddleware)
+if settings.DB_QUERY_DETECTOR:
+    app.add_middleware(QueryDetectorMiddleware, max_queries=settings.DB_QUERY_BUDGET)
+for db_engine in (engine, *replica_engines):
+    instrument_engine(db_engine)
+    if settings.DB_QUERY_DETECTOR:
+        track_engine(db_engine)
+set_raise_loading(settings.DB_RAISE_ON_LAZY_LOAD)
 
 app.include_router(users_router)
 app.include_router(objects_router)
+app.include_router(export_router)
+app.include_router(stats_router)
+app.include_router(metrics_router)
+
 if __name__ == "__main__":
     uvicorn.run("main:app", host="0.0.0.0", port=8000, reload=True)
@@ -6,6 +6,7 @@ from sqlalchemy import engine_from_config, pool
 from core.base.config import settings
 from core.base.model import Base
 from src.app.objects.model import Object
+from src.app.stats.model import SubjectStats
 from src.app.users.model import User
 
 # this is the Alembic Config object, which provides
@@ -0,0 +1,35 @@
+"""unique objects user_id name
+
+Revision ID: 3b7d2a9c41e0
+Revises: fa826d0b923d
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3b7d2a9c41e0'
+down_revision: Union[str, Sequence[str], None] = 'fa826d0b923d'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Удаляем дубликаты, оставляя самую раннюю запись
+    op.execute(
+        sa.text(
+            "DELETE FROM objects a USING objects b "
+            "WHERE a.user_id = b.user_id AND a.name = b.name AND a.id > b.id"
+        )
+    )
+    op.create_unique_constraint('uq_objects_user_id_name', 'objects', ['user_id', 'name'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_constraint('uq_objects_user_id_name', 'objects', type_='unique')
@@ -0,0 +1,57 @@
+"""add subject stats
+
+Revision ID: 8c41f05e7d2b
+Revises: 3b7d2a9c41e0
+Create Date: 2026-10-18 13:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8c41f05e7d2b'
+down_revision: Union[str, Sequence[str], None] = '3b7d2a9c41e0'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+HISTOGRAM_BUCKETS = 10
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('subject_stats',
+    sa.Column('name', sa.String(length=50), nullable=False),
+    sa.Column('count', sa.Integer(), nullable=False),
+    sa.Column('total', sa.Integer(), nullable=False),
+    sa.Column('min_point', sa.Integer(), nullable=True),
+    sa.Column('max_point', sa.Integer(), nullable=True),
+    *[
+        sa.Column(f'h{i}', sa.Integer(), nullable=False)
+        for i in range(HISTOGRAM_BUCKETS)
+    ],
+    sa.Column('updated_at', sa.DateTime(), server_default=sa.text('now()'), nullable=True),
+    sa.PrimaryKeyConstraint('name')
+    )
+    op.create_index('ix_objects_name_point', 'objects', ['name', 'point'], unique=False)
+
+    # Начальное заполнение агрегатов по существующим баллам
+    buckets = ', '.join(
+        f'SUM(CASE WHEN LEAST(GREATEST(point / 10, 0), {HISTOGRAM_BUCKETS - 1}) = {i} '
+        f'THEN 1 ELSE 0 END)'
+        for i in range(HISTOGRAM_BUCKETS)
+    )
+    columns = ', '.join(f'h{i}' for i in range(HISTOGRAM_BUCKETS))
+    op.execute(
+        f'INSERT INTO subject_stats (name, count, total, min_point, max_point, {columns}) '
+        f'SELECT name, COUNT(*), SUM(point), MIN(point), MAX(point), {buckets} '
+        f'FROM objects GROUP BY name'
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_objects_name_point', table_name='objects')
+    op.drop_table('subject_stats')
@@ -0,0 +1,41 @@
+import hashlib
+from typing import Any
+
+from fastapi import Request, Response, status
+
+__all__ = (
+    "make_etag",
+    "matches_if_none_match",
+    "not_modified",
+    "set_etag",
+)
+
+
+def make_etag(*parts: Any) -> str:
+    """Сильный ETag из версии ресурса."""
+    digest = hashlib.sha1(repr(parts).encode(), usedforsecurity=False).hexdigest()
+    return f'"{digest}"'
+
+
+def matches_if_none_match(request: Request, etag: str) -> bool:
+    """Проверить If-None-Match (слабое сравнение, как требует RFC 9110)."""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    candidates = {tag.strip().removeprefix("W/") for tag in header.split(",")}
+    return etag in candidates
+
+
+def set_etag(response: Response, etag: str) -> None:
+    """Добавить валидатор; клиент обязан перепроверять его при каждом запросе."""
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = "private, no-cache"
+
+
+def not_modified(etag: str) -> Response:
+    """Ответ 304 без тела."""
+    response = Response(status_code=status.HTTP_304_NOT_MODIFIED)
+    set_etag(response, etag)
+    return response
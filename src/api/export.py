@@ -0,0 +1,61 @@
+import json
+from datetime import datetime
+from typing import Any, AsyncIterator
+
+from fastapi import APIRouter, Depends
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.base.config import settings
+from core.base.crud import CRUDBase
+from core.db.session import get_db
+from src.api.objects import NDJSON_MEDIA_TYPE
+from src.app.objects.crud import object_crud
+from src.app.users.crud import user_crud
+
+router = APIRouter(
+    prefix="/export",
+    tags=["export"],
+)
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+async def _ndjson(
+    crud: CRUDBase, db: AsyncSession, since: datetime | None
+) -> AsyncIterator[bytes]:
+    """Кодировать каждую пачку строк в один чанк NDJSON."""
+    async for partition in crud.stream_partitions(
+        db, since=since, fetch_size=settings.EXPORT_FETCH_SIZE
+    ):
+        lines = [
+            json.dumps(row, default=_json_default, ensure_ascii=False)
+            for row in partition
+        ]
+        yield ("\n".join(lines) + "\n").encode()
+
+
+@router.get("/users")
+async def export_users(
+    since: datetime | None = None,
+    db: AsyncSession = Depends(get_db),
+):
+    """Выгрузить всех пользователей в NDJSON."""
+    return StreamingResponse(
+        _ndjson(user_crud, db, since), media_type=NDJSON_MEDIA_TYPE
+    )
+
+
+@router.get("/objects")
+async def export_objects(
+    since: datetime | None = None,
+    db: AsyncSession = Depends(get_db),
+):
+    """Выгрузить все баллы в NDJSON."""
+    return StreamingResponse(
+        _ndjson(object_crud, db, since), media_type=NDJSON_MEDIA_TYPE
+    )
@@ -0,0 +1,56 @@
+from fastapi import APIRouter, Response
+
+from core.base.metrics import CONTENT_TYPE, metrics
+from core.db.pool import pool_status
+from core.db.session import engine, replica_engines
+
+router = APIRouter(tags=["metrics"])
+
+db_pool_size = metrics.gauge(
+    "db_pool_size", "Размер пула соединений с БД.", ("engine",)
+)
+db_pool_checked_out = metrics.gauge(
+    "db_pool_checked_out", "Занятые соединения пула.", ("engine",)
+)
+db_pool_overflow = metrics.gauge(
+    "db_pool_overflow", "Соединения сверх размера пула.", ("engine",)
+)
+db_pool_checkouts = metrics.counter(
+    "db_pool_checkouts_total", "Получения соединения из пула.", ("engine",)
+)
+db_pool_timeouts = metrics.counter(
+    "db_pool_timeouts_total", "Таймауты ожидания соединения.", ("engine",)
+)
+db_pool_wait_seconds = metrics.counter(
+    "db_pool_wait_seconds_total", "Суммарное время получения соединения.", ("engine",)
+)
+
+
+def collect_pool_metrics() -> None:
+    engines = {"primary": engine}
+    engines |= {f"replica{i}": e for i, e in enumerate(replica_engines)}
+    for name, db_engine in engines.items():
+        status = pool_status(db_engine)
+        for gauge, key in (
+            (db_pool_size, "size"),
+            (db_pool_checked_out, "checked_out"),
+            (db_pool_overflow, "overflow"),
+        ):
+            if key in status:
+                gauge.set(status[key], name)
+        for counter, key in (
+            (db_pool_checkouts, "checkouts"),
+            (db_pool_timeouts, "timeouts"),
+            (db_pool_wait_seconds, "wait_seconds_total"),
+        ):
+            if key in status:
+                counter.set_total(status[key], name)
+
+
+metrics.add_collector(collect_pool_metrics)
+
+
+@router.get("/metrics", include_in_schema=False)
+async def get_metrics() -> Response:
+    """Метрики процесса в текстовом формате Prometheus."""
+    return Response(metrics.render(), media_type=CONTENT_TYPE)
@@ -1,9 +1,29 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+import json
+from typing import Any
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from pydantic import TypeAdapter
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from core.db.session import get_db
+from core.base.config import settings
+from core.base.crud import InvalidCursorError
+from core.db.session import get_read_db
+from src.api.conditional import (
+    make_etag,
+    matches_if_none_match,
+    not_modified,
+    set_etag,
+)
+from src.api.pagination import invalid_cursor, set_next_cursor
+from src.api.responses import AdapterJSONResponse
 from src.app.objects.crud import object_crud
-from src.app.objects.schema import ObjectCreate, ObjectRead
+from src.app.objects.schema import (
+    ObjectBulkResponse,
+    ObjectCreate,
+    ObjectRead,
+    ObjectRow,
+    ObjectUpdate,
+)
 from src.app.objects.service import ObjectService, object_service
 
 router = APIRouter(
@@ -11,14 +31,101 @@ router = APIRouter(
     tags=["objects"],
 )
 
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+object_rows_adapter = TypeAdapter(list[ObjectRow])
+
+
+def _parse_ndjson_line(line: bytes) -> Any:
+    """Разобрать строку NDJSON; невалидный JSON отдаётся как есть на валидацию."""
+    try:
+        return json.loads(line)
+    except ValueError:
+        return line.decode(errors="replace")
+
+
+async def _read_bulk_rows(request: Request) -> list[Any]:
+    """Прочитать строки из JSON массива или потока NDJSON."""
+    content_type = request.headers.get("content-type", "")
+    if content_type.startswith(NDJSON_MEDIA_TYPE):
+        rows: list[Any] = []
+        buffer = b""
+        async for chunk in request.stream():
+            buffer += chunk
+            *lines, buffer = buffer.split(b"\n")
+            rows.extend(_parse_ndjson_line(line) for line in lines if line.strip())
+            if len(rows) > settings.BULK_MAX_ROWS:
+                break
+        if buffer.strip():
+            rows.append(_parse_ndjson_line(buffer))
+    else:
+        try:
+            rows = await request.json()
+        except ValueError:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid JSON"
+            )
+        if not isinstance(rows, list):
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                detail="Expected a JSON array",
+            )
+    if len(rows) > settings.BULK_MAX_ROWS:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"Too many rows, max {settings.BULK_MAX_ROWS}",
+        )
+    return rows
+
 
 @router.get("/{user_id}", response_model=list[ObjectRead])
 async def get_all_objects_by_user_id(
     user_id: int,
-    db: AsyncSession = Depends(get_db),
+    request: Request,
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: str | None = None,
+    db: AsyncSession = Depends(get_read_db),
 ):
-    objects = await object_crud.get_all_objects_by_user_id(db, user_id)
-    return [ObjectRead.model_validate(obj) for obj in objects]
+    version = await object_crud.get_user_objects_version(db, user_id)
+    etag = make_etag("objects", user_id, limit, cursor, *version)
+    if matches_if_none_match(request, etag):
+        return not_modified(etag)
+    try:
+        objects, next_cursor = await object_crud.get_objects_page_by_user_id(
+            db, user_id, limit=limit, cursor=cursor
+        )
+    except InvalidCursorError as e:
+        raise invalid_cursor(e)
+    response = AdapterJSONResponse(objects, adapter=object_rows_adapter)
+    set_etag(response, etag)
+    set_next_cursor(response, next_cursor)
+    return response
+
+
+@router.post(
+    "/bulk",
+    response_model=ObjectBulkResponse,
+    openapi_extra={
+        "requestBody": {
+            "content": {
+                "application/json": {
+                    "schema": {
+                        "type": "array",
+                        "items": ObjectCreate.model_json_schema(),
+                    }
+                },
+                NDJSON_MEDIA_TYPE: {"schema": ObjectCreate.model_json_schema()},
+            },
+            "required": True,
+        }
+    },
+)
+async def bulk_upsert_objects(
+    request: Request,
+    service: ObjectService = Depends(object_service),
+):
+    rows = await _read_bulk_rows(request)
+    return await service.bulk_upsert_objects(rows)
 
 
 @router.post("/", response_model=ObjectRead)
@@ -34,3 +141,13 @@ async def create_new_object(
             status_code=status.HTTP_400_BAD_REQUEST, detail="Object already exists"
         )
     return ObjectRead.model_validate(obj)
+
+
+@router.put("/{user_id}", response_model=ObjectRead)
+async def upsert_object(
+    user_id: int,
+    object_in: ObjectUpdate,
+    service: ObjectService = Depends(object_service),
+):
+    obj = await service.upsert_object(user_id=user_id, object_in=object_in)
+    return ObjectRead.model_validate(obj)
@@ -0,0 +1,22 @@
+from fastapi import HTTPException, Response, status
+
+from core.base.crud import InvalidCursorError
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+__all__ = (
+    "NEXT_CURSOR_HEADER",
+    "invalid_cursor",
+    "set_next_cursor",
+)
+
+
+def invalid_cursor(e: InvalidCursorError) -> HTTPException:
+    """Ошибка 400 для повреждённого курсора."""
+    return HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+
+def set_next_cursor(response: Response, next_cursor: str | None) -> None:
+    """Передать курсор следующей страницы в заголовке ответа."""
+    if next_cursor is not None:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
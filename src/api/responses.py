@@ -0,0 +1,29 @@
+from typing import Any, Mapping
+
+from fastapi import Response
+from pydantic import TypeAdapter
+
+__all__ = ("AdapterJSONResponse",)
+
+
+class AdapterJSONResponse(Response):
+    """JSON ответ, кодируемый TypeAdapter в pydantic-core.
+
+    Обходит повторную валидацию response_model и json.dumps. Содержимое
+    не валидируется: передавать нужно строки из БД, совпадающие со схемой.
+    """
+
+    media_type = "application/json"
+
+    def __init__(
+        self,
+        content: Any,
+        adapter: TypeAdapter,
+        status_code: int = 200,
+        headers: Mapping[str, str] | None = None,
+    ):
+        self.adapter = adapter
+        super().__init__(content, status_code=status_code, headers=headers)
+
+    def render(self, content: Any) -> bytes:
+        return self.adapter.dump_json(content)
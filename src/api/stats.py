@@ -0,0 +1,38 @@
+from typing import Any
+
+from fastapi import APIRouter, Depends
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.db.pool import pool_status
+from core.db.session import engine, get_db
+from src.app.objects.crud import object_crud
+from src.app.stats.crud import subject_stats_crud
+from src.app.stats.schema import SubjectStatsRead
+from src.app.users.crud import user_crud
+
+router = APIRouter(
+    prefix="/stats",
+    tags=["stats"],
+)
+
+
+@router.get("/subjects", response_model=list[SubjectStatsRead])
+async def get_subject_stats(db: AsyncSession = Depends(get_db)):
+    """Статистика баллов по предметам из таблицы агрегатов."""
+    stats = await subject_stats_crud.get_all_subjects(db)
+    return [SubjectStatsRead.model_validate(item) for item in stats]
+
+
+@router.get("/cache")
+async def get_cache_stats() -> dict[str, dict[str, int] | None]:
+    """Счётчики кэша get_by_id по моделям (None — кэш выключен)."""
+    return {
+        "users": user_crud.cache_stats(),
+        "objects": object_crud.cache_stats(),
+    }
+
+
+@router.get("/pool")
+async def get_pool_stats() -> dict[str, Any]:
+    """Состояние пула соединений с БД этого процесса."""
+    return pool_status(engine)
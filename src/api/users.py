@@ -1,29 +1,125 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from typing import Literal
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from pydantic import TypeAdapter
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from core.db.session import get_db
+from core.base.crud import InvalidCursorError
+from core.db.session import get_db, get_read_db
+from src.api.conditional import (
+    make_etag,
+    matches_if_none_match,
+    not_modified,
+    set_etag,
+)
+from src.api.pagination import invalid_cursor, set_next_cursor
+from src.api.responses import AdapterJSONResponse
+from src.app.objects.crud import object_crud
 from src.app.users.crud import user_crud
-from src.app.users.schema import UserCreate, UserRead
+from src.app.users.model import User
+from src.app.users.schema import UserCreate, UserRead, UserRow, UserScoresRead
 
 router = APIRouter(
     prefix="/users",
     tags=["users"],
 )
 
+USERS_BATCH_MAX = 1000
+
+user_rows_adapter = TypeAdapter(list[UserRow])
+
+
+@router.get("/", response_model=list[UserRead])
+async def get_users(
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: str | None = None,
+    order_by: Literal["id", "created_at"] = "id",
+    ids: str | None = Query(
+        None,
+        pattern=r"^\d+(,\d+)*$",
+        description="Пользователи по списку id через запятую (до 1000), без пагинации",
+    ),
+    db: AsyncSession = Depends(get_read_db),
+):
+    """Получить страницу пользователей (курсор следующей в X-Next-Cursor).
+
+    С ids — пользователи из списка одним запросом (отсутствующие пропущены).
+    """
+    fields = list(UserRow.__annotations__)
+    if ids is not None:
+        id_list = sorted({int(i) for i in ids.split(",")})
+        if len(id_list) > USERS_BATCH_MAX:
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                detail=f"Too many ids, max {USERS_BATCH_MAX}",
+            )
+        users, _ = await user_crud.get_page_rows(
+            db, fields=fields, limit=len(id_list), where=[User.id.in_(id_list)]
+        )
+        return AdapterJSONResponse(users, adapter=user_rows_adapter)
+    try:
+        users, next_cursor = await user_crud.get_page_rows(
+            db,
+            fields=fields,
+            limit=limit,
+            cursor=cursor,
+            order_by=order_by,
+        )
+    except InvalidCursorError as e:
+        raise invalid_cursor(e)
+    response = AdapterJSONResponse(users, adapter=user_rows_adapter)
+    set_next_cursor(response, next_cursor)
+    return response
+
 
 @router.get("/telegram/{telegram_id}", response_model=UserRead)
-async def get_user_by_telegram_id(telegram_id: str, db: AsyncSession = Depends(get_db)):
+async def get_user_by_telegram_id(
+    telegram_id: str,
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_read_db),
+):
     """Получить пользователя по Telegram ID."""
     user = await user_crud.get_user_by_telegram_id(db, telegram_id)
     if user is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="User not found"
         )
+    etag = make_etag("user", user.id, user.created_at, user.updated_at)
+    if matches_if_none_match(request, etag):
+        return not_modified(etag)
+    set_etag(response, etag)
     return UserRead.model_validate(user)
 
 
+@router.get("/telegram/{telegram_id}/scores", response_model=UserScoresRead)
+async def get_user_scores_by_telegram_id(
+    telegram_id: str,
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_read_db),
+):
+    """Получить пользователя по Telegram ID вместе с его баллами.
+
+    ETag строится из версии пользователя и версии его баллов, поэтому 304
+    отдаётся без загрузки самих баллов.
+    """
+    user = await user_crud.get_user_by_telegram_id(db, telegram_id)
+    if user is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="User not found"
+        )
+    version = await object_crud.get_user_objects_version(db, user.id)
+    etag = make_etag("scores", user.id, user.created_at, user.updated_at, *version)
+    if matches_if_none_match(request, etag):
+        return not_modified(etag)
+    await user_crud.load_objects(db, user)
+    set_etag(response, etag)
+    return UserScoresRead.model_validate(user)
+
+
 @router.get("/{user_id}", response_model=UserRead)
-async def get_user_by_id(user_id: int, db: AsyncSession = Depends(get_db)):
+async def get_user_by_id(user_id: int, db: AsyncSession = Depends(get_read_db)):
     """Получить пользователя по ID."""
     user = await user_crud.get_by_id(db, user_id)
     if user is None:
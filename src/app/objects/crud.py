@@ -1,13 +1,41 @@
-from sqlalchemy import select
+from typing import Any
+
+from sqlalchemy import (
+    Integer,
+    Row,
+    String,
+    column,
+    func,
+    literal_column,
+    select,
+    true,
+    values,
+)
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from core.base.cache import LRUCacheBackend
+from core.base.config import settings
 from core.base.crud import CRUDBase
 from src.app.objects.model import Object
-from src.app.objects.schema import ObjectCreate, ObjectUpdate
+from src.app.objects.schema import ObjectCreate, ObjectRow, ObjectUpdate
+from src.app.stats.crud import subject_stats_crud
+from src.app.users.model import User
 
 
 class ObjectCRUD(CRUDBase[Object, ObjectCreate, ObjectUpdate]):
 
+    async def _on_change(
+        self,
+        db: AsyncSession,
+        old: dict[str, Any] | None,
+        new: dict[str, Any] | None,
+    ) -> None:
+        """Поддерживать агрегаты subject_stats в той же транзакции."""
+        removed = [(old["name"], old["point"])] if old else []
+        added = [(new["name"], new["point"])] if new else []
+        if removed != added:
+            await subject_stats_crud.apply(db, added=added, removed=removed)
+
     async def get_all_objects_by_user_id(
         self, db: AsyncSession, user_id: int
     ) -> list[Object]:
@@ -16,6 +44,38 @@ class ObjectCRUD(CRUDBase[Object, ObjectCreate, ObjectUpdate]):
         items = list(result.scalars().all())
         return items
 
+    async def get_user_objects_version(
+        self, db: AsyncSession, user_id: int
+    ) -> tuple[Any, ...]:
+        """Версия набора баллов пользователя без загрузки самих строк.
+
+        Меняется при любом создании, изменении или удалении балла.
+        """
+        stmt = select(
+            func.count(),
+            func.max(Object.id),
+            func.sum(Object.point),
+            func.max(func.coalesce(Object.updated_at, Object.created_at)),
+        ).where(Object.user_id == user_id)
+        result = await db.execute(stmt)
+        return tuple(result.one())
+
+    async def get_objects_page_by_user_id(
+        self,
+        db: AsyncSession,
+        user_id: int,
+        *,
+        limit: int = 100,
+        cursor: str | None = None,
+    ) -> tuple[list[ObjectRow], str | None]:
+        return await self.get_page_rows(
+            db,
+            fields=list(ObjectRow.__annotations__),
+            limit=limit,
+            cursor=cursor,
+            where=[Object.user_id == user_id],
+        )
+
     async def get_object_by_user_id_and_object_name(
         self, db: AsyncSession, user_id: int, object_name: str
     ) -> Object | None:
@@ -26,5 +86,170 @@ class ObjectCRUD(CRUDBase[Object, ObjectCreate, ObjectUpdate]):
         item = result.scalar_one_or_none()
         return item
 
+    async def create_if_not_exists(
+        self, db: AsyncSession, *, obj_in: ObjectCreate
+    ) -> Object | None:
+        """Создать объект одним INSERT ... ON CONFLICT DO NOTHING RETURNING.
+
+        Возвращает None, если объект с такими user_id и name уже существует.
+        """
+        stmt = (
+            self._insert(db)
+            .values(**obj_in.model_dump())
+            .on_conflict_do_nothing(index_elements=["user_id", "name"])
+            .returning(Object)
+        )
+        result = await db.execute(stmt)
+        item = result.scalar_one_or_none()
+        if item is not None:
+            await self._on_change(db, None, self._to_dict(item))
+        await db.commit()
+        return item
+
+    def _upsert_returning_old(
+        self, db: AsyncSession, rows: list[tuple[int, str, int]], *columns: Any
+    ) -> Any:
+        """INSERT ... ON CONFLICT DO UPDATE, возвращающий и прежний балл.
+
+        rows — кортежи (user_id, name, point). Прежние баллы читает CTE old
+        в том же запросе (old_point, None у новых). Источник INSERT
+        соединяется с old, чтобы SQLite материализовал old до вставки, как
+        снимок в PostgreSQL. Конфликтующую строку, которой не было в снимке
+        (её только что записал параллельный запрос), условие WHERE не
+        обновляет, и она не возвращается: такие ключи нужно повторить.
+        На целевую строку подзапрос ссылается по имени таблицы: INSERT не
+        коррелирует подзапросы сам.
+        """
+        new = (
+            values(
+                column("user_id", Integer),
+                column("name", String),
+                column("point", Integer),
+                name="new",
+            )
+            .data(rows)
+            .cte("new")
+        )
+        current = Object.__table__.alias("current")
+        old = (
+            select(
+                current.c.user_id.label("old_user_id"),
+                current.c.name.label("old_name"),
+                current.c.point.label("old_point"),
+            )
+            .where(current.c.user_id == new.c.user_id, current.c.name == new.c.name)
+            .cte("old")
+            .prefix_with("MATERIALIZED")
+        )
+        source = (
+            select(new.c.user_id, new.c.name, new.c.point).outerjoin(
+                old,
+                (old.c.old_user_id == new.c.user_id) & (old.c.old_name == new.c.name),
+            )
+            # WHERE нужен SQLite, чтобы отличить ON CONFLICT от JOIN ... ON
+            .where(true())
+        )
+        old_point = (
+            select(old.c.old_point)
+            .where(
+                old.c.old_user_id == literal_column("objects.user_id"),
+                old.c.old_name == literal_column("objects.name"),
+            )
+            .scalar_subquery()
+        )
+        insert_stmt = self._insert(db).from_select(["user_id", "name", "point"], source)
+        return (
+            insert_stmt.on_conflict_do_update(
+                index_elements=["user_id", "name"],
+                set_={"point": insert_stmt.excluded.point, "updated_at": func.now()},
+                where=Object.point == old_point,
+            )
+            .add_cte(new, old)
+            .returning(*columns, old_point.label("old_point"))
+        )
+
+    async def upsert(
+        self, db: AsyncSession, *, user_id: int, obj_in: ObjectUpdate
+    ) -> Object:
+        """Создать или заменить балл одним INSERT ... ON CONFLICT DO UPDATE.
+
+        Прежний балл для агрегатов возвращает тот же запрос. Запрос
+        повторяется, только если ключ одновременно записал другой запрос.
+        """
+        rows = [(user_id, obj_in.name, obj_in.point)]
+        row = None
+        while row is None:
+            stmt = self._upsert_returning_old(db, rows, Object).execution_options(
+                populate_existing=True
+            )
+            row = (await db.execute(stmt)).one_or_none()
+        item, old_point = row
+        old = None if old_point is None else {"name": item.name, "point": old_point}
+        await self._on_change(db, old, self._to_dict(item))
+        await db.commit()
+        await self.invalidate_cache(item.id)
+        return item
+
+    async def get_existing_user_ids(
+        self, db: AsyncSession, user_ids: set[int]
+    ) -> set[int]:
+        """Вернуть те user_id из набора, которые есть в таблице users."""
+        if not user_ids:
+            return set()
+        stmt = select(User.id).where(User.id.in_(user_ids))
+        result = await db.execute(stmt)
+        return set(result.scalars().all())
+
+    async def bulk_upsert(
+        self,
+        db: AsyncSession,
+        *,
+        objs_in: list[ObjectCreate],
+        chunk_size: int | None = None,
+    ) -> list[Row]:
+        """Массовый upsert баллов многострочными INSERT ... ON CONFLICT DO UPDATE.
+
+        Все пачки пишутся в одной транзакции, прежние баллы для агрегатов
+        возвращает тот же запрос (см. _upsert_returning_old). Возвращает
+        строки (id, user_id, name, updated_at, old_point); updated_at равен
+        None у новых записей. Ключи (user_id, name) во входных данных должны
+        быть уникальны.
+        """
+        chunk_size = chunk_size or settings.BULK_CHUNK_SIZE
+        rows: list[Row] = []
+        added: list[tuple[str, int]] = []
+        removed: list[tuple[str, int]] = []
+        for start in range(0, len(objs_in), chunk_size):
+            pending = {
+                (obj.user_id, obj.name): obj
+                for obj in objs_in[start : start + chunk_size]
+            }
+            while pending:
+                stmt = self._upsert_returning_old(
+                    db,
+                    [(obj.user_id, obj.name, obj.point) for obj in pending.values()],
+                    Object.id,
+                    Object.user_id,
+                    Object.name,
+                    Object.updated_at,
+                )
+                for row in (await db.execute(stmt)).all():
+                    obj = pending.pop((row.user_id, row.name))
+                    added.append((obj.name, obj.point))
+                    if row.old_point is not None:
+                        removed.append((obj.name, row.old_point))
+                    rows.append(row)
+        await subject_stats_crud.apply(db, added=added, removed=removed)
+        await db.commit()
+        await self.invalidate_cache(*(row.id for row in rows if row.updated_at))
+        return rows
+
 
-object_crud = ObjectCRUD(Object)
+object_crud = ObjectCRUD(
+    Object,
+    cache=(
+        LRUCacheBackend(settings.CRUD_CACHE_SIZE, settings.CRUD_CACHE_TTL)
+        if settings.OBJECTS_CACHE_ENABLED
+        else None
+    ),
+)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, ForeignKey, Integer, String
+from sqlalchemy import Column, ForeignKey, Index, Integer, String, UniqueConstraint
 from sqlalchemy.orm import relationship
 
 from core.base.model import Base, BaseIDModel
@@ -12,5 +12,9 @@ class ObjectBase:
 
 class Object(BaseIDModel, ObjectBase, Base):
     __tablename__ = "objects"
+    __table_args__ = (
+        UniqueConstraint("user_id", "name", name="uq_objects_user_id_name"),
+        Index("ix_objects_name_point", "name", "point"),
+    )
 
     user = relationship("User", back_populates="objects", lazy="select")
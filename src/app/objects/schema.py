@@ -1,3 +1,5 @@
+from typing import Literal, TypedDict
+
 from pydantic import BaseModel, ConfigDict
 
 
@@ -19,3 +21,26 @@ class ObjectRead(BaseModel):
     name: str
     point: int
     user_id: int
+
+
+class ObjectRow(TypedDict):
+    """Строка ObjectRead из БД для сериализации списков без валидации."""
+
+    id: int
+    name: str
+    point: int
+    user_id: int
+
+
+class ObjectBulkResult(BaseModel):
+    index: int
+    status: Literal["created", "updated", "duplicate", "invalid"]
+    id: int | None = None
+    error: str | None = None
+
+
+class ObjectBulkResponse(BaseModel):
+    created: int
+    updated: int
+    failed: int
+    results: list[ObjectBulkResult]
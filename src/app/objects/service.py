@@ -1,10 +1,18 @@
+from typing import Any
+
 from fastapi import Depends
+from pydantic import ValidationError
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from core.db.session import get_db
-from src.app.objects.crud import ObjectCRUD
+from src.app.objects.crud import ObjectCRUD, object_crud
 from src.app.objects.model import Object
-from src.app.objects.schema import ObjectCreate
+from src.app.objects.schema import (
+    ObjectBulkResponse,
+    ObjectBulkResult,
+    ObjectCreate,
+    ObjectUpdate,
+)
 
 
 class ObjectService:
@@ -15,14 +23,60 @@ class ObjectService:
     async def create_new_object(
         self, user_id: int, object_in: ObjectCreate
     ) -> Object | None:
-        obj = await self.object_crud.get_object_by_user_id_and_object_name(
-            self.db, user_id, object_in.name
+        return await self.object_crud.create_if_not_exists(self.db, obj_in=object_in)
+
+    async def upsert_object(self, user_id: int, object_in: ObjectUpdate) -> Object:
+        return await self.object_crud.upsert(self.db, user_id=user_id, obj_in=object_in)
+
+    async def bulk_upsert_objects(self, rows: list[Any]) -> ObjectBulkResponse:
+        """Проверить все строки и записать валидные одним upsert."""
+        results: list[ObjectBulkResult | None] = [None] * len(rows)
+        # Последняя строка с тем же (user_id, name) заменяет предыдущие
+        valid: dict[tuple[int, str], tuple[int, ObjectCreate]] = {}
+        for index, row in enumerate(rows):
+            try:
+                obj_in = ObjectCreate.model_validate(row)
+            except ValidationError as e:
+                results[index] = ObjectBulkResult(
+                    index=index, status="invalid", error=e.errors()[0]["msg"]
+                )
+                continue
+            key = (obj_in.user_id, obj_in.name)
+            if key in valid:
+                previous = valid[key][0]
+                results[previous] = ObjectBulkResult(index=previous, status="duplicate")
+            valid[key] = (index, obj_in)
+
+        existing_user_ids = await self.object_crud.get_existing_user_ids(
+            self.db, {user_id for user_id, _ in valid}
+        )
+        to_write: dict[tuple[int, str], int] = {}
+        for key, (index, obj_in) in valid.items():
+            if obj_in.user_id in existing_user_ids:
+                to_write[key] = index
+            else:
+                results[index] = ObjectBulkResult(
+                    index=index, status="invalid", error="User not found"
+                )
+
+        written = []
+        if to_write:
+            written = await self.object_crud.bulk_upsert(
+                self.db, objs_in=[valid[key][1] for key in to_write]
+            )
+        for row in written:
+            index = to_write[(row.user_id, row.name)]
+            status = "created" if row.updated_at is None else "updated"
+            results[index] = ObjectBulkResult(index=index, status=status, id=row.id)
+
+        statuses = [result.status for result in results]
+        return ObjectBulkResponse(
+            created=statuses.count("created"),
+            updated=statuses.count("updated"),
+            failed=statuses.count("invalid"),
+            results=results,
         )
-        if obj is None:
-            return await self.object_crud.create(self.db, obj_in=object_in)
-        else:
-            return None
 
 
 async def object_service(db: AsyncSession = Depends(get_db)) -> ObjectService:
-    return ObjectService(db=db, object_crud=ObjectCRUD(Object))
+    return ObjectService(db=db, object_crud=object_crud)
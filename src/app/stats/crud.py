@@ -0,0 +1,163 @@
+from collections import defaultdict
+from typing import Iterable
+
+from sqlalchemy import case, delete, func, insert, literal, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.base.crud import CRUDBase
+from src.app.objects.model import Object
+from src.app.stats.model import HISTOGRAM_BUCKETS, SubjectStats, bucket_of
+from src.app.stats.schema import SubjectStatsRead
+
+HISTOGRAM_COLUMNS = [f"h{i}" for i in range(HISTOGRAM_BUCKETS)]
+
+
+class SubjectStatsCRUD(CRUDBase[SubjectStats, SubjectStatsRead, SubjectStatsRead]):
+
+    async def get_all_subjects(self, db: AsyncSession) -> list[SubjectStats]:
+        stmt = (
+            select(SubjectStats)
+            .where(SubjectStats.count > 0)
+            .order_by(SubjectStats.name)
+        )
+        result = await db.execute(stmt)
+        return list(result.scalars().all())
+
+    async def apply(
+        self,
+        db: AsyncSession,
+        *,
+        added: Iterable[tuple[str, int]] = (),
+        removed: Iterable[tuple[str, int]] = (),
+    ) -> None:
+        """Учесть добавленные и удалённые баллы (name, point) без коммита.
+
+        Все предметы обновляются одним INSERT ... ON CONFLICT DO UPDATE.
+        Если баллы удалялись, min/max этих предметов пересчитываются по
+        индексу objects(name, point).
+        """
+        deltas: dict[str, dict] = defaultdict(
+            lambda: {"count": 0, "total": 0, "min_point": None, "max_point": None}
+            | {column: 0 for column in HISTOGRAM_COLUMNS}
+        )
+        for name, point in added:
+            delta = deltas[name]
+            delta["count"] += 1
+            delta["total"] += point
+            delta[f"h{bucket_of(point)}"] += 1
+            if delta["min_point"] is None or point < delta["min_point"]:
+                delta["min_point"] = point
+            if delta["max_point"] is None or point > delta["max_point"]:
+                delta["max_point"] = point
+        # Диапазон удалённых баллов по предмету: (min, max)
+        removed_bounds: dict[str, tuple[int, int]] = {}
+        for name, point in removed:
+            delta = deltas[name]
+            delta["count"] -= 1
+            delta["total"] -= point
+            delta[f"h{bucket_of(point)}"] -= 1
+            low, high = removed_bounds.get(name, (point, point))
+            removed_bounds[name] = (min(low, point), max(high, point))
+        if not deltas:
+            return
+
+        insert_stmt = self._insert(db).values(
+            [{"name": name, **delta} for name, delta in deltas.items()]
+        )
+        excluded = insert_stmt.excluded
+        table = SubjectStats.__table__.c
+        set_ = {
+            column: table[column] + excluded[column]
+            for column in ["count", "total", *HISTOGRAM_COLUMNS]
+        }
+        set_["min_point"] = case(
+            (
+                excluded.min_point.is_not(None)
+                & (table.min_point.is_(None) | (excluded.min_point < table.min_point)),
+                excluded.min_point,
+            ),
+            else_=table.min_point,
+        )
+        set_["max_point"] = case(
+            (
+                excluded.max_point.is_not(None)
+                & (table.max_point.is_(None) | (excluded.max_point > table.max_point)),
+                excluded.max_point,
+            ),
+            else_=table.max_point,
+        )
+        set_["updated_at"] = func.now()
+        await db.execute(
+            insert_stmt.on_conflict_do_update(index_elements=["name"], set_=set_)
+        )
+        if removed_bounds:
+            await self.refresh_bounds(db, removed_bounds)
+
+    async def refresh_bounds(
+        self, db: AsyncSession, removed_bounds: dict[str, tuple[int, int]]
+    ) -> None:
+        """Пересчитать min/max предметов, если удалённый балл был границей.
+
+        Одно UPDATE на предмет; строка не меняется, если удалённые баллы
+        лежат строго внутри текущего диапазона.
+        """
+        # Незаписанные изменения objects должны попасть в подзапросы
+        await db.flush()
+        for name, (low, high) in removed_bounds.items():
+            points = select(Object.point).where(Object.name == name)
+            await db.execute(
+                update(SubjectStats)
+                .where(
+                    SubjectStats.name == name,
+                    (SubjectStats.min_point >= low) | (SubjectStats.max_point <= high),
+                )
+                .values(
+                    min_point=points.with_only_columns(
+                        func.min(Object.point)
+                    ).scalar_subquery(),
+                    max_point=points.with_only_columns(
+                        func.max(Object.point)
+                    ).scalar_subquery(),
+                )
+            )
+
+    async def rebuild(self, db: AsyncSession) -> int:
+        """Полностью пересчитать агрегаты по таблице objects."""
+        bucket = case(
+            *[
+                (Object.point < (i + 1) * 10, literal(i))
+                for i in range(HISTOGRAM_BUCKETS - 1)
+            ],
+            else_=literal(HISTOGRAM_BUCKETS - 1),
+        )
+        source = select(
+            Object.name,
+            func.count(),
+            func.sum(Object.point),
+            func.min(Object.point),
+            func.max(Object.point),
+            *[
+                func.sum(case((bucket == i, 1), else_=0))
+                for i in range(HISTOGRAM_BUCKETS)
+            ],
+        ).group_by(Object.name)
+        await db.execute(delete(SubjectStats))
+        await db.execute(
+            insert(SubjectStats).from_select(
+                [
+                    "name",
+                    "count",
+                    "total",
+                    "min_point",
+                    "max_point",
+                    *HISTOGRAM_COLUMNS,
+                ],
+                source,
+            )
+        )
+        await db.commit()
+        result = await db.execute(select(func.count()).select_from(SubjectStats))
+        return result.scalar_one()
+
+
+subject_stats_crud = SubjectStatsCRUD(SubjectStats)
@@ -0,0 +1,42 @@
+from sqlalchemy import Column, DateTime, Integer, String, func
+
+from core.base.model import Base
+
+# Корзины гистограммы: [0-9], [10-19], ..., [90-100]
+HISTOGRAM_BUCKETS = 10
+
+
+def bucket_of(point: int) -> int:
+    """Номер корзины гистограммы для балла."""
+    return min(max(point // 10, 0), HISTOGRAM_BUCKETS - 1)
+
+
+class SubjectStats(Base):
+    """Агрегаты баллов по предмету, обновляемые при каждой записи."""
+
+    __tablename__ = "subject_stats"
+
+    name = Column(String(50), primary_key=True)
+    count = Column(Integer, nullable=False, default=0)
+    total = Column(Integer, nullable=False, default=0)
+    min_point = Column(Integer)
+    max_point = Column(Integer)
+    h0 = Column(Integer, nullable=False, default=0)
+    h1 = Column(Integer, nullable=False, default=0)
+    h2 = Column(Integer, nullable=False, default=0)
+    h3 = Column(Integer, nullable=False, default=0)
+    h4 = Column(Integer, nullable=False, default=0)
+    h5 = Column(Integer, nullable=False, default=0)
+    h6 = Column(Integer, nullable=False, default=0)
+    h7 = Column(Integer, nullable=False, default=0)
+    h8 = Column(Integer, nullable=False, default=0)
+    h9 = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
+
+    @property
+    def histogram(self) -> list[int]:
+        return [getattr(self, f"h{i}") for i in range(HISTOGRAM_BUCKETS)]
+
+    @property
+    def average(self) -> float | None:
+        return self.total / self.count if self.count else None
@@ -0,0 +1,27 @@
+"""Полный пересчёт агрегатов subject_stats.
+
+Запуск: python -m src.app.stats.rebuild
+"""
+
+import asyncio
+import logging
+
+from core.db.session import AsyncSessionLocal
+from src.app.stats.crud import subject_stats_crud
+
+logger = logging.getLogger(__name__)
+
+
+async def rebuild() -> int:
+    async with AsyncSessionLocal() as session:
+        return await subject_stats_crud.rebuild(session)
+
+
+def main() -> None:
+    logging.basicConfig(level=logging.INFO)
+    subjects = asyncio.run(rebuild())
+    logger.info("Агрегаты пересчитаны: %d предметов", subjects)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,12 @@
+from pydantic import BaseModel, ConfigDict
+
+
+class SubjectStatsRead(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    name: str
+    count: int
+    average: float | None
+    min_point: int | None
+    max_point: int | None
+    histogram: list[int]
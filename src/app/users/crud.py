@@ -1,7 +1,12 @@
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+from sqlalchemy.orm.attributes import set_committed_value
 
+from core.base.cache import LRUCacheBackend
+from core.base.config import settings
 from core.base.crud import CRUDBase
+from src.app.objects.model import Object
 from src.app.users.model import User
 from src.app.users.schema import UserCreate, UserUpdate
 
@@ -15,5 +20,30 @@ class UserCRUD(CRUDBase[User, UserCreate, UserUpdate]):
         result = await db.execute(stmt)
         return result.scalar_one_or_none()
 
+    async def get_user_with_objects(
+        self, db: AsyncSession, telegram_id: str
+    ) -> User | None:
+        """Пользователь по telegram_id вместе с баллами (selectinload)."""
+        stmt = (
+            select(User)
+            .where(User.telegram_id == telegram_id)
+            .options(selectinload(User.objects))
+        )
+        result = await db.execute(stmt)
+        return result.scalar_one_or_none()
+
+    async def load_objects(self, db: AsyncSession, user: User) -> None:
+        """Догрузить баллы уже загруженного пользователя одним запросом."""
+        stmt = select(Object).where(Object.user_id == user.id).order_by(Object.id)
+        objects = (await db.scalars(stmt)).all()
+        set_committed_value(user, "objects", list(objects))
+
 
-user_crud = UserCRUD(User)
+user_crud = UserCRUD(
+    User,
+    cache=(
+        LRUCacheBackend(settings.CRUD_CACHE_SIZE, settings.CRUD_CACHE_TTL)
+        if settings.USERS_CACHE_ENABLED
+        else None
+    ),
+)
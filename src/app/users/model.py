@@ -14,4 +14,6 @@ class UserBase:
 class User(BaseIDModel, UserBase, Base):
     __tablename__ = "users"
 
-    objects = relationship("Object", back_populates="user", lazy="select")
+    objects = relationship(
+        "Object", back_populates="user", lazy="select", order_by="Object.id"
+    )
@@ -1,5 +1,9 @@
+from typing import TypedDict
+
 from pydantic import BaseModel, ConfigDict
 
+from src.app.objects.schema import ObjectRead
+
 
 class UserCreate(BaseModel):
     first_name: str
@@ -23,3 +27,17 @@ class UserRead(BaseModel):
     last_name: str
     full_name: str
     telegram_id: str
+
+
+class UserScoresRead(UserRead):
+    objects: list[ObjectRead]
+
+
+class UserRow(TypedDict):
+    """Строка UserRead из БД для сериализации списков без валидации."""
+
+    id: int
+    first_name: str
+    last_name: str
+    full_name: str
+    telegram_id: str
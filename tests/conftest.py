@@ -1,20 +1,30 @@
 """Фикстуры для тестов."""
 
 import asyncio
-from typing import AsyncGenerator, Generator
+from contextlib import AbstractContextManager
+from typing import AsyncGenerator, Callable, Generator
 from unittest.mock import AsyncMock, MagicMock
 
 import pytest
 import pytest_asyncio
 from fastapi.testclient import TestClient
 from httpx import ASGITransport, AsyncClient
-from sqlalchemy import StaticPool, create_engine
-from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy import StaticPool, create_engine, event
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
 from sqlalchemy.orm import sessionmaker
 
 from core.base.model import Base
+from core.db.profiling import QueryLog, capture_queries, set_raise_loading
 from core.db.session import get_db
 from main import app
+from src.app.objects.crud import object_crud
+from src.app.users.crud import user_crud
+from src.app.users.model import User
 
 # ================== Database Fixtures ==================
 
@@ -27,9 +37,55 @@ def event_loop() -> Generator[asyncio.AbstractEventLoop, None, None]:
     loop.close()
 
 
+def sqlite_transactions(engine: AsyncEngine) -> AsyncEngine:
+    """Транзакции SQLite открывает SQLAlchemy, а не драйвер.
+
+    pysqlite сам начинает транзакцию только перед INSERT/UPDATE/DELETE, и
+    запрос WITH ... INSERT выполнился бы вне транзакции сессии. Рецепт из
+    документации SQLAlchemy к диалекту pysqlite.
+    """
+
+    @event.listens_for(engine.sync_engine, "connect")
+    def disable_driver_transactions(dbapi_connection, connection_record):
+        dbapi_connection.isolation_level = None
+
+    @event.listens_for(engine.sync_engine, "begin")
+    def begin(conn):
+        # Напрямую через DBAPI, чтобы BEGIN не попадал в подсчёт запросов
+        cursor = conn.connection.cursor()
+        cursor.execute("BEGIN")
+        cursor.close()
+
+    return engine
+
+
 @pytest_asyncio.fixture(scope="function")
 async def async_db_engine():
     """Create async test database engine (SQLite in memory)."""
+    engine = sqlite_transactions(
+        create_async_engine(
+            "sqlite+aiosqlite:///:memory:",
+            connect_args={"check_same_thread": False},
+            poolclass=StaticPool,
+        )
+    )
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    yield engine
+    await engine.dispose()
+
+
+@pytest.fixture(scope="session", autouse=True)
+def raise_on_lazy_load() -> Generator[None, None, None]:
+    """Запретить скрытые lazy загрузки связей во всех тестах."""
+    set_raise_loading(True)
+    yield
+    set_raise_loading(False)
+
+
+@pytest_asyncio.fixture
+async def replica_maker():
+    """Реплика-заглушка: отдельная SQLite БД с одним пользователем."""
     engine = create_async_engine(
         "sqlite+aiosqlite:///:memory:",
         connect_args={"check_same_thread": False},
@@ -37,10 +93,27 @@ async def async_db_engine():
     )
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
-    yield engine
+    maker = async_sessionmaker(engine, expire_on_commit=False)
+    async with maker() as session:
+        session.add(
+            User(
+                first_name="Реплика",
+                last_name="Реплика",
+                full_name="Реплика",
+                telegram_id="replica",
+            )
+        )
+        await session.commit()
+    yield maker
     await engine.dispose()
 
 
+@pytest.fixture
+def query_log(async_db_engine) -> Callable[[], AbstractContextManager[QueryLog]]:
+    """Сборщик SQL выражений тестовой БД: with query_log() as log: ..."""
+    return lambda: capture_queries(async_db_engine)
+
+
 @pytest_asyncio.fixture(scope="function")
 async def async_db_session(async_db_engine) -> AsyncGenerator[AsyncSession, None]:
     """Create async test database session."""
@@ -88,6 +161,15 @@ def sync_client(async_db_session: AsyncSession) -> Generator[TestClient, None, N
     app.dependency_overrides.clear()
 
 
+@pytest_asyncio.fixture(autouse=True)
+async def clear_crud_caches() -> AsyncGenerator[None, None]:
+    """Сбросить кэши CRUD: id в каждой тестовой БД начинаются заново."""
+    yield
+    for crud in (user_crud, object_crud):
+        if crud.cache is not None:
+            await crud.cache.clear()
+
+
 # ================== Mock Fixtures ==================
 
 
@@ -1,8 +1,14 @@
 """Интеграционные тесты для API endpoints."""
 
+import json
+
 import pytest
 from httpx import AsyncClient
 
+from core.base.cache import LRUCacheBackend
+from core.base.config import settings
+from src.app.users.crud import user_crud
+
 
 class TestUsersAPI:
     """Тесты для API пользователей."""
@@ -67,6 +73,105 @@ class TestUsersAPI:
         assert response.status_code == 404
         assert response.json()["detail"] == "User not found"
 
+    @pytest.mark.asyncio
+    async def test_get_users_pages(
+        self, async_client: AsyncClient, user_data: dict, user_data_2: dict
+    ):
+        """Тест постраничного получения пользователей по курсору."""
+        await async_client.post("/users/", json=user_data)
+        await async_client.post("/users/", json=user_data_2)
+
+        response1 = await async_client.get("/users/", params={"limit": 1})
+        cursor = response1.headers["X-Next-Cursor"]
+        response2 = await async_client.get(
+            "/users/", params={"limit": 1, "cursor": cursor}
+        )
+
+        assert response1.json()[0]["telegram_id"] == user_data["telegram_id"]
+        assert response2.json()[0]["telegram_id"] == user_data_2["telegram_id"]
+        assert "X-Next-Cursor" not in response2.headers
+
+    @pytest.mark.asyncio
+    async def test_get_users_invalid_cursor(self, async_client: AsyncClient):
+        """Тест повреждённого курсора."""
+        response = await async_client.get("/users/", params={"cursor": "broken!"})
+        # base64 от [[1]]: корректный JSON, но не целое значение id
+        wrong_type = await async_client.get("/users/", params={"cursor": "W1sxXV0"})
+
+        assert response.status_code == 400
+        assert wrong_type.status_code == 400
+
+    @pytest.mark.asyncio
+    async def test_get_users_by_ids(
+        self, async_client: AsyncClient, user_data: dict, user_data_2: dict
+    ):
+        """Тест получения пользователей списком ID."""
+        await async_client.post("/users/", json=user_data)
+        await async_client.post("/users/", json=user_data_2)
+
+        response = await async_client.get("/users/", params={"ids": "2,999,1,2"})
+
+        assert response.status_code == 200
+        assert [user["id"] for user in response.json()] == [1, 2]
+        assert "X-Next-Cursor" not in response.headers
+
+    @pytest.mark.asyncio
+    async def test_get_users_by_ids_invalid(self, async_client: AsyncClient):
+        """Тест некорректного и слишком длинного списка ID."""
+        too_many = ",".join(str(i) for i in range(1, 1002))
+
+        response1 = await async_client.get("/users/", params={"ids": "1,abc"})
+        response2 = await async_client.get("/users/", params={"ids": too_many})
+
+        assert response1.status_code == 422
+        assert response2.status_code == 422
+
+    @pytest.mark.asyncio
+    async def test_get_user_by_telegram_id_not_modified(
+        self, async_client: AsyncClient, user_data: dict
+    ):
+        """Тест условного GET пользователя по telegram_id."""
+        await async_client.post("/users/", json=user_data)
+        url = f"/users/telegram/{user_data['telegram_id']}"
+
+        response1 = await async_client.get(url)
+        etag = response1.headers["ETag"]
+        response2 = await async_client.get(url, headers={"If-None-Match": etag})
+
+        assert response2.status_code == 304
+        assert response2.content == b""
+        assert response2.headers["ETag"] == etag
+
+    @pytest.mark.asyncio
+    async def test_get_user_scores_by_telegram_id(
+        self, async_client: AsyncClient, user_data: dict
+    ):
+        """Тест получения пользователя вместе с баллами одним запросом."""
+        user = (await async_client.post("/users/", json=user_data)).json()
+        for name, point in [("Физика", 70), ("Математика", 90)]:
+            await async_client.post(
+                "/objects/", json={"name": name, "point": point, "user_id": user["id"]}
+            )
+
+        response = await async_client.get(
+            f"/users/telegram/{user_data['telegram_id']}/scores"
+        )
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["id"] == user["id"]
+        assert [(o["name"], o["point"]) for o in data["objects"]] == [
+            ("Физика", 70),
+            ("Математика", 90),
+        ]
+
+    @pytest.mark.asyncio
+    async def test_get_user_scores_not_found(self, async_client: AsyncClient):
+        """Тест получения баллов несуществующего пользователя."""
+        response = await async_client.get("/users/telegram/nonexistent/scores")
+
+        assert response.status_code == 404
+
     @pytest.mark.asyncio
     async def test_create_user_missing_field(self, async_client: AsyncClient):
         """Тест создания пользователя с отсутствующим полем."""
@@ -147,6 +252,76 @@ class TestObjectsAPI:
         assert object_data["name"] in names
         assert object_data_2["name"] in names
 
+    @pytest.mark.asyncio
+    async def test_get_objects_by_user_id_paginated(
+        self,
+        async_client: AsyncClient,
+        created_user: dict,
+        object_data: dict,
+        object_data_2: dict,
+    ):
+        """Тест постраничного получения объектов пользователя."""
+        object_data["user_id"] = created_user["id"]
+        object_data_2["user_id"] = created_user["id"]
+        await async_client.post("/objects/", json=object_data)
+        await async_client.post("/objects/", json=object_data_2)
+
+        response1 = await async_client.get(
+            f"/objects/{created_user['id']}", params={"limit": 1}
+        )
+        response2 = await async_client.get(
+            f"/objects/{created_user['id']}",
+            params={"limit": 1, "cursor": response1.headers["X-Next-Cursor"]},
+        )
+
+        assert response1.json()[0]["name"] == object_data["name"]
+        assert response2.json()[0]["name"] == object_data_2["name"]
+        assert "X-Next-Cursor" not in response2.headers
+
+    @pytest.mark.asyncio
+    async def test_get_objects_by_user_id_etag(
+        self, async_client: AsyncClient, created_user: dict, object_data: dict
+    ):
+        """Тест условного GET баллов: 304 до изменения, 200 после."""
+        object_data["user_id"] = created_user["id"]
+        await async_client.post("/objects/", json=object_data)
+        url = f"/objects/{created_user['id']}"
+
+        response1 = await async_client.get(url)
+        etag = response1.headers["ETag"]
+        response2 = await async_client.get(url, headers={"If-None-Match": etag})
+        await async_client.put(url, json={"name": object_data["name"], "point": 1})
+        response3 = await async_client.get(url, headers={"If-None-Match": etag})
+
+        assert response2.status_code == 304
+        assert response3.status_code == 200
+        assert response3.headers["ETag"] != etag
+        assert response3.json()[0]["point"] == 1
+
+    @pytest.mark.asyncio
+    async def test_get_user_scores_etag(
+        self, async_client: AsyncClient, created_user: dict, object_data: dict
+    ):
+        """Тест условного GET пользователя с баллами: 304 до изменения баллов."""
+        object_data["user_id"] = created_user["id"]
+        await async_client.post("/objects/", json=object_data)
+        url = f"/users/telegram/{created_user['telegram_id']}/scores"
+
+        response1 = await async_client.get(url)
+        etag = response1.headers["ETag"]
+        response2 = await async_client.get(url, headers={"If-None-Match": etag})
+        await async_client.put(
+            f"/objects/{created_user['id']}",
+            json={"name": object_data["name"], "point": 1},
+        )
+        response3 = await async_client.get(url, headers={"If-None-Match": etag})
+
+        assert response2.status_code == 304
+        assert response2.headers["ETag"] == etag
+        assert response3.status_code == 200
+        assert response3.headers["ETag"] != etag
+        assert response3.json()["objects"][0]["point"] == 1
+
     @pytest.mark.asyncio
     async def test_get_objects_by_user_id_empty(
         self, async_client: AsyncClient, created_user: dict
@@ -184,3 +359,264 @@ class TestObjectsAPI:
         response = await async_client.post("/objects/", json=invalid_data)
 
         assert response.status_code == 422  # Validation error
+
+    @pytest.mark.asyncio
+    async def test_upsert_object(
+        self, async_client: AsyncClient, created_user: dict, object_data: dict
+    ):
+        """Тест создания и замены балла через PUT."""
+        payload = {"name": object_data["name"], "point": 60}
+
+        response1 = await async_client.put(
+            f"/objects/{created_user['id']}", json=payload
+        )
+        payload["point"] = 95
+        response2 = await async_client.put(
+            f"/objects/{created_user['id']}", json=payload
+        )
+
+        assert response1.status_code == 200
+        assert response2.status_code == 200
+        assert response2.json()["id"] == response1.json()["id"]
+        assert response2.json()["point"] == 95
+
+        response = await async_client.get(f"/objects/{created_user['id']}")
+        assert len(response.json()) == 1
+
+    @pytest.mark.asyncio
+    async def test_bulk_upsert_objects_json(
+        self, async_client: AsyncClient, created_user: dict
+    ):
+        """Тест массовой загрузки баллов JSON массивом."""
+        user_id = created_user["id"]
+        await async_client.post(
+            "/objects/", json={"name": "Физика", "point": 40, "user_id": user_id}
+        )
+        rows = [
+            {"name": "Математика", "point": 80, "user_id": user_id},
+            {"name": "Физика", "point": 90, "user_id": user_id},
+            {"name": "Химия", "point": "bad", "user_id": user_id},
+            {"name": "Химия", "point": 70, "user_id": 99999},
+            {"name": "Математика", "point": 85, "user_id": user_id},
+        ]
+
+        response = await async_client.post("/objects/bulk", json=rows)
+
+        assert response.status_code == 200
+        data = response.json()
+        statuses = [result["status"] for result in data["results"]]
+        assert statuses == ["duplicate", "updated", "invalid", "invalid", "created"]
+        assert data["created"] == 1
+        assert data["updated"] == 1
+        assert data["failed"] == 2
+
+        objects = (await async_client.get(f"/objects/{user_id}")).json()
+        points = {obj["name"]: obj["point"] for obj in objects}
+        assert points == {"Математика": 85, "Физика": 90}
+
+    @pytest.mark.asyncio
+    async def test_bulk_upsert_objects_ndjson(
+        self, async_client: AsyncClient, created_user: dict
+    ):
+        """Тест массовой загрузки баллов потоком NDJSON."""
+        user_id = created_user["id"]
+        body = (
+            f'{{"name": "Математика", "point": 80, "user_id": {user_id}}}\n'
+            "not json\n"
+            f'{{"name": "Физика", "point": 90, "user_id": {user_id}}}'
+        )
+
+        response = await async_client.post(
+            "/objects/bulk",
+            content=body,
+            headers={"Content-Type": "application/x-ndjson"},
+        )
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["created"] == 2
+        assert data["results"][1]["status"] == "invalid"
+
+    @pytest.mark.asyncio
+    async def test_bulk_upsert_objects_not_array(self, async_client: AsyncClient):
+        """Тест массовой загрузки с телом не-массивом."""
+        response = await async_client.post("/objects/bulk", json={"name": "x"})
+
+        assert response.status_code == 422
+
+
+class TestExportAPI:
+    """Тесты для потоковой выгрузки."""
+
+    @pytest.mark.asyncio
+    async def test_export_users(
+        self, async_client: AsyncClient, user_data: dict, user_data_2: dict
+    ):
+        """Тест выгрузки пользователей в NDJSON."""
+        await async_client.post("/users/", json=user_data)
+        await async_client.post("/users/", json=user_data_2)
+
+        response = await async_client.get("/export/users")
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("application/x-ndjson")
+        rows = [json.loads(line) for line in response.text.splitlines()]
+        assert [row["telegram_id"] for row in rows] == [
+            user_data["telegram_id"],
+            user_data_2["telegram_id"],
+        ]
+        assert "created_at" in rows[0]
+
+    @pytest.mark.asyncio
+    async def test_export_objects_since(
+        self, async_client: AsyncClient, user_data: dict, object_data: dict
+    ):
+        """Тест инкрементальной выгрузки баллов по since."""
+        user = (await async_client.post("/users/", json=user_data)).json()
+        object_data["user_id"] = user["id"]
+        await async_client.post("/objects/", json=object_data)
+
+        all_rows = await async_client.get("/export/objects")
+        future_rows = await async_client.get(
+            "/export/objects", params={"since": "2999-01-01T00:00:00"}
+        )
+
+        assert len(all_rows.text.splitlines()) == 1
+        assert json.loads(all_rows.text)["name"] == object_data["name"]
+        assert future_rows.text == ""
+
+
+class TestStatsAPI:
+    """Тесты для статистики по предметам."""
+
+    @pytest.mark.asyncio
+    async def test_get_subject_stats(
+        self, async_client: AsyncClient, user_data: dict, user_data_2: dict
+    ):
+        """Тест статистики по предметам."""
+        user1 = (await async_client.post("/users/", json=user_data)).json()
+        user2 = (await async_client.post("/users/", json=user_data_2)).json()
+        await async_client.post(
+            "/objects/",
+            json={"name": "Математика", "point": 80, "user_id": user1["id"]},
+        )
+        await async_client.post(
+            "/objects/",
+            json={"name": "Математика", "point": 95, "user_id": user2["id"]},
+        )
+
+        response = await async_client.get("/stats/subjects")
+
+        assert response.status_code == 200
+        [stats] = response.json()
+        assert stats["name"] == "Математика"
+        assert stats["count"] == 2
+        assert stats["average"] == 87.5
+        assert stats["min_point"] == 80
+        assert stats["max_point"] == 95
+        assert stats["histogram"] == [0, 0, 0, 0, 0, 0, 0, 0, 1, 1]
+
+        # Полный пересчёт доступен только из командной строки
+        rebuild = await async_client.post("/stats/subjects/rebuild")
+        assert rebuild.status_code == 404
+
+    @pytest.mark.asyncio
+    async def test_get_cache_stats(
+        self, async_client: AsyncClient, monkeypatch, user_data: dict
+    ):
+        """Тест счётчиков кэша пользователей."""
+        monkeypatch.setattr(user_crud, "cache", LRUCacheBackend(100, 60))
+        user = (await async_client.post("/users/", json=user_data)).json()
+        await async_client.get(f"/users/{user['id']}")
+        await async_client.get(f"/users/{user['id']}")
+
+        response = await async_client.get("/stats/cache")
+
+        assert response.status_code == 200
+        assert response.json()["users"]["hits"] >= 1
+
+    @pytest.mark.asyncio
+    async def test_get_pool_stats(self, async_client: AsyncClient):
+        """Тест состояния пула соединений основного движка."""
+        response = await async_client.get("/stats/pool")
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["pool"] == "TimedAsyncQueuePool"
+        assert data["size"] == settings.DB_POOL_SIZE
+        assert data["checked_out"] == 0
+
+
+class TestQueryBudgets:
+    """Бюджеты запросов к БД на эндпоинт (без N+1)."""
+
+    @pytest.fixture
+    async def user_with_scores(
+        self, async_client: AsyncClient, user_data: dict
+    ) -> dict:
+        """Пользователь с несколькими баллами."""
+        user = (await async_client.post("/users/", json=user_data)).json()
+        for i, name in enumerate(["Физика", "Химия", "История"]):
+            await async_client.post(
+                "/objects/", json={"name": name, "point": 50 + i, "user_id": user["id"]}
+            )
+        return user
+
+    @pytest.mark.asyncio
+    async def test_user_scores_budget(
+        self, async_client: AsyncClient, user_with_scores: dict, query_log
+    ):
+        """Тест: пользователь, версия баллов для ETag и сами баллы; 304 без них."""
+        url = f"/users/telegram/{user_with_scores['telegram_id']}/scores"
+        with query_log() as log:
+            response = await async_client.get(url)
+
+        assert len(response.json()["objects"]) == 3
+        log.check(3)
+
+        with query_log() as log:
+            response = await async_client.get(
+                url, headers={"If-None-Match": response.headers["ETag"]}
+            )
+
+        assert response.status_code == 304
+        log.check(2)
+
+    @pytest.mark.asyncio
+    async def test_objects_page_budget(
+        self, async_client: AsyncClient, user_with_scores: dict, query_log
+    ):
+        """Тест: страница баллов — версия для ETag и сама страница."""
+        with query_log() as log:
+            response = await async_client.get(f"/objects/{user_with_scores['id']}")
+
+        assert len(response.json()) == 3
+        log.check(2)
+
+    @pytest.mark.asyncio
+    async def test_create_object_budget(
+        self, async_client: AsyncClient, user_with_scores: dict, query_log
+    ):
+        """Тест: добавление балла — INSERT и обновление агрегатов."""
+        with query_log() as log:
+            response = await async_client.post(
+                "/objects/",
+                json={
+                    "name": "Биология",
+                    "point": 80,
+                    "user_id": user_with_scores["id"],
+                },
+            )
+
+        assert response.status_code == 200
+        log.check(2)
+
+    @pytest.mark.asyncio
+    async def test_users_page_budget(
+        self, async_client: AsyncClient, user_with_scores: dict, query_log
+    ):
+        """Тест: страница пользователей — один запрос."""
+        with query_log() as log:
+            await async_client.get("/users/")
+
+        log.check(1)
@@ -1,203 +1,400 @@
 """Тесты для API клиента бота."""
 
-import pytest
-from aioresponses import aioresponses
+import asyncio
+import re
+import socket
+from contextlib import asynccontextmanager
+from typing import AsyncGenerator, AsyncIterator
 
-from bot.api_client import APIClient
+import pytest
+import pytest_asyncio
+import uvicorn
+from aioresponses import CallbackResult, aioresponses
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from bot.api_client import APIClient, APIError, BaseAPIClient, acting_for
+from bot.batching import DataLoader
+from bot.embedded_client import EmbeddedAPIClient
+from core.db import session as session_module
+from core.db.replicas import ReadRouter
+from core.db.session import get_db
+from main import app
+from src.app.objects.crud import object_crud
+from src.app.objects.model import Object
+from src.app.objects.schema import ObjectCreate
+from src.app.users.model import User
 
 
 class TestAPIClient:
-    """Тесты для APIClient."""
+    """HTTP-специфика APIClient; общие сценарии — в TestClientBackends."""
 
-    @pytest.fixture
-    def api_client(self) -> APIClient:
+    @pytest_asyncio.fixture
+    async def api_client(self):
         """Создать экземпляр API клиента."""
-        return APIClient(base_url="http://test-api")
+        client = APIClient(base_url="http://test-api")
+        yield client
+        await client.close()
 
     @pytest.mark.asyncio
-    async def test_get_user_success(self, api_client: APIClient):
-        """Тест успешного получения пользователя."""
-        user_data = {
-            "id": 1,
-            "first_name": "Иван",
-            "last_name": "Иванов",
-            "full_name": "Иван Иванов",
-            "telegram_id": "123456789",
-        }
+    async def test_request_with_params(self, api_client: APIClient):
+        """Тест запроса с параметрами."""
+        user_data = {"id": 1, "first_name": "Test"}
 
         with aioresponses() as m:
-            m.get("http://test-api/users/1", payload=user_data)
+            m.get(
+                "http://test-api/users/1?key=value",
+                payload=user_data,
+            )
 
-            result = await api_client.get_user(1)
+            result = await api_client._request(
+                "GET", "/users/1", params={"key": "value"}
+            )
 
             assert result == user_data
 
     @pytest.mark.asyncio
-    async def test_get_user_not_found(self, api_client: APIClient):
-        """Тест получения несуществующего пользователя."""
+    async def test_conditional_get_not_modified(self, api_client: APIClient):
+        """Тест: повторный GET отправляет If-None-Match и использует кэш на 304."""
+        objects_data = [{"id": 1, "name": "Математика", "point": 85, "user_id": 1}]
+
         with aioresponses() as m:
-            m.get("http://test-api/users/999", status=404)
+            m.get(
+                "http://test-api/objects/1?limit=1000",
+                payload=objects_data,
+                headers={"ETag": '"v1"'},
+            )
+            m.get("http://test-api/objects/1?limit=1000", status=304)
 
-            result = await api_client.get_user(999)
+            first = await api_client.get_objects_by_user_id(1)
+            second = await api_client.get_objects_by_user_id(1)
 
-            assert result is None
+            calls = list(m.requests.values())[0]
 
-    @pytest.mark.asyncio
-    async def test_get_user_by_telegram_id_success(self, api_client: APIClient):
-        """Тест успешного получения пользователя по telegram_id."""
-        user_data = {
-            "id": 1,
-            "first_name": "Иван",
-            "last_name": "Иванов",
-            "full_name": "Иван Иванов",
-            "telegram_id": "123456789",
-        }
-
-        with aioresponses() as m:
-            m.get("http://test-api/users/telegram/123456789", payload=user_data)
+        assert first == objects_data
+        assert second == objects_data
+        assert "If-None-Match" not in calls[0].kwargs["headers"]
+        assert calls[1].kwargs["headers"]["If-None-Match"] == '"v1"'
+        assert api_client.pool_stats()["not_modified_total"] == 1
 
-            result = await api_client.get_user_by_telegram_id("123456789")
 
-            assert result == user_data
+class TestAPIClientSession:
+    """Тесты для пула соединений APIClient."""
 
     @pytest.mark.asyncio
-    async def test_get_user_by_telegram_id_not_found(self, api_client: APIClient):
-        """Тест получения пользователя по несуществующему telegram_id."""
+    async def test_session_reused_between_requests(self):
+        """Тест переиспользования одной сессии для нескольких запросов."""
+        client = APIClient(base_url="http://test-api")
         with aioresponses() as m:
-            m.get("http://test-api/users/telegram/nonexistent", status=404)
+            m.get("http://test-api/users/1", payload={"id": 1}, repeat=True)
 
-            result = await api_client.get_user_by_telegram_id("nonexistent")
+            await client.get_user(1)
+            session = client._session
+            await client.get_user(1)
 
-            assert result is None
+            assert client._session is session
+        stats = client.pool_stats()
+        assert stats["sessions_opened"] == 1
+        assert stats["requests_total"] == 2
+        await client.close()
 
     @pytest.mark.asyncio
-    async def test_create_user_success(self, api_client: APIClient):
-        """Тест успешного создания пользователя."""
-        expected_response = {
-            "id": 1,
-            "first_name": "Иван",
-            "last_name": "Иванов",
-            "full_name": "Иван Иванов",
-            "telegram_id": "123456789",
-        }
+    async def test_start_and_close(self):
+        """Тест явного открытия и закрытия сессии."""
+        client = APIClient(base_url="http://test-api")
+        await client.start()
+        session = client._session
 
-        with aioresponses() as m:
-            m.post("http://test-api/users/", payload=expected_response)
+        assert session is not None
+        assert client.pool_stats()["limit_per_host"] == client.limit_per_host
 
-            result = await api_client.create_user(
-                first_name="Иван",
-                last_name="Иванов",
-                full_name="Иван Иванов",
-                telegram_id="123456789",
-            )
+        await client.close()
 
-            assert result == expected_response
+        assert session.closed
+        assert client._session is None
+        assert client.pool_stats()["in_flight"] == 0
 
     @pytest.mark.asyncio
-    async def test_create_user_error(self, api_client: APIClient):
-        """Тест ошибки при создании пользователя."""
-        with aioresponses() as m:
-            m.post("http://test-api/users/", status=500, body="Internal Server Error")
+    async def test_in_flight_counted(self):
+        """Тест: запрос учитывается в in_flight, пока ждёт ответа."""
+        client = APIClient(base_url="http://test-api")
+        seen = []
 
-            with pytest.raises(Exception) as exc_info:
-                await api_client.create_user(
-                    first_name="Иван",
-                    last_name="Иванов",
-                    full_name="Иван Иванов",
-                    telegram_id="123456789",
-                )
+        def respond(url, **kwargs):
+            seen.append(client.pool_stats()["in_flight"])
+            return CallbackResult(status=500, body="error")
 
-            assert "API Error 500" in str(exc_info.value)
+        with aioresponses() as m:
+            m.get("http://test-api/users/1", callback=respond)
+            with pytest.raises(APIError):
+                await client.get_user(1)
 
-    @pytest.mark.asyncio
-    async def test_get_objects_by_user_id_success(self, api_client: APIClient):
-        """Тест успешного получения объектов пользователя."""
-        objects_data = [
-            {"id": 1, "name": "Математика", "point": 85, "user_id": 1},
-            {"id": 2, "name": "Русский язык", "point": 92, "user_id": 1},
-        ]
+        assert seen == [1]
+        assert client.pool_stats()["in_flight"] == 0
+        await client.close()
 
+    @pytest.mark.asyncio
+    async def test_identical_gets_coalesced(self):
+        """Тест: одинаковые одновременные GET — один HTTP запрос."""
+        client = APIClient(base_url="http://test-api")
         with aioresponses() as m:
-            m.get("http://test-api/objects/1", payload=objects_data)
+            # Без repeat: второй запрос к тому же URL завершился бы ошибкой
+            m.get("http://test-api/users/telegram/42", payload={"id": 1})
 
-            result = await api_client.get_objects_by_user_id(1)
+            results = await asyncio.gather(
+                *(client.get_user_by_telegram_id("42") for _ in range(5))
+            )
 
-            assert result == objects_data
+        assert results == [{"id": 1}] * 5
+        stats = client.pool_stats()
+        assert stats["requests_total"] == 1
+        assert stats["coalesced_total"] == 4
+        await client.close()
 
     @pytest.mark.asyncio
-    async def test_get_objects_by_user_id_empty(self, api_client: APIClient):
-        """Тест получения пустого списка объектов."""
+    async def test_get_user_batched(self):
+        """Тест: get_user за одно окно — один запрос GET /users/?ids=..."""
+        client = APIClient(base_url="http://test-api", batch_users=True)
         with aioresponses() as m:
-            m.get("http://test-api/objects/1", payload=[])
+            m.get(
+                re.compile(r"^http://test-api/users/\?ids="),
+                payload=[{"id": 1}, {"id": 3}],
+            )
 
-            result = await api_client.get_objects_by_user_id(1)
+            results = await asyncio.gather(
+                client.get_user(3), client.get_user(1), client.get_user(2)
+            )
+
+            (request_key,) = m.requests
+            assert request_key[1].query["ids"] == "3,1,2"
+        assert results == [{"id": 3}, {"id": 1}, None]
+        assert client.pool_stats()["user_batches_total"] == 1
+        await client.close()
 
-            assert result == []
+    @pytest.mark.asyncio
+    async def test_loader_batch_cancelled(self):
+        """Тест: отмена батча DataLoader не оставляет load() висеть."""
+        started = asyncio.Event()
+
+        async def batch_fn(keys: list[int]) -> dict[int, int]:
+            started.set()
+            await asyncio.Event().wait()
+            return {}
+
+        loader = DataLoader(batch_fn, window=0)
+        loads = [asyncio.create_task(loader.load(key)) for key in (1, 2)]
+        await started.wait()
+        for task in loader._tasks:
+            task.cancel()
+
+        results = await asyncio.wait_for(
+            asyncio.gather(*loads, return_exceptions=True), timeout=1
+        )
+        assert all(isinstance(r, asyncio.CancelledError) for r in results)
 
     @pytest.mark.asyncio
-    async def test_get_objects_by_user_id_not_found(self, api_client: APIClient):
-        """Тест получения объектов для несуществующего пользователя."""
+    async def test_error_counter(self):
+        """Тест счётчика ошибок."""
+        client = APIClient(base_url="http://test-api")
         with aioresponses() as m:
-            m.get("http://test-api/objects/999", status=404)
+            m.post("http://test-api/users/", status=500, body="error")
 
-            result = await api_client.get_objects_by_user_id(999)
+            with pytest.raises(Exception):
+                await client._request("POST", "/users/", data={})
 
-            assert result == []
+        assert client.pool_stats()["errors_total"] == 1
+        await client.close()
 
     @pytest.mark.asyncio
-    async def test_create_object_success(self, api_client: APIClient):
-        """Тест успешного создания объекта."""
-        expected_response = {
-            "id": 1,
-            "name": "Математика",
-            "point": 85,
-            "user_id": 1,
-        }
+    async def test_read_your_writes_per_user(
+        self,
+        monkeypatch,
+        async_db_engine,
+        replica_maker,
+        user_data: dict,
+        user_data_2: dict,
+    ):
+        """Тест: запись одного пользователя не переводит на primary остальных."""
+        router = ReadRouter([replica_maker], read_your_writes=60)
+        monkeypatch.setattr(session_module, "read_router", router)
+        session_maker = async_sessionmaker(async_db_engine, expire_on_commit=False)
+        async with serve_api(session_maker) as base_url:
+            client = APIClient(base_url=base_url)
+            first = await client.create_user(**user_data)
+            second = await client.create_user(**user_data_2)
+
+            # Своя запись видна сразу: чтения автора идут на primary
+            assert await client.get_user_by_telegram_id("123456789") == first
+            assert await client.get_user_by_telegram_id("987654321") == second
+            with acting_for("123456789"):
+                assert await client._request("GET", "/users/telegram/replica") is None
+            # Пользователь без записей по-прежнему читает с реплики
+            with acting_for("42"):
+                replica_user = await client._request("GET", "/users/telegram/replica")
+            assert replica_user["first_name"] == "Реплика"
+            assert len(client._session.cookie_jar) == 0
+            await client.close()
+
+
+@asynccontextmanager
+async def serve_api(session_maker: async_sessionmaker) -> AsyncIterator[str]:
+    """API на uvicorn над session_maker; отдаёт базовый URL."""
+
+    async def override_get_db() -> AsyncGenerator[AsyncSession, None]:
+        async with session_maker() as session:
+            yield session
+
+    app.dependency_overrides[get_db] = override_get_db
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    server = uvicorn.Server(
+        uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning")
+    )
+    task = asyncio.create_task(server.serve())
+    while not server.started:
+        await asyncio.sleep(0.01)
+    try:
+        yield f"http://127.0.0.1:{port}"
+    finally:
+        server.should_exit = True
+        await task
+        app.dependency_overrides.clear()
+
+
+@pytest_asyncio.fixture(params=["http", "embedded"])
+async def backend_client(
+    request, async_db_engine
+) -> AsyncGenerator[BaseAPIClient, None]:
+    """Клиент над тестовой БД: HTTP к API на uvicorn или встроенный."""
+    session_maker = async_sessionmaker(async_db_engine, expire_on_commit=False)
+    if request.param == "embedded":
+        client = EmbeddedAPIClient(session_maker)
+        yield client
+        await client.close()
+        return
+
+    async with serve_api(session_maker) as base_url:
+        client = APIClient(base_url=base_url)
+        yield client
+        await client.close()
+
+
+class TestClientBackends:
+    """Одинаковые сценарии для HTTP и встроенного клиента над реальной БД."""
 
-        with aioresponses() as m:
-            m.post("http://test-api/objects/", payload=expected_response)
+    @pytest.mark.asyncio
+    async def test_user_lookups(self, backend_client: BaseAPIClient, user_data: dict):
+        """Тест создания и получения пользователя по ID и telegram_id."""
+        user = await backend_client.create_user(**user_data)
 
-            result = await api_client.create_object(
-                name="Математика",
-                point=85,
-                user_id=1,
-            )
+        assert user == {"id": 1, **user_data}
+        assert await backend_client.get_user(1) == user
+        assert await backend_client.get_user_by_telegram_id("123456789") == user
+        assert await backend_client.get_user(999) is None
+        assert await backend_client.get_user_by_telegram_id("nonexistent") is None
+
+    @pytest.mark.asyncio
+    async def test_users_by_ids(
+        self, backend_client: BaseAPIClient, user_data: dict, user_data_2: dict
+    ):
+        """Тест получения пользователей списком ID."""
+        user = await backend_client.create_user(**user_data)
+        user_2 = await backend_client.create_user(**user_data_2)
 
-            assert result == expected_response
+        assert await backend_client.get_users_by_ids([2, 999, 1]) == [user, user_2]
+        assert await backend_client.get_users_by_ids([]) == []
 
     @pytest.mark.asyncio
-    async def test_create_object_duplicate_error(self, api_client: APIClient):
-        """Тест ошибки при создании дублирующего объекта."""
-        with aioresponses() as m:
-            m.post(
-                "http://test-api/objects/",
-                status=400,
-                body='{"detail": "Object already exists"}',
-            )
+    async def test_lifecycle_and_stats(
+        self, backend_client: BaseAPIClient, user_data: dict
+    ):
+        """Тест общего интерфейса: запуск, счётчики и закрытие."""
+        await backend_client.start()
+        await backend_client.create_user(**user_data)
+        await backend_client.get_user(1)
+
+        assert isinstance(backend_client, BaseAPIClient)
+        assert backend_client.pool_stats()["requests_total"] == 2
+        assert backend_client.pool_stats()["errors_total"] == 0
+        await backend_client.close()
+
+    @pytest.mark.asyncio
+    async def test_objects(self, backend_client: BaseAPIClient, user_data: dict):
+        """Тест создания баллов и получения списка."""
+        await backend_client.create_user(**user_data)
 
-            with pytest.raises(Exception) as exc_info:
-                await api_client.create_object(
-                    name="Математика",
-                    point=85,
-                    user_id=1,
-                )
+        assert await backend_client.get_objects_by_user_id(1) == []
+        created = await backend_client.create_object("Математика", 85, 1)
+        await backend_client.create_object("Русский язык", 92, 1)
 
-            assert "API Error 400" in str(exc_info.value)
+        assert created == {"id": 1, "name": "Математика", "point": 85, "user_id": 1}
+        assert await backend_client.get_objects_by_user_id(1) == [
+            created,
+            {"id": 2, "name": "Русский язык", "point": 92, "user_id": 1},
+        ]
+        assert await backend_client.get_objects_by_user_id(999) == []
 
     @pytest.mark.asyncio
-    async def test_request_with_params(self, api_client: APIClient):
-        """Тест запроса с параметрами."""
-        user_data = {"id": 1, "first_name": "Test"}
+    async def test_objects_all_pages(
+        self,
+        backend_client: BaseAPIClient,
+        async_db_session: AsyncSession,
+        user_data: dict,
+    ):
+        """Тест: баллы читаются со всех страниц, а не только с первой."""
+        await backend_client.create_user(**user_data)
+        await object_crud.bulk_upsert(
+            async_db_session,
+            objs_in=[
+                ObjectCreate(name=f"Предмет {i}", point=i % 100, user_id=1)
+                for i in range(150)
+            ],
+        )
+
+        assert len(await backend_client.get_objects_by_user_id(1)) == 150
+        backend_client.objects_page_size = 60
+        objects = await backend_client.get_objects_by_user_id(1)
+        assert [obj["id"] for obj in objects] == list(range(1, 151))
 
-        with aioresponses() as m:
-            m.get(
-                "http://test-api/users/1?key=value",
-                payload=user_data,
-            )
+    @pytest.mark.asyncio
+    async def test_user_scores(self, backend_client: BaseAPIClient, user_data: dict):
+        """Тест получения пользователя вместе с баллами."""
+        user = await backend_client.create_user(**user_data)
+        score = await backend_client.create_object("Физика", 70, user["id"])
+
+        assert await backend_client.get_user_scores("123456789") == {
+            **user,
+            "objects": [score],
+        }
+        assert await backend_client.get_user_scores("nonexistent") is None
 
-            result = await api_client._request(
-                "GET", "/users/1", params={"key": "value"}
-            )
+    @pytest.mark.asyncio
+    async def test_server_error(
+        self, backend_client: BaseAPIClient, async_db_engine, user_data: dict
+    ):
+        """Тест: ошибка БД — APIError 500 у обоих клиентов."""
+        async with async_db_engine.begin() as conn:
+            await conn.run_sync(Object.__table__.drop)
+            await conn.run_sync(User.__table__.drop)
 
-            assert result == user_data
+        with pytest.raises(APIError) as exc_info:
+            await backend_client.create_user(**user_data)
 
+        assert exc_info.value.status == 500
+        assert "API Error 500" in str(exc_info.value)
+        assert backend_client.pool_stats()["errors_total"] == 1
+
+    @pytest.mark.asyncio
+    async def test_duplicate_object_error(
+        self, backend_client: BaseAPIClient, user_data: dict
+    ):
+        """Тест ошибки 400 при создании дублирующего балла."""
+        await backend_client.create_user(**user_data)
+        await backend_client.create_object("Математика", 85, 1)
+
+        with pytest.raises(APIError) as exc_info:
+            await backend_client.create_object("Математика", 90, 1)
+
+        assert exc_info.value.status == 400
+        assert "API Error 400" in str(exc_info.value)
+        assert backend_client.pool_stats()["errors_total"] == 1
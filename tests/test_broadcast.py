@@ -0,0 +1,145 @@
+"""Тесты для рассылки всем пользователям."""
+
+import asyncio
+import json
+
+import pytest
+import pytest_asyncio
+from aiogram.exceptions import TelegramForbiddenError
+from aiogram.methods import SendMessage
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from bot.broadcast import Broadcast
+from core.base.model import Base
+from src.app.users.model import User
+
+USERS = 120
+
+
+class FakeBot:
+    """Бот, запоминающий получателей; заблокировавшие бота — в blocked_by."""
+
+    def __init__(self, blocked_by: set[int] = frozenset(), delay: float = 0.0):
+        self.received: list[int] = []
+        self.blocked_by = blocked_by
+        self.delay = delay
+
+    async def send_message(self, chat_id: int, text: str) -> None:
+        await asyncio.sleep(self.delay)
+        if chat_id in self.blocked_by:
+            raise TelegramForbiddenError(
+                method=SendMessage(chat_id=chat_id, text=text),
+                message="Forbidden: bot was blocked by the user",
+            )
+        self.received.append(chat_id)
+
+
+@pytest_asyncio.fixture
+async def session_maker(tmp_path):
+    """БД в файле с USERS пользователями (telegram_id = 1000 + i).
+
+    Не общее соединение StaticPool: прерванный запрос при имитации сбоя
+    не должен ломать соединение для повторного запуска.
+    """
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'db.sqlite3'}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    maker = async_sessionmaker(engine, expire_on_commit=False)
+    async with maker() as db:
+        db.add_all(
+            User(
+                first_name="Иван",
+                last_name=str(i),
+                full_name=f"Иван {i}",
+                telegram_id=str(1000 + i),
+            )
+            for i in range(1, USERS + 1)
+        )
+        await db.commit()
+    yield maker
+    await engine.dispose()
+
+
+class TestBroadcast:
+    """Тесты для Broadcast."""
+
+    @pytest.mark.asyncio
+    async def test_sends_to_everyone(self, session_maker, tmp_path):
+        """Тест: каждый пользователь получает сообщение ровно один раз."""
+        bot = FakeBot(blocked_by={1005, 1010})
+        broadcast = Broadcast(
+            bot,
+            "Результаты опубликованы",
+            name="results",
+            session_maker=session_maker,
+            checkpoint_dir=tmp_path,
+            page_size=25,
+            concurrency=8,
+        )
+
+        report = await broadcast.run()
+
+        assert sorted(bot.received) == [
+            1000 + i for i in range(1, USERS + 1) if i not in (5, 10)
+        ]
+        assert report["sent"] == USERS - 2
+        assert report["blocked"] == 2
+        assert report["finished"] is True
+        assert report["messages_per_second"] > 0
+        checkpoint = json.loads((tmp_path / "results.json").read_text())
+        assert checkpoint["last_user_id"] == USERS
+
+        # Завершённая рассылка не отправляется повторно
+        again = FakeBot()
+        await Broadcast(
+            again,
+            "Результаты опубликованы",
+            name="results",
+            session_maker=session_maker,
+            checkpoint_dir=tmp_path,
+        ).run()
+        assert again.received == []
+
+    @pytest.mark.asyncio
+    async def test_resume_after_crash(self, session_maker, tmp_path):
+        """Тест: прерванная рассылка продолжается с checkpoint."""
+        options = dict(
+            name="results",
+            session_maker=session_maker,
+            checkpoint_dir=tmp_path,
+            page_size=10,
+            concurrency=4,
+            checkpoint_interval=0.01,
+        )
+        first = FakeBot(delay=0.001)
+        task = asyncio.create_task(Broadcast(first, "text", **options).run())
+        while len(first.received) < 50:
+            await asyncio.sleep(0.001)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+        checkpoint = json.loads((tmp_path / "results.json").read_text())
+        assert 0 < checkpoint["last_user_id"] < USERS
+        assert checkpoint["finished"] is False
+
+        second = FakeBot()
+        report = await Broadcast(second, "text", **options).run()
+
+        assert min(second.received) == 1000 + checkpoint["last_user_id"] + 1
+        assert set(first.received) | set(second.received) == {
+            1000 + i for i in range(1, USERS + 1)
+        }
+        # Повторно — только сообщения, бывшие в работе в момент сбоя
+        duplicates = set(first.received) & set(second.received)
+        assert len(duplicates) <= 4
+        assert report["finished"] is True
+
+    def test_text_mismatch(self, tmp_path):
+        """Тест: продолжить рассылку с другим текстом нельзя."""
+        (tmp_path / "results.json").write_text(
+            json.dumps({"name": "results", "text": "старый"})
+        )
+
+        with pytest.raises(ValueError):
+            Broadcast(FakeBot(), "новый", name="results", checkpoint_dir=tmp_path)
@@ -1,15 +1,28 @@
 """Тесты для CRUD операций."""
 
+import asyncio
+import base64
+import json
+from datetime import datetime, timedelta
+
 import pytest
 import pytest_asyncio
-from sqlalchemy.ext.asyncio import AsyncSession
-
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import selectinload
+
+from core.base.cache import LRUCacheBackend
+from core.base.crud import InvalidCursorError
+from core.base.model import Base
+from core.db.replicas import ReadRouter, is_replica
 from src.app.objects.crud import ObjectCRUD, object_crud
 from src.app.objects.model import Object
-from src.app.objects.schema import ObjectCreate
+from src.app.objects.schema import ObjectCreate, ObjectUpdate
+from src.app.stats.crud import subject_stats_crud
 from src.app.users.crud import UserCRUD, user_crud
 from src.app.users.model import User
 from src.app.users.schema import UserCreate, UserUpdate
+from tests.conftest import sqlite_transactions
 
 
 class TestUserCRUD:
@@ -47,6 +60,25 @@ class TestUserCRUD:
         assert user.id == created_user.id
         assert user.telegram_id == created_user.telegram_id
 
+    @pytest.mark.asyncio
+    async def test_get_by_id_with_loader_options(
+        self, async_db_session: AsyncSession, created_user: User
+    ):
+        """Тест опций загрузки связей в get_by_id и get_all."""
+        async_db_session.add(Object(name="Физика", point=70, user_id=created_user.id))
+        await async_db_session.commit()
+        async_db_session.expunge_all()
+
+        user = await user_crud.get_by_id(
+            async_db_session, created_user.id, options=[selectinload(User.objects)]
+        )
+        users = await user_crud.get_all(
+            async_db_session, options=[selectinload(User.objects)]
+        )
+
+        assert [obj.name for obj in user.objects] == ["Физика"]
+        assert [len(u.objects) for u in users] == [1]
+
     @pytest.mark.asyncio
     async def test_get_user_by_id_not_found(self, async_db_session: AsyncSession):
         """Тест получения несуществующего пользователя."""
@@ -101,6 +133,113 @@ class TestUserCRUD:
 
         assert len(users) == 1
 
+    @pytest.mark.asyncio
+    async def test_get_page_keyset(self, async_db_session: AsyncSession):
+        """Тест keyset пагинации по первичному ключу."""
+        for i in range(5):
+            await user_crud.create(
+                async_db_session,
+                obj_in=UserCreate(
+                    first_name="A",
+                    last_name=str(i),
+                    full_name=f"A {i}",
+                    telegram_id=str(i),
+                ),
+            )
+
+        page1, cursor1 = await user_crud.get_page(async_db_session, limit=2)
+        page2, cursor2 = await user_crud.get_page(
+            async_db_session, limit=2, cursor=cursor1
+        )
+        page3, cursor3 = await user_crud.get_page(
+            async_db_session, limit=2, cursor=cursor2
+        )
+
+        ids = [user.id for user in page1 + page2 + page3]
+        assert ids == sorted(ids)
+        assert len(set(ids)) == 5
+        assert cursor3 is None
+
+    @pytest.mark.asyncio
+    async def test_get_page_by_created_at(self, async_db_session: AsyncSession):
+        """Тест keyset пагинации по (created_at, id) с одинаковыми датами."""
+        base = datetime(2026, 1, 1)
+        for i, offset in enumerate([2, 0, 1, 1]):
+            async_db_session.add(
+                User(
+                    first_name="A",
+                    last_name=str(i),
+                    full_name=f"A {i}",
+                    telegram_id=str(i),
+                    created_at=base + timedelta(days=offset),
+                )
+            )
+        await async_db_session.commit()
+
+        users, cursor = await user_crud.get_page(
+            async_db_session, limit=3, order_by="created_at"
+        )
+        rest, last_cursor = await user_crud.get_page(
+            async_db_session, limit=3, order_by="created_at", cursor=cursor
+        )
+
+        assert [u.last_name for u in users + rest] == ["1", "2", "3", "0"]
+        assert last_cursor is None
+
+    @pytest.mark.asyncio
+    async def test_get_page_rows(self, async_db_session: AsyncSession):
+        """Тест страницы строк: только запрошенные колонки и общий курсор."""
+        for i in range(3):
+            await user_crud.create(
+                async_db_session,
+                obj_in=UserCreate(
+                    first_name="A",
+                    last_name=str(i),
+                    full_name=f"A {i}",
+                    telegram_id=str(i),
+                ),
+            )
+
+        rows, cursor = await user_crud.get_page_rows(
+            async_db_session, fields=["telegram_id"], limit=2
+        )
+        rest, last_cursor = await user_crud.get_page_rows(
+            async_db_session, fields=["telegram_id"], limit=2, cursor=cursor
+        )
+
+        assert rows == [{"telegram_id": "0"}, {"telegram_id": "1"}]
+        assert rest == [{"telegram_id": "2"}]
+        assert last_cursor is None
+
+    @pytest.mark.asyncio
+    async def test_get_page_invalid_cursor(self, async_db_session: AsyncSession):
+        """Тест повреждённого курсора."""
+        with pytest.raises(InvalidCursorError):
+            await user_crud.get_page(async_db_session, cursor="broken!")
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize(
+        ("order_by", "values"),
+        [
+            ("id", [[1]]),
+            ("id", [{"a": 1}]),
+            ("id", ["1"]),
+            ("id", [True]),
+            ("created_at", [1, 1]),
+            ("created_at", ["2026-01-01T00:00:00", "1"]),
+            ("created_at", ["not a date", 1]),
+        ],
+    )
+    async def test_get_page_cursor_wrong_types(
+        self, async_db_session: AsyncSession, order_by: str, values: list
+    ):
+        """Тест курсора с корректным JSON, но значениями не тех типов."""
+        raw = json.dumps(values).encode()
+        cursor = base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+        with pytest.raises(InvalidCursorError):
+            await user_crud.get_page(async_db_session, cursor=cursor, order_by=order_by)
+
     @pytest.mark.asyncio
     async def test_update_user(
         self, async_db_session: AsyncSession, created_user: User
@@ -151,6 +290,30 @@ class TestUserCRUD:
         user = await user_crud.get_by_id(async_db_session, created_user.id)
         assert user is None
 
+    @pytest.mark.asyncio
+    async def test_writes_use_single_statement(
+        self, async_db_engine, async_db_session: AsyncSession, user_data: dict
+    ):
+        """Тест: create, update и delete обращаются к БД одним запросом."""
+        statements = []
+
+        def count(conn, cursor, statement, *args):
+            statements.append(statement.split()[0])
+
+        event.listen(async_db_engine.sync_engine, "before_cursor_execute", count)
+        try:
+            user = await user_crud.create(
+                async_db_session, obj_in=UserCreate(**user_data)
+            )
+            await user_crud.update(
+                async_db_session, id=user.id, obj_in={"first_name": "Пётр"}
+            )
+            await user_crud.delete(async_db_session, id=user.id)
+        finally:
+            event.remove(async_db_engine.sync_engine, "before_cursor_execute", count)
+
+        assert statements == ["INSERT", "UPDATE", "DELETE"]
+
     @pytest.mark.asyncio
     async def test_delete_user_not_found(self, async_db_session: AsyncSession):
         """Тест удаления несуществующего пользователя."""
@@ -276,3 +439,258 @@ class TestObjectCRUD:
         obj = await object_crud.get_by_id(async_db_session, created_object.id)
         assert obj is None
 
+    @pytest.mark.asyncio
+    async def test_create_if_not_exists(
+        self, async_db_session: AsyncSession, created_user: User, object_data: dict
+    ):
+        """Тест атомарного создания объекта без дубликатов."""
+        object_data["user_id"] = created_user.id
+        obj_in = ObjectCreate(**object_data)
+
+        obj = await object_crud.create_if_not_exists(async_db_session, obj_in=obj_in)
+        duplicate = await object_crud.create_if_not_exists(
+            async_db_session, obj_in=obj_in
+        )
+
+        assert obj is not None
+        assert obj.id is not None
+        assert duplicate is None
+
+    @pytest.mark.asyncio
+    async def test_upsert_creates_and_replaces(
+        self,
+        async_db_engine,
+        async_db_session: AsyncSession,
+        created_user: User,
+    ):
+        """Тест upsert: создание и замена балла одним запросом."""
+        statements = []
+
+        def count(conn, cursor, statement, *args):
+            statements.append(statement)
+
+        event.listen(async_db_engine.sync_engine, "before_cursor_execute", count)
+        try:
+            created = await object_crud.upsert(
+                async_db_session,
+                user_id=created_user.id,
+                obj_in=ObjectUpdate(name="Физика", point=50),
+            )
+            replaced = await object_crud.upsert(
+                async_db_session,
+                user_id=created_user.id,
+                obj_in=ObjectUpdate(name="Физика", point=70),
+            )
+        finally:
+            event.remove(async_db_engine.sync_engine, "before_cursor_execute", count)
+
+        assert replaced.id == created.id
+        assert replaced.point == 70
+        # И создание, и замена — один INSERT ... ON CONFLICT DO UPDATE
+        object_statements = [
+            s for s in statements if " objects" in s and "subject_stats" not in s
+        ]
+        assert len(object_statements) == 2
+        assert all("INSERT INTO objects" in s for s in object_statements)
+        assert all("ON CONFLICT" in s for s in object_statements)
+        objects = await object_crud.get_all_objects_by_user_id(
+            async_db_session, created_user.id
+        )
+        assert len(objects) == 1
+
+
+class TestSubjectStatsCRUD:
+    """Тесты для инкрементальных агрегатов по предметам."""
+
+    @staticmethod
+    async def snapshot(db: AsyncSession) -> list[tuple]:
+        stats = await subject_stats_crud.get_all_subjects(db)
+        return [
+            (s.name, s.count, s.total, s.min_point, s.max_point, s.histogram)
+            for s in stats
+        ]
+
+    @pytest.mark.asyncio
+    async def test_incremental_matches_rebuild(
+        self, async_db_session: AsyncSession, user_data: dict, user_data_2: dict
+    ):
+        """Тест: агрегаты после записей совпадают с полным пересчётом."""
+        user1 = await user_crud.create(async_db_session, obj_in=UserCreate(**user_data))
+        user2 = await user_crud.create(
+            async_db_session, obj_in=UserCreate(**user_data_2)
+        )
+
+        math1 = await object_crud.create(
+            async_db_session,
+            obj_in=ObjectCreate(name="Математика", point=40, user_id=user1.id),
+        )
+        await object_crud.create_if_not_exists(
+            async_db_session,
+            obj_in=ObjectCreate(name="Математика", point=95, user_id=user2.id),
+        )
+        await object_crud.upsert(
+            async_db_session,
+            user_id=user1.id,
+            obj_in=ObjectUpdate(name="Физика", point=70),
+        )
+        await object_crud.upsert(
+            async_db_session,
+            user_id=user1.id,
+            obj_in=ObjectUpdate(name="Физика", point=100),
+        )
+        await object_crud.bulk_upsert(
+            async_db_session,
+            objs_in=[
+                ObjectCreate(name="Физика", point=30, user_id=user2.id),
+                ObjectCreate(name="Математика", point=60, user_id=user2.id),
+            ],
+        )
+        await object_crud.update(async_db_session, id=math1.id, obj_in={"point": 55})
+        await object_crud.delete(async_db_session, id=math1.id)
+
+        incremental = await self.snapshot(async_db_session)
+        await subject_stats_crud.rebuild(async_db_session)
+        rebuilt = await self.snapshot(async_db_session)
+
+        assert incremental == rebuilt
+        assert incremental[0][:5] == ("Математика", 1, 60, 60, 60)
+        assert incremental[1][:5] == ("Физика", 2, 130, 30, 100)
+
+    @pytest.mark.asyncio
+    async def test_concurrent_upserts_of_new_key(self, tmp_path, user_data: dict):
+        """Тест: одновременные upsert нового ключа учитываются один раз."""
+        engine = sqlite_transactions(
+            create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'db.sqlite3'}")
+        )
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        maker = async_sessionmaker(engine, expire_on_commit=False)
+        async with maker() as db:
+            user = await user_crud.create(db, obj_in=UserCreate(**user_data))
+
+        async def upsert(point: int) -> None:
+            async with maker() as db:
+                await object_crud.upsert(
+                    db, user_id=user.id, obj_in=ObjectUpdate(name="Физика", point=point)
+                )
+                await object_crud.bulk_upsert(
+                    db,
+                    objs_in=[ObjectCreate(name="Химия", point=point, user_id=user.id)],
+                )
+
+        await asyncio.gather(*(upsert(point) for point in (40, 60, 80)))
+
+        async with maker() as db:
+            incremental = await self.snapshot(db)
+            await subject_stats_crud.rebuild(db)
+            assert incremental == await self.snapshot(db)
+        assert [row[1] for row in incremental] == [1, 1]
+        await engine.dispose()
+
+    @pytest.mark.asyncio
+    async def test_delete_last_object_empties_subject(
+        self, async_db_session: AsyncSession, user_data: dict
+    ):
+        """Тест: предмет без баллов не попадает в статистику."""
+        user = await user_crud.create(async_db_session, obj_in=UserCreate(**user_data))
+        obj = await object_crud.create(
+            async_db_session,
+            obj_in=ObjectCreate(name="Химия", point=80, user_id=user.id),
+        )
+
+        await object_crud.delete(async_db_session, id=obj.id)
+
+        assert await self.snapshot(async_db_session) == []
+
+
+class TestCRUDCache:
+    """Тесты для кэша get_by_id."""
+
+    @pytest.fixture
+    def cached_crud(self) -> UserCRUD:
+        return UserCRUD(User, cache=LRUCacheBackend(maxsize=100, ttl=60))
+
+    @pytest.mark.asyncio
+    async def test_get_by_id_cached(
+        self,
+        async_db_engine,
+        async_db_session: AsyncSession,
+        cached_crud: UserCRUD,
+        user_data: dict,
+    ):
+        """Тест: повторный get_by_id не обращается к БД."""
+        created = await cached_crud.create(
+            async_db_session, obj_in=UserCreate(**user_data)
+        )
+        await cached_crud.get_by_id(async_db_session, created.id)
+        async_db_session.expunge_all()
+
+        statements = []
+
+        def count(conn, cursor, statement, *args):
+            statements.append(statement)
+
+        event.listen(async_db_engine.sync_engine, "before_cursor_execute", count)
+        try:
+            user = await cached_crud.get_by_id(async_db_session, created.id)
+        finally:
+            event.remove(async_db_engine.sync_engine, "before_cursor_execute", count)
+
+        assert statements == []
+        assert user.telegram_id == user_data["telegram_id"]
+        assert user in async_db_session
+        assert cached_crud.cache_stats()["hits"] == 1
+        assert cached_crud.cache_stats()["misses"] == 1
+
+    @pytest.mark.asyncio
+    async def test_update_invalidates_cache(
+        self, async_db_session: AsyncSession, cached_crud: UserCRUD, user_data: dict
+    ):
+        """Тест: update сбрасывает запись кэша."""
+        created = await cached_crud.create(
+            async_db_session, obj_in=UserCreate(**user_data)
+        )
+        await cached_crud.get_by_id(async_db_session, created.id)
+
+        await cached_crud.update(
+            async_db_session, id=created.id, obj_in={"first_name": "Пётр"}
+        )
+        async_db_session.expunge_all()
+        user = await cached_crud.get_by_id(async_db_session, created.id)
+
+        assert user.first_name == "Пётр"
+
+    @pytest.mark.asyncio
+    async def test_delete_invalidates_cache(
+        self, async_db_session: AsyncSession, cached_crud: UserCRUD, user_data: dict
+    ):
+        """Тест: delete сбрасывает запись кэша."""
+        created = await cached_crud.create(
+            async_db_session, obj_in=UserCreate(**user_data)
+        )
+        await cached_crud.get_by_id(async_db_session, created.id)
+
+        await cached_crud.delete(async_db_session, id=created.id)
+
+        assert await cached_crud.get_by_id(async_db_session, created.id) is None
+
+    @pytest.mark.asyncio
+    async def test_replica_reads_not_cached(
+        self,
+        async_db_session: AsyncSession,
+        replica_maker,
+        cached_crud: UserCRUD,
+    ):
+        """Тест: строки, прочитанные с реплики, не попадают в кэш."""
+        router = ReadRouter([replica_maker])
+        async with router.session(None, async_db_session) as replica:
+            assert is_replica(replica)
+            user = await cached_crud.get_by_id(replica, 1)
+
+        assert user.first_name == "Реплика"
+        assert not is_replica(async_db_session)
+        assert cached_crud.cache_stats()["size"] == 0
+
+    def test_cache_disabled(self):
+        """Тест: без кэша счётчики недоступны."""
+        assert UserCRUD(User).cache_stats() is None
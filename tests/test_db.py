@@ -0,0 +1,176 @@
+"""Тесты для пула соединений, чтения с реплик и поиска N+1."""
+
+from unittest.mock import MagicMock
+
+import pytest
+import pytest_asyncio
+from httpx import AsyncClient
+from sqlalchemy import exc, text
+from sqlalchemy.exc import InvalidRequestError
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from core.db import session as session_module
+from core.db.pool import TimedAsyncQueuePool, pool_status
+from core.db.profiling import QueryBudgetExceeded, QueryLog
+from core.db.replicas import CLIENT_COOKIE, CLIENT_HEADER, ReadRouter
+from src.app.users.model import User
+
+
+class TestTimedAsyncQueuePool:
+    """Тесты для TimedAsyncQueuePool."""
+
+    @pytest.mark.asyncio
+    async def test_pool_status_counts_checkouts_and_timeouts(self, tmp_path):
+        """Тест счётчиков получения соединений и таймаутов ожидания."""
+        engine = create_async_engine(
+            f"sqlite+aiosqlite:///{tmp_path / 'pool.db'}",
+            poolclass=TimedAsyncQueuePool,
+            pool_size=1,
+            max_overflow=0,
+            pool_timeout=0.05,
+        )
+        try:
+            async with engine.connect() as conn:
+                await conn.execute(text("SELECT 1"))
+                busy = pool_status(engine)
+                with pytest.raises(exc.TimeoutError):
+                    async with engine.connect():
+                        pass
+
+            status = pool_status(engine)
+        finally:
+            await engine.dispose()
+
+        assert busy["checked_out"] == 1
+        assert status["checked_out"] == 0
+        assert status["size"] == 1
+        assert status["checkouts"] == 2
+        assert status["timeouts"] == 1
+        assert status["wait_seconds_max"] >= 0.05
+
+
+class TestReadRouter:
+    """Тесты для ReadRouter."""
+
+    @pytest.mark.asyncio
+    async def test_without_replicas_uses_primary(self, async_db_session):
+        """Тест: без реплик чтение идёт через primary."""
+        router = ReadRouter()
+
+        async with router.session("client", async_db_session) as session:
+            assert session is async_db_session
+
+    @pytest.mark.asyncio
+    async def test_round_robin(self, async_db_session, replica_maker):
+        """Тест поочерёдного выбора реплик."""
+        first = MagicMock(wraps=replica_maker)
+        second = MagicMock(wraps=replica_maker)
+        router = ReadRouter([first, second])
+
+        for _ in range(4):
+            async with router.session(None, async_db_session) as session:
+                assert session is not async_db_session
+
+        assert first.call_count == 2
+        assert second.call_count == 2
+
+    @pytest.mark.asyncio
+    async def test_unavailable_replica_falls_back(self, async_db_session, tmp_path):
+        """Тест: недоступная реплика заменяется на primary."""
+        engine = create_async_engine(
+            f"sqlite+aiosqlite:///{tmp_path / 'missing' / 'replica.db'}"
+        )
+        router = ReadRouter([async_sessionmaker(engine)])
+        try:
+            async with router.session(None, async_db_session) as session:
+                assert session is async_db_session
+        finally:
+            await engine.dispose()
+
+    @pytest.mark.asyncio
+    async def test_read_your_writes(
+        self, monkeypatch, async_client: AsyncClient, replica_maker, user_data: dict
+    ):
+        """Тест: GET читает с реплики, но после записи клиента — с primary."""
+        router = ReadRouter([replica_maker], read_your_writes=60)
+        monkeypatch.setattr(session_module, "read_router", router)
+
+        from_replica = await async_client.get("/users/telegram/replica")
+        created = await async_client.post("/users/", json=user_data)
+        after_write = await async_client.get("/users/telegram/replica")
+        # Другой клиент с того же адреса по-прежнему читает с реплики
+        async_client.cookies.clear()
+        other_client = await async_client.get("/users/telegram/replica")
+
+        assert from_replica.status_code == 200
+        assert from_replica.json()["first_name"] == "Реплика"
+        assert CLIENT_COOKIE in created.cookies
+        assert after_write.status_code == 404
+        assert other_client.status_code == 200
+
+    @pytest.mark.asyncio
+    async def test_read_your_writes_by_header(
+        self, monkeypatch, async_client: AsyncClient, replica_maker, user_data: dict
+    ):
+        """Тест: клиент с X-Client-ID узнаётся по заголовку, без cookie."""
+        router = ReadRouter([replica_maker], read_your_writes=60)
+        monkeypatch.setattr(session_module, "read_router", router)
+        headers = {CLIENT_HEADER: "user-1"}
+
+        created = await async_client.post("/users/", json=user_data, headers=headers)
+        own = await async_client.get("/users/telegram/replica", headers=headers)
+        other = await async_client.get(
+            "/users/telegram/replica", headers={CLIENT_HEADER: "user-2"}
+        )
+
+        assert CLIENT_COOKIE not in created.cookies
+        assert own.status_code == 404
+        assert other.status_code == 200
+
+    @pytest.mark.asyncio
+    async def test_replica_engine_without_asyncpg(self, tmp_path):
+        """Тест: параметры asyncpg не передаются другим драйверам."""
+        engine = session_module._create_engine(
+            f"sqlite+aiosqlite:///{tmp_path / 'replica.db'}"
+        )
+        try:
+            async with engine.connect() as conn:
+                assert (await conn.execute(text("SELECT 1"))).scalar() == 1
+        finally:
+            await engine.dispose()
+
+
+class TestQueryLog:
+    """Тесты для QueryLog и поиска N+1."""
+
+    def test_repeated_shapes(self):
+        """Тест: выражения одной формы считаются вместе."""
+        log = QueryLog()
+        log.statements = [
+            "SELECT * FROM objects WHERE user_id = ?",
+            "SELECT * FROM objects WHERE user_id = ?",
+            "SELECT * FROM users WHERE id IN (?, ?)",
+            "SELECT * FROM users WHERE id IN (?,  ?, ?)",
+        ]
+
+        assert log.repeated() == {
+            "SELECT * FROM objects WHERE user_id = ?": 2,
+            "SELECT * FROM users WHERE id IN (?)": 2,
+        }
+        with pytest.raises(QueryBudgetExceeded):
+            log.check(10)
+        with pytest.raises(QueryBudgetExceeded):
+            log.check(3, max_repeats=2)
+        log.check(4, max_repeats=2)
+
+    @pytest.mark.asyncio
+    async def test_lazy_load_raises(self, async_db_session, user_data: dict):
+        """Тест: незагруженная связь бросает ошибку вместо скрытого запроса."""
+        async_db_session.add(User(**user_data))
+        await async_db_session.commit()
+        async_db_session.expunge_all()
+
+        user = await async_db_session.get(User, 1)
+
+        with pytest.raises(InvalidRequestError):
+            user.objects
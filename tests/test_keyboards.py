@@ -0,0 +1,49 @@
+"""Тесты для клавиатур бота."""
+
+import pytest
+from aiogram import Bot
+from aiogram.client.session.aiohttp import AiohttpSession
+from aiogram.methods import SendMessage
+from pydantic import ValidationError
+
+from bot.keyboards import (
+    MAIN_KEYBOARD,
+    SUBJECTS,
+    SUBJECTS_KEYBOARD,
+    CachedMarkupSession,
+    get_main_keyboard,
+)
+
+
+def form_fields(session: AiohttpSession, method: SendMessage) -> dict:
+    form = session.build_form_data(Bot("123:abc"), method)
+    return {options["name"]: value for options, _, value in form._fields}
+
+
+class TestKeyboards:
+    """Тесты для готовых клавиатур."""
+
+    def test_singletons(self):
+        """Тест: клавиатуры создаются один раз и неизменяемы."""
+        assert get_main_keyboard() is MAIN_KEYBOARD
+        with pytest.raises(ValidationError):
+            MAIN_KEYBOARD.resize_keyboard = False
+
+    def test_subjects_layout(self):
+        """Тест: предметы по два в ряд и кнопка отмены последней."""
+        rows = [[button.text for button in row] for row in SUBJECTS_KEYBOARD.keyboard]
+
+        assert [text for row in rows[:-1] for text in row] == SUBJECTS
+        assert all(len(row) == 2 for row in rows[:-1])
+        assert rows[-1] == ["❌ Отмена"]
+
+    def test_cached_form_data_matches(self):
+        """Тест: кэшированный JSON клавиатуры совпадает с обычной сериализацией."""
+        method = SendMessage(chat_id=1, text="Привет", reply_markup=SUBJECTS_KEYBOARD)
+        session = CachedMarkupSession()
+
+        expected = form_fields(AiohttpSession(), method)
+        assert form_fields(session, method) == expected
+        # Повторная отправка берёт JSON из кэша
+        assert form_fields(session, method) == expected
+        assert len(session._markup_json) == 1
@@ -0,0 +1,91 @@
+"""Тесты для метрик API."""
+
+import pytest
+from httpx import AsyncClient
+
+from core.base.metrics import MetricsRegistry, _Metric, instrument_engine
+
+
+class TestMetricsRegistry:
+    """Тесты для MetricsRegistry."""
+
+    def test_render_counter_and_histogram(self):
+        """Тест текстового формата Prometheus."""
+        registry = MetricsRegistry()
+        requests = registry.counter("requests_total", "Запросы.", ("status",))
+        latency = registry.histogram("latency_seconds", "Задержка.", (), (0.1, 1.0))
+
+        requests.inc(200)
+        requests.inc(200)
+        latency.observe(0.05)
+        latency.observe(0.5)
+        latency.observe(5)
+
+        text = registry.render()
+
+        assert "# TYPE requests_total counter" in text
+        assert 'requests_total{status="200"} 2' in text
+        assert "# TYPE latency_seconds histogram" in text
+        assert 'latency_seconds_bucket{le="0.1"} 1' in text
+        assert 'latency_seconds_bucket{le="1.0"} 2' in text
+        assert 'latency_seconds_bucket{le="+Inf"} 3' in text
+        assert "latency_seconds_count 3" in text
+
+    def test_collector_runs_on_render(self):
+        """Тест обновления gauge коллектором при выдаче."""
+        registry = MetricsRegistry()
+        gauge = registry.gauge("queue_depth", "Глубина очереди.")
+        registry.add_collector(lambda: gauge.set(7))
+
+        assert "queue_depth 7" in registry.render()
+
+    def test_metric_requires_samples(self):
+        """Тест: базовый класс метрики абстрактный."""
+        with pytest.raises(TypeError):
+            _Metric("broken", "Без _samples.")
+
+
+def sample(text: str, series: str) -> float:
+    """Значение серии из выдачи /metrics (0, если серии нет)."""
+    for line in text.splitlines():
+        if line.startswith(series + " "):
+            return float(line.rsplit(" ", 1)[1])
+    return 0.0
+
+
+class TestMetricsEndpoint:
+    """Тесты для /metrics."""
+
+    @pytest.mark.asyncio
+    async def test_route_and_db_metrics(
+        self, async_db_engine, async_client: AsyncClient, user_data: dict
+    ):
+        """Тест метрик по шаблону маршрута и запросов к БД."""
+        instrument_engine(async_db_engine)
+        zero_queries = (
+            'http_request_db_queries_bucket{method="POST",route="/users/",le="0"}'
+        )
+        one_query = (
+            'http_request_db_queries_bucket{method="POST",route="/users/",le="1"}'
+        )
+        before = (await async_client.get("/metrics")).text
+        user = (await async_client.post("/users/", json=user_data)).json()
+        await async_client.get(f"/users/{user['id']}")
+
+        response = await async_client.get("/metrics")
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/plain")
+        text = response.text
+        assert (
+            'http_requests_total{method="GET",route="/users/{user_id}",status="200"}'
+            in text
+        )
+        # POST /users/ — ровно один INSERT ... RETURNING
+        assert sample(text, zero_queries) == sample(before, zero_queries)
+        assert sample(text, one_query) == sample(before, one_query) + 1
+        assert 'db_statement_duration_seconds_count{operation="INSERT"}' in text
+        assert 'db_pool_size{engine="primary"}' in text
+        assert "# TYPE db_pool_size gauge" in text
+        assert "# TYPE db_pool_checkouts_total counter" in text
+        assert "# TYPE db_pool_wait_seconds_total counter" in text
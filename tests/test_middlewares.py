@@ -0,0 +1,115 @@
+"""Тесты для middleware и кэша бота."""
+
+from types import SimpleNamespace
+from unittest.mock import AsyncMock
+
+import pytest
+
+from bot.cache import TTLCache
+from bot.middlewares import UserMiddleware
+
+
+class FakeClock:
+    """Управляемые часы для проверки TTL."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class TestTTLCache:
+    """Тесты для TTLCache."""
+
+    def test_get_set(self):
+        """Тест сохранения и получения значения."""
+        cache = TTLCache(maxsize=10, ttl=60)
+        cache.set("1", {"id": 1})
+
+        assert cache.get("1") == (True, {"id": 1})
+        assert cache.get("2") == (False, None)
+        assert cache.stats()["hits"] == 1
+        assert cache.stats()["misses"] == 1
+
+    def test_ttl_expiration(self):
+        """Тест истечения TTL."""
+        clock = FakeClock()
+        cache = TTLCache(maxsize=10, ttl=60, clock=clock)
+        cache.set("1", {"id": 1})
+
+        clock.now = 61
+
+        assert cache.get("1") == (False, None)
+        assert len(cache) == 0
+
+    def test_negative_caching(self):
+        """Тест кэширования отсутствующего пользователя с отдельным TTL."""
+        clock = FakeClock()
+        cache = TTLCache(maxsize=10, ttl=600, negative_ttl=30, clock=clock)
+        cache.set("1", None)
+
+        assert cache.get("1") == (True, None)
+
+        clock.now = 31
+
+        assert cache.get("1") == (False, None)
+
+    def test_lru_eviction(self):
+        """Тест вытеснения давно неиспользуемых записей."""
+        cache = TTLCache(maxsize=2, ttl=60)
+        cache.set("1", 1)
+        cache.set("2", 2)
+        cache.get("1")
+        cache.set("3", 3)
+
+        assert cache.get("2") == (False, None)
+        assert cache.get("1") == (True, 1)
+        assert cache.stats()["evictions"] == 1
+
+
+class TestUserMiddleware:
+    """Тесты для UserMiddleware."""
+
+    @pytest.mark.asyncio
+    async def test_resolves_user_once(self):
+        """Тест: повторные апдейты берут пользователя из кэша."""
+        client = AsyncMock()
+        client.get_user_by_telegram_id.return_value = {"id": 1}
+        middleware = UserMiddleware(client=client, cache=TTLCache(10, 60))
+        handler = AsyncMock(return_value="ok")
+        data = {"event_from_user": SimpleNamespace(id=123)}
+
+        await middleware(handler, object(), dict(data))
+        result = await middleware(handler, object(), dict(data))
+
+        assert result == "ok"
+        client.get_user_by_telegram_id.assert_awaited_once_with("123")
+        assert handler.await_args.args[1]["user"] == {"id": 1}
+
+    @pytest.mark.asyncio
+    async def test_not_found_is_cached(self):
+        """Тест отрицательного кэширования незарегистрированного пользователя."""
+        client = AsyncMock()
+        client.get_user_by_telegram_id.return_value = None
+        middleware = UserMiddleware(client=client, cache=TTLCache(10, 60))
+        handler = AsyncMock()
+        data = {"event_from_user": SimpleNamespace(id=123)}
+
+        await middleware(handler, object(), dict(data))
+        await middleware(handler, object(), dict(data))
+
+        client.get_user_by_telegram_id.assert_awaited_once()
+        assert handler.await_args.args[1]["user"] is None
+
+    @pytest.mark.asyncio
+    async def test_without_user(self):
+        """Тест апдейта без отправителя."""
+        client = AsyncMock()
+        middleware = UserMiddleware(client=client, cache=TTLCache(10, 60))
+        handler = AsyncMock()
+
+        await middleware(handler, object(), {})
+
+        client.get_user_by_telegram_id.assert_not_awaited()
+        assert handler.await_args.args[1]["user"] is None
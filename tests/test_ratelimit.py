@@ -0,0 +1,191 @@
+"""Тесты для ограничителя исходящих запросов бота."""
+
+import asyncio
+
+import pytest
+import pytest_asyncio
+from aiogram import Bot, Dispatcher, Router
+from aiogram.client.session.aiohttp import AiohttpSession
+from aiogram.client.telegram import TelegramAPIServer
+from aiohttp import web
+from aiogram.types import Message
+from aiohttp.test_utils import TestServer
+
+from bot.ratelimit import RateLimiter, TokenBucket
+from bot.scheduler import ChatScheduler
+from tests.test_scheduler import fake_update
+
+
+class FakeTelegram:
+    """Сервер Bot API: отвечает на sendMessage и запоминает время отправок."""
+
+    def __init__(self, flood_chats: set[int] | None = None):
+        self.sent: list[tuple[float, int]] = []
+        # Чаты, на первое сообщение в которые сервер отвечает 429
+        self.flood_chats = set(flood_chats or ())
+        self.app = web.Application()
+        self.app.router.add_post("/bot{token}/{method}", self.handle)
+
+    async def handle(self, request: web.Request) -> web.Response:
+        data = await request.post()
+        chat_id = int(data["chat_id"])
+        if chat_id in self.flood_chats:
+            self.flood_chats.discard(chat_id)
+            return web.json_response(
+                {
+                    "ok": False,
+                    "error_code": 429,
+                    "description": "Too Many Requests: retry after 1",
+                    "parameters": {"retry_after": 1},
+                }
+            )
+        self.sent.append((asyncio.get_running_loop().time(), chat_id))
+        return web.json_response(
+            {
+                "ok": True,
+                "result": {
+                    "message_id": len(self.sent),
+                    "date": 0,
+                    "chat": {"id": chat_id, "type": "private"},
+                    "text": data["text"],
+                },
+            }
+        )
+
+    def times(self, chat_id: int) -> list[float]:
+        return [at for at, chat in self.sent if chat == chat_id]
+
+
+class RecordingLimiter(RateLimiter):
+    """RateLimiter, запоминающий назначенные моменты отправки."""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.reserved: list[tuple[float, int]] = []
+        self._last_now = 0.0
+
+    def _now(self) -> float:
+        self._last_now = super()._now()
+        return self._last_now
+
+    def reserve(self, chat_id):
+        delay = super().reserve(chat_id)
+        self.reserved.append((self._last_now + delay, chat_id))
+        return delay
+
+    def times(self, chat_id: int) -> list[float]:
+        return [at for at, chat in self.reserved if chat == chat_id]
+
+
+@pytest_asyncio.fixture
+async def telegram():
+    """Поддельный Telegram и бот, отправляющий в него через RateLimiter."""
+    fake = FakeTelegram()
+    server = TestServer(fake.app)
+    await server.start_server()
+    api = TelegramAPIServer.from_base(str(server.make_url("")).rstrip("/"))
+    bot = Bot("123:abc", session=AiohttpSession(api=api))
+    yield fake, bot
+    await bot.session.close()
+    await server.close()
+
+
+class TestTokenBucket:
+    """Тесты для TokenBucket и расчёта задержек."""
+
+    def test_rate_and_burst(self):
+        """Тест: всплеск до burst без задержки, дальше — по rate."""
+        bucket = TokenBucket(rate=2, burst=2)
+
+        assert [bucket.reserve(0) for _ in range(4)] == [0, 0, 0.5, 1.0]
+        assert bucket.reserve(10) == 10
+
+    def test_chat_and_global_limits(self):
+        """Тест: общий лимит делится между чатами, по-чатовый — на чат."""
+        now = [0.0]
+        limiter = RateLimiter(
+            global_rate=2, chat_rate=1, chat_burst=1, clock=lambda: now[0]
+        )
+
+        assert [limiter.reserve(chat) for chat in (1, 2, 3, 4)] == [0, 0, 0.5, 1.0]
+        # Второе сообщение в чат 1: не раньше секунды и после занятых слотов
+        assert limiter.reserve(1) == 1.5
+        # Группы ограничены 20 сообщениями в минуту
+        assert limiter.reserve(-100) == 2.0
+        assert limiter.reserve(-100) == 5.0
+
+
+class TestRateLimiter:
+    """Тесты RateLimiter против поддельного сервера Telegram."""
+
+    @pytest.mark.asyncio
+    async def test_per_chat_spacing(self, telegram):
+        """Тест: сообщения в чат разнесены по GCRA, другой чат не ждёт."""
+        fake, bot = telegram
+        # Часы стоят: назначенные моменты зависят только от бакетов
+        limiter = RecordingLimiter(
+            global_rate=128, chat_rate=16, chat_burst=1, clock=lambda: 0.0
+        )
+        bot.session.middleware(limiter)
+
+        busy = [bot.send_message(1, str(i)) for i in range(5)]
+        other = bot.send_message(2, "other")
+        await asyncio.gather(*busy, other)
+
+        # Интервал чата 1/16 с; общий лимит (1/128 с) его не сдвигает
+        assert limiter.times(1) == [0.0, 0.0625, 0.125, 0.1875, 0.25]
+        assert limiter.times(2) == [0.0]
+        assert len(fake.times(1)) == 5
+
+    @pytest.mark.asyncio
+    async def test_retry_after(self, telegram):
+        """Тест: на 429 запрос повторяется после retry_after, остальные ждут."""
+        fake, bot = telegram
+        fake.flood_chats.add(7)
+        limiter = RecordingLimiter(global_rate=100, chat_rate=100)
+        bot.session.middleware(limiter)
+
+        started = asyncio.get_running_loop().time()
+        flooded = asyncio.create_task(bot.send_message(7, "hello"))
+        while not limiter.retried:
+            await asyncio.sleep(0.001)
+        # 429 останавливает и общую очередь: сообщение в другой чат ждёт
+        await bot.send_message(8, "other")
+        message = await flooded
+
+        assert message.text == "hello"
+        assert fake.times(7)[0] - started >= 1.0
+        assert limiter.times(8)[0] - started >= 1.0
+        assert limiter.stats()["retried"] == 1
+        assert limiter.stats()["sent"] == 2
+
+    @pytest.mark.asyncio
+    async def test_waiting_send_frees_worker(self, telegram):
+        """Тест: ожидание отправки не занимает воркер ChatScheduler."""
+        fake, bot = telegram
+        bot.session.middleware(RateLimiter(global_rate=100, chat_rate=5, chat_burst=1))
+        scheduler = ChatScheduler(workers=1)
+        handled: list[int] = []
+
+        async def handle(message: Message) -> None:
+            if message.chat.id == 1:
+                # Три ответа в один чат: около 0.4 с в очереди на отправку
+                for i in range(3):
+                    await message.answer(str(i))
+            handled.append(message.chat.id)
+
+        router = Router()
+        router.message.register(handle)
+        dp = Dispatcher()
+        dp.include_router(router)
+        dp.update.outer_middleware(scheduler)
+        await dp.feed_raw_update(bot, fake_update(1, chat_id=1))
+        await dp.feed_raw_update(bot, fake_update(2, chat_id=2))
+        await asyncio.sleep(0.1)
+
+        # Единственный воркер свободен, пока чат 1 ждёт отправки
+        assert handled == [2]
+
+        await scheduler.stop()
+        assert handled == [2, 1]
+        assert len(fake.times(1)) == 3
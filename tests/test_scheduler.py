@@ -0,0 +1,160 @@
+"""Тесты для очередей апдейтов бота по чатам."""
+
+import asyncio
+import random
+
+import pytest
+from aiogram import Bot, Dispatcher, F, Router
+from aiogram.filters import Command, StateFilter
+from aiogram.fsm.context import FSMContext
+from aiogram.fsm.state import State, StatesGroup
+from aiogram.types import Message
+
+from bot.scheduler import ChatScheduler, bot_updates_pending
+
+
+class Form(StatesGroup):
+    waiting = State()
+
+
+def fake_update(update_id: int, chat_id: int, text: str | None = None) -> dict:
+    """Апдейт Telegram с сообщением из чата chat_id."""
+    return {
+        "update_id": update_id,
+        "message": {
+            "message_id": update_id,
+            "date": 0,
+            "chat": {"id": chat_id, "type": "private"},
+            "from": {"id": chat_id, "is_bot": False, "first_name": "Иван"},
+            "text": text or str(update_id),
+        },
+    }
+
+
+def make_dispatcher(scheduler: ChatScheduler, handle) -> Dispatcher:
+    router = Router()
+    router.message.register(handle)
+    dp = Dispatcher()
+    dp.include_router(router)
+    dp.update.outer_middleware(scheduler)
+    return dp
+
+
+class TestChatScheduler:
+    """Тесты для ChatScheduler."""
+
+    @pytest.mark.asyncio
+    async def test_order_within_chat(self):
+        """Тест: апдейты чата по порядку, разные чаты параллельно."""
+        scheduler = ChatScheduler(workers=4)
+        handled: dict[int, list[int]] = {}
+        state = {"active": 0, "peak": 0}
+        delays = random.Random(0)
+
+        async def handle(message: Message) -> None:
+            state["active"] += 1
+            state["peak"] = max(state["peak"], state["active"])
+            await asyncio.sleep(delays.random() / 100)
+            handled.setdefault(message.chat.id, []).append(message.message_id)
+            state["active"] -= 1
+
+        dp = make_dispatcher(scheduler, handle)
+        bot = Bot("123:abc")
+        for update_id in range(60):
+            await dp.feed_raw_update(bot, fake_update(update_id, update_id % 6))
+        await scheduler.stop()
+
+        assert set(handled) == set(range(6))
+        for chat_id, message_ids in handled.items():
+            assert message_ids == list(range(chat_id, 60, 6))
+        assert 1 < state["peak"] <= 4
+        assert scheduler.stats()["processed"] == 60
+        await bot.session.close()
+
+    @pytest.mark.asyncio
+    async def test_slow_chat_does_not_block_others(self):
+        """Тест: зависший чат не задерживает апдейты других чатов."""
+        scheduler = ChatScheduler(workers=2)
+        release = asyncio.Event()
+        handled: list[int] = []
+
+        async def handle(message: Message) -> None:
+            if message.chat.id == 1:
+                await release.wait()
+            handled.append(message.message_id)
+
+        dp = make_dispatcher(scheduler, handle)
+        bot = Bot("123:abc")
+        await dp.feed_raw_update(bot, fake_update(1, chat_id=1))
+        await dp.feed_raw_update(bot, fake_update(2, chat_id=1))
+        for update_id in range(3, 10):
+            await dp.feed_raw_update(bot, fake_update(update_id, chat_id=update_id))
+        await asyncio.sleep(0.05)
+
+        assert handled == list(range(3, 10))
+
+        release.set()
+        await scheduler.stop()
+
+        assert handled == [*range(3, 10), 1, 2]
+        await bot.session.close()
+
+    @pytest.mark.asyncio
+    async def test_backpressure_and_depth_metric(self):
+        """Тест: при заполненных очередях приём ждёт; глубина в метрике."""
+        scheduler = ChatScheduler(workers=1, max_pending=3)
+        release = asyncio.Event()
+
+        async def handle(message: Message) -> None:
+            await release.wait()
+
+        dp = make_dispatcher(scheduler, handle)
+        bot = Bot("123:abc")
+        for update_id in range(3):
+            await dp.feed_raw_update(bot, fake_update(update_id, chat_id=update_id))
+        blocked = asyncio.create_task(dp.feed_raw_update(bot, fake_update(3, 3)))
+        await asyncio.sleep(0.05)
+
+        assert not blocked.done()
+        assert scheduler.stats()["pending"] == 3
+        assert bot_updates_pending._values[()] == 3
+
+        release.set()
+        await blocked
+        await scheduler.stop()
+
+        assert scheduler.stats()["processed"] == 4
+        assert bot_updates_pending._values[()] == 0
+        await bot.session.close()
+
+    @pytest.mark.asyncio
+    async def test_state_set_by_previous_update(self):
+        """Тест: апдейт чата видит состояние FSM, заданное предыдущим."""
+        scheduler = ChatScheduler(workers=2)
+        handled: list[str] = []
+        router = Router()
+
+        @router.message(Command("start"))
+        async def start(message: Message, state: FSMContext) -> None:
+            await asyncio.sleep(0.01)
+            await state.set_state(Form.waiting)
+            handled.append("start")
+
+        @router.message(StateFilter(Form.waiting), F.text)
+        async def in_state(message: Message) -> None:
+            handled.append("in_state")
+
+        @router.message()
+        async def fallback(message: Message) -> None:
+            handled.append("fallback")
+
+        dp = Dispatcher()
+        dp.include_router(router)
+        dp.update.outer_middleware(scheduler)
+        bot = Bot("123:abc")
+        await dp.feed_raw_update(bot, fake_update(1, chat_id=1, text="/start"))
+        await dp.feed_raw_update(bot, fake_update(2, chat_id=1, text="hello"))
+        await scheduler.stop()
+
+        assert handled == ["start", "in_state"]
+        await bot.session.close()
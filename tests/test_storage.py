@@ -0,0 +1,93 @@
+"""Тесты для FSM хранилища бота на SQLite."""
+
+import asyncio
+
+import pytest
+from aiogram.fsm.storage.base import StorageKey
+
+from bot.states import RegistrationState
+from bot.storage import SQLiteStorage
+
+KEY = StorageKey(bot_id=1, chat_id=100, user_id=100)
+
+
+class TestSQLiteStorage:
+    """Тесты для SQLiteStorage."""
+
+    @pytest.mark.asyncio
+    async def test_state_and_data(self, tmp_path):
+        """Тест записи и чтения состояния и данных."""
+        storage = SQLiteStorage(tmp_path / "fsm.sqlite3")
+
+        await storage.set_state(KEY, RegistrationState.waiting_first_name)
+        await storage.set_data(KEY, {"first_name": "Иван"})
+        data = await storage.update_data(KEY, {"last_name": "Иванов"})
+
+        assert await storage.get_state(KEY) == "RegistrationState:waiting_first_name"
+        assert data == {"first_name": "Иван", "last_name": "Иванов"}
+        assert await storage.get_data(KEY) == data
+        await storage.close()
+
+    @pytest.mark.asyncio
+    async def test_survives_restart(self, tmp_path):
+        """Тест: состояние сохраняется после закрытия и повторного открытия."""
+        storage = SQLiteStorage(tmp_path / "fsm.sqlite3", shards=4)
+        await storage.set_state(KEY, "ScoreState:waiting_score")
+        await storage.set_data(KEY, {"subject": "Физика"})
+        await storage.close()
+
+        reopened = SQLiteStorage(tmp_path / "fsm.sqlite3", shards=4)
+
+        assert await reopened.get_state(KEY) == "ScoreState:waiting_score"
+        assert await reopened.get_data(KEY) == {"subject": "Физика"}
+        await reopened.close()
+
+    @pytest.mark.asyncio
+    async def test_writes_shared_between_processes(self, tmp_path):
+        """Тест: запись сразу видна другому процессу и не затирает его поле."""
+        path = tmp_path / "fsm.sqlite3"
+        first = SQLiteStorage(path)
+        second = SQLiteStorage(path)
+
+        await first.set_state(KEY, "ScoreState:waiting_score")
+
+        assert await second.get_state(KEY) == "ScoreState:waiting_score"
+
+        await second.set_data(KEY, {"subject": "Физика"})
+        await first.set_state(KEY, "ScoreState:waiting_subject")
+
+        assert await second.get_state(KEY) == "ScoreState:waiting_subject"
+        assert await first.get_data(KEY) == {"subject": "Физика"}
+        await first.close()
+        await second.close()
+
+    @pytest.mark.asyncio
+    async def test_concurrent_writes_batched(self, tmp_path):
+        """Тест: одновременные записи разных чатов идут общими транзакциями."""
+        storage = SQLiteStorage(tmp_path / "fsm.sqlite3", shards=2, batch_size=20)
+        keys = [StorageKey(bot_id=1, chat_id=i, user_id=i) for i in range(50)]
+
+        await asyncio.gather(
+            *(storage.set_state(key, f"State:{key.chat_id}") for key in keys)
+        )
+
+        # Первая запись уходит сразу, остальные копятся за время её COMMIT
+        assert 1 < storage.batches <= 1 + 3
+        for key in keys:
+            assert await storage.get_state(key) == f"State:{key.chat_id}"
+        await storage.close()
+
+    @pytest.mark.asyncio
+    async def test_cleared_record_is_removed(self, tmp_path):
+        """Тест: после state.clear() строка удаляется из файла."""
+        storage = SQLiteStorage(tmp_path / "fsm.sqlite3")
+        await storage.set_state(KEY, "ScoreState:waiting_score")
+        await storage.set_data(KEY, {"subject": "Физика"})
+
+        await storage.set_state(KEY, None)
+        await storage.set_data(KEY, {})
+
+        count = storage._readers[0].execute("SELECT count(*) FROM fsm").fetchone()[0]
+        assert count == 0
+        assert await storage.get_data(KEY) == {}
+        await storage.close()
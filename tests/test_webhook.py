@@ -0,0 +1,164 @@
+"""Тесты для вебхука бота."""
+
+import asyncio
+
+import pytest
+from aiogram import Bot, Dispatcher, Router
+from aiogram.types import Message
+from aiohttp.test_utils import TestClient, TestServer
+
+from bot.scheduler import ChatScheduler
+from bot.webhook import WEBHOOK_HANDLER, create_app
+
+SECRET = "test-secret"
+
+
+def fake_update(update_id: int, text: str = "/start") -> dict:
+    """Апдейт Telegram с текстовым сообщением."""
+    return {
+        "update_id": update_id,
+        "message": {
+            "message_id": update_id,
+            "date": 0,
+            "chat": {"id": 100 + update_id, "type": "private"},
+            "from": {"id": 100 + update_id, "is_bot": False, "first_name": "Иван"},
+            "text": text,
+        },
+    }
+
+
+def make_dispatcher(handled: list[int], release: asyncio.Event | None = None):
+    """Диспетчер, записывающий обработанные сообщения."""
+    router = Router()
+    state = {"active": 0, "peak": 0}
+
+    @router.message()
+    async def handle(message: Message) -> None:
+        state["active"] += 1
+        state["peak"] = max(state["peak"], state["active"])
+        if release is not None:
+            await release.wait()
+        handled.append(message.message_id)
+        state["active"] -= 1
+
+    dp = Dispatcher()
+    dp.include_router(router)
+    return dp, state
+
+
+async def wait_until(condition, timeout: float = 2.0) -> None:
+    async with asyncio.timeout(timeout):
+        while not condition():
+            await asyncio.sleep(0.01)
+
+
+class TestWebhook:
+    """Тесты для aiohttp приложения вебхука."""
+
+    @pytest.mark.asyncio
+    async def test_update_is_processed(self):
+        """Тест: апдейт с верным секретом обрабатывается."""
+        handled: list[int] = []
+        dp, _ = make_dispatcher(handled)
+        app = create_app(dp, Bot("123:abc"), secret_token=SECRET)
+
+        async with TestClient(TestServer(app)) as client:
+            response = await client.post(
+                "/webhook",
+                json=fake_update(1),
+                headers={"X-Telegram-Bot-Api-Secret-Token": SECRET},
+            )
+            assert response.status == 200
+            await wait_until(lambda: handled == [1])
+
+    @pytest.mark.asyncio
+    async def test_wrong_secret_rejected(self):
+        """Тест: запрос без верного секрета отклоняется с 401."""
+        handled: list[int] = []
+        dp, _ = make_dispatcher(handled)
+        app = create_app(dp, Bot("123:abc"), secret_token=SECRET)
+
+        async with TestClient(TestServer(app)) as client:
+            missing = await client.post("/webhook", json=fake_update(1))
+            wrong = await client.post(
+                "/webhook",
+                json=fake_update(2),
+                headers={"X-Telegram-Bot-Api-Secret-Token": "wrong"},
+            )
+
+        assert missing.status == 401
+        assert wrong.status == 401
+        assert handled == []
+
+    @pytest.mark.asyncio
+    async def test_in_flight_limit(self):
+        """Тест: апдейты обрабатываются параллельно, но не больше лимита."""
+        handled: list[int] = []
+        release = asyncio.Event()
+        dp, state = make_dispatcher(handled, release)
+        app = create_app(dp, Bot("123:abc"), secret_token=SECRET, max_in_flight=3)
+        handler = app[WEBHOOK_HANDLER]
+
+        async with TestClient(TestServer(app)) as client:
+            posts = [
+                asyncio.create_task(
+                    client.post(
+                        "/webhook",
+                        json=fake_update(i),
+                        headers={"X-Telegram-Bot-Api-Secret-Token": SECRET},
+                    )
+                )
+                for i in range(1, 8)
+            ]
+            await wait_until(lambda: state["active"] == 3)
+            await asyncio.sleep(0.05)
+
+            # Остальные запросы ждут свободного места
+            assert handler.in_flight == 3
+            assert sum(post.done() for post in posts) == 3
+
+            release.set()
+            responses = await asyncio.gather(*posts)
+            await wait_until(lambda: len(handled) == 7)
+
+        assert all(response.status == 200 for response in responses)
+        assert state["peak"] == 3
+        assert sorted(handled) == list(range(1, 8))
+
+    @pytest.mark.asyncio
+    async def test_shutdown_drains_queues_before_closing_session(self):
+        """Тест: очереди по чатам дообрабатываются до закрытия сессии бота."""
+        events: list = []
+        router = Router()
+
+        @router.message()
+        async def handle(message: Message) -> None:
+            await asyncio.sleep(0.02)
+            events.append(message.message_id)
+
+        dp = Dispatcher()
+        dp.include_router(router)
+        scheduler = ChatScheduler(workers=1)
+        dp.update.outer_middleware(scheduler)
+        dp.shutdown.register(scheduler.stop)
+        bot = Bot("123:abc")
+        close_session = bot.session.close
+
+        async def close() -> None:
+            events.append("closed")
+            await close_session()
+
+        bot.session.close = close
+        app = create_app(dp, bot, secret_token=SECRET)
+
+        async with TestClient(TestServer(app)) as client:
+            for i in range(1, 6):
+                response = await client.post(
+                    "/webhook",
+                    json=fake_update(i),
+                    headers={"X-Telegram-Bot-Api-Secret-Token": SECRET},
+                )
+                assert response.status == 200
+            assert scheduler.pending > 0
+
+        assert events == [1, 2, 3, 4, 5, "closed"]